@@ -0,0 +1,336 @@
+"""
+Benchmark every endpoint of coderr_app/api/urls.py and user_auth_app/api/urls.py.
+
+Seeds a fresh SQLite database with `generate_data`, then drives each endpoint
+through the Django test client, recording latency percentiles and the number
+of SQL queries per request. The read endpoints are also loaded over HTTP
+through a local gunicorn instance. Results are written as JSON, and two
+result files can be compared to flag regressions:
+
+    python -m benchmarks.api run --offers 2000 --orders 10000 --output after.json
+    python -m benchmarks.api compare before.json after.json
+
+`compare` exits with status 1 if an endpoint runs more queries than before,
+its p95 latency grew or its HTTP throughput dropped by more than --threshold.
+"""
+
+import argparse
+import itertools
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.common import running_server, run_http_load, setup_django, summarize
+
+HOST = '127.0.0.1'
+PASSWORD = 'password123'
+
+
+class Endpoint:
+    """
+    One benchmarked request. `path` and `data` may be callables, evaluated per
+    request; `prepare` runs untimed before each request, e.g. to create the
+    object a DELETE removes. `user` selects the token sent with the request.
+    """
+
+    def __init__(self, name, method, path, data=None, user=None, prepare=None, content_type='application/json'):
+        self.name, self.method, self.user = name, method, user
+        self.path, self.data, self.prepare, self.content_type = path, data, prepare, content_type
+
+    def resolve(self, value):
+        return value() if callable(value) else value
+
+
+def offer_payload(title, price=100):
+    return {
+        'title': title, 'description': 'Benchmark Angebot',
+        'details': [
+            {'title': offer_type, 'revisions': 2, 'delivery_time_in_days': days, 'price': price * factor,
+             'features': ['Feature'], 'offer_type': offer_type}
+            for offer_type, factor, days in [('basic', 1, 7), ('standard', 2, 5), ('premium', 3, 3)]
+        ],
+    }
+
+
+def get_endpoints(fixtures):
+    """
+    All routes of the API, with ids taken from the seeded database.
+    """
+    from coderr_app.api.serializers import OfferSerializer
+    from coderr_app.models import Offer, OfferDetail, Order, Review
+
+    business, customer = fixtures['business'], fixtures['customer']
+    offer, detail, order = fixtures['offer'], fixtures['detail'], fixtures['order']
+    counter = itertools.count()
+    toggle = itertools.cycle([0, 1])
+
+    def create_offer():
+        offer, details = OfferSerializer.build_offer(
+            OfferSerializer(data=offer_payload('Wegwerf')).run_validation(offer_payload('Wegwerf')), user=business)
+        offer.save()
+        for new_detail in details:
+            new_detail.offer = offer
+        OfferDetail.objects.bulk_create(details)
+        fixtures['disposable_offer'] = offer.pk
+
+    def create_order():
+        fixtures['disposable_order'] = Order.objects.create(
+            customer_user=customer, business_user=business, title='Wegwerf', revisions=1,
+            delivery_time_in_days=3, price=100, features=['Feature'], offer_type='basic').pk
+
+    def reset_review():
+        Review.objects.filter(reviewer=customer, business_user=business).delete()
+
+    def create_review():
+        reset_review()
+        fixtures['review'] = Review.objects.create(business_user=business, reviewer=customer, rating=4).pk
+
+    return [
+        # coderr_app
+        Endpoint('offer-list', 'GET', '/offers/'),
+        # Authenticated requests bypass the catalog cache, so these measure the queries
+        Endpoint('offer-list-uncached', 'GET', '/offers/', user='customer'),
+        Endpoint('offer-list-filtered', 'GET', '/offers/?search=web&max_delivery_time=20&ordering=min_price',
+                 user='customer'),
+        Endpoint('offer-list-cursor', 'GET', '/offers/?pagination=cursor', user='customer'),
+        Endpoint('offer-detail', 'GET', f'/offers/{offer.pk}/'),
+        Endpoint('offer-create', 'POST', '/offers/', lambda: offer_payload(f'Neu {next(counter)}'), 'business'),
+        Endpoint('offer-update', 'PATCH', f'/offers/{offer.pk}/',
+                 lambda: {'details': [{'offer_type': 'basic', 'price': 90 + next(toggle)}]}, 'business'),
+        Endpoint('offer-delete', 'DELETE', lambda: f"/offers/{fixtures['disposable_offer']}/", user='business',
+                 prepare=create_offer),
+        Endpoint('offer-import', 'POST', '/offers/import/',
+                 lambda: [offer_payload(f'Import {next(counter)}') for _ in range(10)], 'business'),
+        Endpoint('offerdetails-list', 'GET', '/offerdetails/'),
+        Endpoint('offerdetails-detail', 'GET', f'/offerdetails/{detail.pk}/'),
+        Endpoint('order-list', 'GET', '/orders/', user='customer'),
+        Endpoint('order-list-cursor', 'GET', '/orders/?pagination=cursor', user='business'),
+        Endpoint('order-detail', 'GET', f'/orders/{order.pk}/', user='customer'),
+        Endpoint('order-create', 'POST', '/orders/', {'offer_detail_id': detail.pk}, 'customer'),
+        Endpoint('order-update', 'PATCH', f'/orders/{order.pk}/',
+                 lambda: {'status': ['in_progress', 'completed'][next(toggle)]}, 'business'),
+        Endpoint('order-delete', 'DELETE', lambda: f"/orders/{fixtures['disposable_order']}/", user='customer',
+                 prepare=create_order),
+        Endpoint('reviews-list', 'GET', f'/reviews/?business_user_id={business.pk}', user='customer'),
+        Endpoint('reviews-create', 'POST', '/reviews/',
+                 {'business_user': business.pk, 'rating': 5, 'description': 'Super'}, 'customer',
+                 prepare=reset_review),
+        Endpoint('reviews-update', 'PATCH', lambda: f"/reviews/{fixtures['review']}/",
+                 lambda: {'rating': 4 + next(toggle)}, 'customer', prepare=lambda: fixtures.get('review') or create_review()),
+        Endpoint('reviews-delete', 'DELETE', lambda: f"/reviews/{fixtures['review']}/", user='customer',
+                 prepare=create_review),
+        Endpoint('profile-list', 'GET', '/profile/', user='customer'),
+        Endpoint('profile-detail', 'GET', f'/profile/{business.pk}/', user='customer'),
+        Endpoint('profile-update', 'PATCH', f'/profile/{business.pk}/',
+                 lambda: {'location': f'Berlin {next(toggle)}'}, 'business'),
+        Endpoint('business_profiles', 'GET', '/profiles/business/'),
+        Endpoint('business_profiles-stream', 'GET', '/profiles/business/?stream=ndjson'),
+        Endpoint('business_profile_detail', 'GET', f'/profiles/business/{business.pk}/'),
+        Endpoint('customer_profiles', 'GET', '/profiles/customer/?pagination=cursor'),
+        Endpoint('customer_profile_detail', 'GET', f'/profiles/customer/{customer.pk}/'),
+        Endpoint('order_count', 'GET', f'/order-count/{business.pk}/'),
+        Endpoint('completed_order_count', 'GET', f'/completed-order-count/{business.pk}/'),
+        Endpoint('order_counts', 'GET', f'/order-counts/?business_user_ids={business.pk},{customer.pk}'),
+        Endpoint('base-info', 'GET', '/base-info/'),
+        # user_auth_app
+        Endpoint('registration', 'POST', '/registration/', lambda: (lambda i: {
+            'username': f'bench_new_{i}', 'email': f'bench_new_{i}@example.com', 'password': PASSWORD,
+            'repeated_password': PASSWORD, 'type': 'customer'})(next(counter))),
+        Endpoint('login', 'POST', '/login/', {'username': customer.username, 'password': PASSWORD}),
+    ]
+
+
+def get_fixtures():
+    """
+    The busiest business user, a customer with an order from them and their ids.
+    """
+    from django.db.models import Count
+    from coderr_app.models import Order, Profile
+    from rest_framework.authtoken.models import Token
+
+    business = (Profile.objects.filter(type='business', user__username__startswith='bench_')
+                .annotate(offers=Count('user__offers')).order_by('-offers').first().user)
+    order = Order.objects.filter(business_user=business).select_related('customer_user').first()
+    if order is None:
+        sys.exit("The dataset needs at least one order of the busiest business user, seed more orders.")
+    offer = business.offers.first()
+    return {
+        'business': business, 'customer': order.customer_user, 'offer': offer,
+        'detail': offer.details.get(offer_type='standard'), 'order': order,
+        'tokens': {
+            'business': Token.objects.get(user=business).key,
+            'customer': Token.objects.get(user=order.customer_user).key,
+        },
+    }
+
+
+def measure_client(endpoint, tokens, iterations):
+    """
+    Run the endpoint through the test client and return latencies, query
+    counts and status codes.
+    """
+    from django.db import connection
+    from django.test import Client
+    from django.test.utils import CaptureQueriesContext
+
+    client = Client(raise_request_exception=False)
+    headers = {'Authorization': f'Token {tokens[endpoint.user]}'} if endpoint.user else {}
+    latencies, queries, statuses = [], [], {}
+    for iteration in range(iterations + 1):  # the first request warms up
+        if endpoint.prepare:
+            endpoint.prepare()
+        path, data = endpoint.resolve(endpoint.path), endpoint.resolve(endpoint.data)
+        body = json.dumps(data) if data is not None else None
+        with CaptureQueriesContext(connection) as captured:
+            start = time.perf_counter()
+            response = client.generic(endpoint.method, path, body or '', content_type=endpoint.content_type,
+                                      headers=headers)
+            if response.streaming:
+                b''.join(response.streaming_content)
+            elapsed = time.perf_counter() - start
+        if iteration:
+            latencies.append(elapsed)
+            queries.append(len(captured))
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+    result = summarize(latencies, sum(latencies), sum(count for status, count in statuses.items() if status >= 400))
+    result.update(queries=max(queries), queries_mean=round(sum(queries) / len(queries), 2),
+                  statuses={str(status): count for status, count in sorted(statuses.items())})
+    return result
+
+
+def seed(args):
+    from django.core.management import call_command
+
+    call_command('migrate', verbosity=0)
+    call_command('generate_data', prefix='bench', seed=args.seed, businesses=args.businesses,
+                 customers=args.customers, offers=args.offers, orders=args.orders, reviews=args.reviews,
+                 password=PASSWORD, no_guests=True)
+
+
+def run(args):
+    temporary = None if args.database else tempfile.TemporaryDirectory(prefix='coderr-bench-')
+    database = Path(args.database or Path(temporary.name) / 'db.sqlite3')
+    reuse = args.database and database.exists()
+    os.environ['SQLITE_PATH'] = str(database)
+    setup_django()
+    from django.test.utils import setup_test_environment
+    setup_test_environment()  # allows the test client's host
+
+    if not reuse:
+        seed(args)
+    fixtures = get_fixtures()
+    endpoints = [endpoint for endpoint in get_endpoints(fixtures)
+                 if not args.only or endpoint.name in args.only]
+
+    results = {}
+    for endpoint in endpoints:
+        results[endpoint.name] = {'method': endpoint.method,
+                                  'client': measure_client(endpoint, fixtures['tokens'], args.iterations)}
+        client = results[endpoint.name]['client']
+        print(f"{endpoint.method:<7}{endpoint.name:<28}{client['p50_ms']!s:>8}ms{client['p95_ms']!s:>8}ms"
+              f"{client['p99_ms']!s:>8}ms{client['queries']:>5} queries", flush=True)
+
+    if args.http:
+        read_endpoints = [endpoint for endpoint in endpoints if endpoint.method == 'GET']
+        command = ['gunicorn', 'coderr_project.wsgi:application', '--workers', str(args.workers),
+                   '--bind', f'{HOST}:{args.port}']
+        with running_server(command, args.port, env={'SQLITE_PATH': str(database), 'ASYNC_VIEWS': '0'}):
+            for endpoint in read_endpoints:
+                headers = {'Authorization': f"Token {fixtures['tokens'][endpoint.user]}"} if endpoint.user else {}
+                http = run_http_load(HOST, args.port, endpoint.resolve(endpoint.path), headers,
+                                     args.concurrency, args.duration)
+                results[endpoint.name]['http'] = http
+                print(f"GET    {endpoint.name:<28}{http['rps']!s:>8} rps{http['p99_ms']!s:>8}ms p99", flush=True)
+
+    report = {
+        'meta': {
+            'seed': args.seed, 'businesses': args.businesses, 'customers': args.customers, 'offers': args.offers,
+            'orders': args.orders, 'reviews': args.reviews, 'iterations': args.iterations,
+            'database': str(database), 'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        },
+        'endpoints': results,
+    }
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(report, file, indent=2)
+    if temporary:
+        temporary.cleanup()
+
+
+def compare(args):
+    """
+    Print the differences between two result files and return 1 on a regression.
+    """
+    with open(args.baseline) as file:
+        baseline = json.load(file)['endpoints']
+    with open(args.current) as file:
+        current = json.load(file)['endpoints']
+
+    regressions = []
+    print(f"{'endpoint':<30}{'p95 before':>12}{'p95 after':>12}{'change':>9}{'queries':>12}")
+    for name, result in current.items():
+        if name not in baseline:
+            continue
+        before, after = baseline[name]['client'], result['client']
+        change = (after['p95_ms'] - before['p95_ms']) / before['p95_ms'] if before['p95_ms'] else 0
+        flags = []
+        if after['queries'] > before['queries']:
+            flags.append('queries')
+        if change > args.threshold and after['p95_ms'] - before['p95_ms'] > args.min_ms:
+            flags.append('latency')
+        if 'http' in baseline[name] and 'http' in result and baseline[name]['http']['rps']:
+            if result['http']['rps'] < baseline[name]['http']['rps'] * (1 - args.threshold):
+                flags.append('throughput')
+        if flags:
+            regressions.append(name)
+        print(f"{name:<30}{before['p95_ms']:>10}ms{after['p95_ms']:>10}ms{change:>+9.0%}"
+              f"{before['queries']:>6} -> {after['queries']:<3}{'  REGRESSION: ' + ', '.join(flags) if flags else ''}")
+
+    if regressions:
+        print(f"\n{len(regressions)} regression(s): {', '.join(regressions)}")
+        return 1
+    print("\nNo regressions.")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = commands.add_parser('run', help="Seed a database and benchmark every endpoint.")
+    run_parser.add_argument('--seed', type=int, default=42)
+    run_parser.add_argument('--businesses', type=int, default=50)
+    run_parser.add_argument('--customers', type=int, default=500)
+    run_parser.add_argument('--offers', type=int, default=500)
+    run_parser.add_argument('--orders', type=int, default=2000)
+    run_parser.add_argument('--reviews', type=int, default=1000)
+    run_parser.add_argument('--iterations', type=int, default=50, help="Requests per endpoint through the test client.")
+    run_parser.add_argument('--database', help="SQLite file to use; an existing file is reused without seeding.")
+    run_parser.add_argument('--only', nargs='+', help="Only benchmark these endpoints.")
+    run_parser.add_argument('--no-http', dest='http', action='store_false', help="Skip the gunicorn load test.")
+    run_parser.add_argument('--workers', type=int, default=2)
+    run_parser.add_argument('--concurrency', type=int, default=8)
+    run_parser.add_argument('--duration', type=float, default=5.0, help="Seconds of HTTP load per endpoint.")
+    run_parser.add_argument('--port', type=int, default=8766)
+    run_parser.add_argument('--output', help="Write the results as JSON to this file.")
+
+    compare_parser = commands.add_parser('compare', help="Compare two result files.")
+    compare_parser.add_argument('baseline')
+    compare_parser.add_argument('current')
+    compare_parser.add_argument('--threshold', type=float, default=0.25,
+                                help="Relative p95 increase or throughput drop that counts as a regression.")
+    compare_parser.add_argument('--min-ms', type=float, default=1.0,
+                                help="Ignore p95 increases smaller than this many milliseconds.")
+
+    args = parser.parse_args()
+    if args.command == 'compare':
+        sys.exit(compare(args))
+    run(args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+"""
+Compare the WSGI deployment (gunicorn, sync views) with the ASGI deployment
+(uvicorn, ASYNC_VIEWS=1) on the hot read endpoints.
+
+Both servers run against the database configured in the settings, so seed it
+first (e.g. `python manage.py generate_data` or `python db_fill.py`).
+
+    python -m benchmarks.asgi_vs_wsgi --workers 2 --concurrency 16 --duration 10
+"""
+
+import argparse
+import json
+import sys
+
+from benchmarks.common import running_server, run_http_load, setup_django
+
+HOST = '127.0.0.1'
+
+
+def get_endpoints():
+    """
+    The endpoints with async variants, filled with ids from the database. The
+    offer lists are requested with a token, since anonymous lists are served
+    from the catalog cache and would not reach the views being compared.
+    """
+    from rest_framework.authtoken.models import Token
+    from coderr_app.models import Offer, OfferDetail, Profile
+
+    offer = Offer.objects.order_by('pk').first()
+    detail = OfferDetail.objects.order_by('pk').first()
+    business = Profile.objects.filter(type='business').order_by('pk').first()
+    token = Token.objects.first()
+    if not (offer and detail and business and token):
+        sys.exit("The database needs at least one offer, business profile and token.")
+
+    auth = {'Authorization': f'Token {token.key}'}
+    return {
+        'offer-list': ('/offers/', auth),
+        'offer-list-search': ('/offers/?search=web&ordering=min_price', auth),
+        'offer-detail': (f'/offers/{offer.pk}/', {}),
+        'offerdetails-detail': (f'/offerdetails/{detail.pk}/', {}),
+        'base-info': ('/base-info/', {}),
+        'business_profiles': ('/profiles/business/', {}),
+        'reviews-list': ('/reviews/', auth),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--duration', type=float, default=10.0, help="Seconds per endpoint.")
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--output', help="Write the results as JSON to this file.")
+    args = parser.parse_args()
+
+    setup_django()
+    endpoints = get_endpoints()
+    deployments = {
+        'wsgi': (['gunicorn', 'coderr_project.wsgi:application', '--workers', str(args.workers),
+                  '--bind', f'{HOST}:{args.port}'], {'ASYNC_VIEWS': '0'}),
+        'asgi': (['uvicorn', 'coderr_project.asgi:application', '--workers', str(args.workers),
+                  '--host', HOST, '--port', str(args.port), '--no-access-log'], {'ASYNC_VIEWS': '1'}),
+    }
+
+    results = {}
+    for deployment, (command, env) in deployments.items():
+        with running_server(command, args.port, env=env):
+            for name, (path, headers) in endpoints.items():
+                results.setdefault(name, {})[deployment] = run_http_load(
+                    HOST, args.port, path, headers, args.concurrency, args.duration)
+
+    print(f"{'endpoint':<22}{'wsgi rps':>10}{'asgi rps':>10}{'wsgi p99':>11}{'asgi p99':>11}")
+    for name, result in results.items():
+        wsgi, asgi = result['wsgi'], result['asgi']
+        print(f"{name:<22}{wsgi['rps']!s:>10}{asgi['rps']!s:>10}{wsgi['p99_ms']!s:>9}ms{asgi['p99_ms']!s:>9}ms")
+
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(results, file, indent=2)
+
+
+if __name__ == '__main__':
+    main()
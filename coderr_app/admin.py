@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Profile, Offer, Order, OfferDetail, Review
+from .models import Profile, Offer, Order, OfferDetail, Review, PlatformStatistics, IdempotencyKey
 
 # Register your models here.
 
@@ -8,3 +8,5 @@ admin.site.register(Offer)
 admin.site.register(Order)
 admin.site.register(OfferDetail)
 admin.site.register(Review)
+admin.site.register(PlatformStatistics)
+admin.site.register(IdempotencyKey)
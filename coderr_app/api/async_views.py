@@ -0,0 +1,205 @@
+"""
+Async variants of the most requested read endpoints.
+
+With `settings.ASYNC_VIEWS` enabled and the project served through ASGI (e.g.
+uvicorn), these views answer GET requests on the event loop with Django's
+async ORM, instead of pushing every request through the sync thread adapter.
+They reuse the querysets, filters, pagination, serializers and conditional
+GET validators of the sync views, so the responses are the same. All other methods, and GET
+variants they do not cover (cursor pagination, streaming, error responses),
+are delegated to the sync view.
+"""
+
+from asgiref.sync import sync_to_async
+from django.core.paginator import InvalidPage
+from django.http import HttpResponse
+from django.views import View
+from rest_framework import status
+from rest_framework.exceptions import APIException
+from coderr_app import catalog_cache
+from coderr_app.models import Profile, Offer, OfferDetail, PlatformStatistics
+from coderr_project.renderers import TimedJSONRenderer
+from .conditional import list_validators, not_modified, object_validators, set_validators
+from .serializers import BusinessSerializer
+from .views import (BaseInfo, BusinessProfilesView, LargeResultsSetPagination, OfferDetailsViewSet,
+                    OfferViewSet, ReviewViewSet)
+
+
+def render(data, status_code=status.HTTP_200_OK, headers=None, validators=None):
+    response = HttpResponse(TimedJSONRenderer().render(data), status=status_code, content_type='application/json',
+                            headers=headers)
+    if validators is not None:
+        set_validators(response, validators)
+    return response
+
+
+def not_found(model):
+    # Same body as DRF's response to get_object_or_404()
+    return render({"detail": f"No {model._meta.object_name} matches the given query."}, status.HTTP_404_NOT_FOUND)
+
+
+class AsyncReadView(View):
+    """
+    Serves GET with the async `get` handler and everything else with `sync_view`.
+    Before `get` runs, the DRF view behind `sync_view` is set up as `self.view`
+    and authenticates the request and checks its permissions and throttles, like
+    it would when dispatched. Requests it rejects, and those `get` returns None
+    for, are answered by the sync view.
+    """
+    sync_view = None
+
+    async def dispatch(self, request, *args, **kwargs):
+        if request.method == 'GET':
+            try:
+                # Authentication may query the database or the token cache
+                self.view = await sync_to_async(self.get_view)(request, **kwargs)
+            except APIException:
+                self.view = None
+            if self.view is not None:
+                response = await self.get(request, *args, **kwargs)
+                if response is not None:
+                    return response
+        return await sync_to_async(self.sync_view)(request, *args, **kwargs)
+
+    async def get(self, request, *args, **kwargs):
+        return None
+
+    def get_view(self, request, **kwargs):
+        """
+        Set up the DRF view of `sync_view` for `request` and run its checks
+        without dispatching it, to reuse its queryset, filters, paginator and
+        serializer.
+        """
+        initkwargs = dict(self.sync_view.initkwargs)
+        if hasattr(self.sync_view, 'actions'):
+            initkwargs['action_map'] = self.sync_view.actions
+        view = self.sync_view.cls(args=(), kwargs=kwargs, format_kwarg=None, **initkwargs)
+        view.request = view.initialize_request(request, **kwargs)
+        view.headers = view.default_response_headers
+        view.initial(view.request, **kwargs)
+        return view
+
+
+class AsyncOfferListView(AsyncReadView):
+    sync_view = staticmethod(OfferViewSet.as_view(
+        {'get': 'list', 'post': 'create'}, basename='offer', detail=False))
+
+    async def get(self, request):
+        key = None
+        if catalog_cache.is_cacheable(request):
+            # The cache backend may be the database, so go through a thread
+            key = await sync_to_async(catalog_cache.get_key)(request)
+            cached = await sync_to_async(catalog_cache.get_data)(key)
+            if cached is not None:
+                data, validators = cached
+                return not_modified(request, validators) or render(
+                    data, headers={'X-Cache': 'HIT'}, validators=validators)
+
+        view = self.view
+        pagination = view.paginator
+        if not isinstance(pagination, LargeResultsSetPagination):
+            return None  # cursor pagination
+
+        queryset = view.filter_queryset(view.get_queryset())
+        paginator = pagination.django_paginator_class(queryset, pagination.get_page_size(view.request))
+        paginator.count = await queryset.acount()
+        try:
+            page = paginator.page(pagination.get_page_number(view.request, paginator))
+        except InvalidPage:
+            return None
+        page.object_list = [offer async for offer in page.object_list]
+        pagination.page, pagination.request = page, view.request
+
+        validators = list_validators(page.object_list, view.last_modified_fields, paginator.count)
+        if response := not_modified(request, validators):
+            return response
+
+        serializer = view.get_serializer(page.object_list, many=True)
+        data = pagination.get_paginated_response(serializer.data).data
+        if key is None:
+            return render(data, validators=validators)
+        await sync_to_async(catalog_cache.set_data)(key, (data, validators))
+        return render(data, headers={'X-Cache': 'MISS'}, validators=validators)
+
+
+class AsyncOfferDetailView(AsyncReadView):
+    sync_view = staticmethod(OfferViewSet.as_view(
+        {'get': 'retrieve', 'put': 'update', 'patch': 'partial_update', 'delete': 'destroy'},
+        basename='offer', detail=True))
+
+    async def get(self, request, pk):
+        view = self.view
+        try:
+            offer = await view.get_queryset().aget(pk=pk)
+        except Offer.DoesNotExist:
+            return not_found(Offer)
+        validators = object_validators(offer)
+        return not_modified(request, validators) or render(view.get_serializer(offer).data, validators=validators)
+
+
+class AsyncOfferDetailsDetailView(AsyncReadView):
+    sync_view = staticmethod(OfferDetailsViewSet.as_view(
+        {'get': 'retrieve', 'put': 'update', 'patch': 'partial_update', 'delete': 'destroy'},
+        basename='offerdetails', detail=True))
+
+    async def get(self, request, pk):
+        view = self.view
+        try:
+            detail = await view.get_queryset().aget(pk=pk)
+        except OfferDetail.DoesNotExist:
+            return not_found(OfferDetail)
+        validators = object_validators(detail)
+        return not_modified(request, validators) or render(view.get_serializer(detail).data, validators=validators)
+
+
+class AsyncReviewListView(AsyncReadView):
+    sync_view = staticmethod(ReviewViewSet.as_view(
+        {'get': 'list', 'post': 'create'}, basename='reviews', detail=False))
+
+    async def get(self, request):
+        view = self.view
+        if view.paginator is not None:
+            return None
+        try:
+            # The filterset validation may query the database
+            queryset = await sync_to_async(view.filter_queryset)(view.get_queryset())
+        except APIException:
+            return None
+
+        reviews = [review async for review in queryset]
+        validators = list_validators(reviews)
+        if response := not_modified(request, validators):
+            return response
+        return render(view.get_serializer(reviews, many=True).data, validators=validators)
+
+
+class AsyncBaseInfoView(AsyncReadView):
+    sync_view = staticmethod(BaseInfo.as_view())
+
+    async def get(self, request):
+        try:
+            statistics = await PlatformStatistics.objects.aget(pk=PlatformStatistics.SINGLETON_PK)
+        except PlatformStatistics.DoesNotExist:
+            statistics = await sync_to_async(PlatformStatistics.load)()
+        return render(BaseInfo.get_data(statistics))
+
+
+class AsyncBusinessProfilesView(AsyncReadView):
+    sync_view = staticmethod(BusinessProfilesView.as_view())
+
+    async def get(self, request, pk=None):
+        profiles = Profile.objects.filter(type="business").select_related('user')
+        if pk:
+            try:
+                profile = await profiles.aget(user__pk=pk)
+            except Profile.DoesNotExist:
+                return render({"detail": ["Profile not found"]}, status.HTTP_404_NOT_FOUND)
+            validators = object_validators(profile)
+            return not_modified(request, validators) or render(BusinessSerializer(profile).data, validators=validators)
+
+        if 'stream' in request.GET or 'pagination' in request.GET:
+            return None
+        profiles = [profile async for profile in profiles.order_by('id')]
+        validators = list_validators(profiles)
+        return not_modified(request, validators) or render(BusinessSerializer(profiles, many=True).data,
+                                                           validators=validators)
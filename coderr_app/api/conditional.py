@@ -0,0 +1,116 @@
+"""
+Conditional GET support.
+
+Responses carry a weak `ETag` derived from the `updated_at` columns, so it is
+computed without serializing the body. Single objects are validated by their
+id and `updated_at` and also carry `Last-Modified`. Lists and pages are
+validated by the ids and the latest `updated_at` of the fetched objects and
+the total count of a paginated list, so they cost no extra query. They carry
+no `Last-Modified`: after a delete, older objects can move onto a page without
+raising its latest `updated_at`, which only the ids in the ETag notice.
+Requests with a matching `If-None-Match` or `If-Modified-Since` header are
+answered with 304 Not Modified before anything is serialized.
+"""
+
+import zlib
+from django.core.exceptions import ObjectDoesNotExist
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from rest_framework.response import Response
+
+
+def get_value(instance, field):
+    """
+    The value of `field` on `instance`, following relations written with `__`.
+    """
+    try:
+        for name in field.split('__'):
+            instance = getattr(instance, name)
+    except ObjectDoesNotExist:
+        return None
+    return instance
+
+
+def list_validators(instances, fields=('updated_at',), count=None):
+    """
+    (etag, None) of a list or page that is fetched anyway, without an extra
+    query. `fields` may follow relations loaded with the instances, and
+    `count` is the total of a paginated list.
+    """
+    last_modified = max(filter(None, (get_value(instance, field) for instance in instances for field in fields)),
+                        default=None)
+    ids = zlib.crc32(','.join(str(instance.pk) for instance in instances).encode())
+    return get_etag(len(instances) if count is None else count, f'{ids:08x}', last_modified), None
+
+
+def object_validators(instance):
+    return get_etag(instance.pk, instance.updated_at), instance.updated_at
+
+
+def get_total_count(paginator):
+    # Page number pagination keeps the Django page, cursor pagination a list without count
+    django_paginator = getattr(getattr(paginator, 'page', None), 'paginator', None)
+    return django_paginator.count if django_paginator is not None else None
+
+
+def get_etag(*parts):
+    return 'W/"{}"'.format('-'.join(
+        str(int(part.timestamp() * 1_000_000)) if hasattr(part, 'timestamp') else str(part)
+        for part in parts))
+
+
+def not_modified(request, validators):
+    """
+    A 304 response if the client's copy is still valid, otherwise None.
+    """
+    etag, last_modified = validators
+    response = get_conditional_response(
+        request, etag=etag, last_modified=last_modified and int(last_modified.timestamp()))
+    if response is not None:
+        set_validators(response, validators)
+    return response
+
+
+def set_validators(response, validators):
+    etag, last_modified = validators
+    response['ETag'] = etag
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(last_modified.timestamp())
+
+
+class ConditionalGetMixin:
+    """
+    Adds the validators to successful GET responses of a view. Views set
+    `self.validators`, usually through `check_not_modified`; viewsets get it
+    for list and retrieve. The latest of `last_modified_fields` goes into the
+    ETag of lists.
+    """
+    last_modified_fields = ('updated_at',)
+    validators = None
+
+    def check_not_modified(self, request, validators):
+        self.validators = validators
+        return not_modified(request, validators)
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        instances = list(queryset) if page is None else page
+        validators = list_validators(instances, self.last_modified_fields, get_total_count(self.paginator))
+        if response := self.check_not_modified(request, validators):
+            return response
+
+        serializer = self.get_serializer(instances, many=True)
+        if page is None:
+            return Response(serializer.data)
+        return self.get_paginated_response(serializer.data)
+
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+        return (self.check_not_modified(request, object_validators(instance))
+                or Response(self.get_serializer(instance).data))
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        if self.validators is not None and request.method in ('GET', 'HEAD') and response.status_code == 200:
+            set_validators(response, self.validators)
+        return super().finalize_response(request, response, *args, **kwargs)
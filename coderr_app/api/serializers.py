@@ -3,15 +3,15 @@ from coderr_app.models import Profile, Offer, Order, OfferDetail, Review
 from django.contrib.auth.models import User
 from django.conf import settings  # For access to MEDIA_URL
 from django.urls import reverse
-from django.db.models import Min
 from rest_framework.exceptions import ValidationError
 from rest_framework import status
-from django.db.models import Min
-from django.db import models
-from django.utils.html import strip_tags
+from django.db import models, transaction
+from django.utils import timezone
+from collections import defaultdict
+from coderr_project.serializers import TimedModelSerializer
 
 
-class OfferDetailLinkSerializer(serializers.ModelSerializer):
+class OfferDetailLinkSerializer(TimedModelSerializer):
     """
     Creates Link for single or list view of each detail
     """
@@ -26,11 +26,11 @@ class OfferDetailLinkSerializer(serializers.ModelSerializer):
         return reverse('offerdetails-detail', args=[obj.id])
 
 
-class ReviewSerializer(serializers.ModelSerializer):
+class ReviewSerializer(TimedModelSerializer):
     """
     Validates reviews and rating
     """
-    reviewer = serializers.ReadOnlyField(source='reviewer.id')
+    reviewer = serializers.ReadOnlyField(source='reviewer_id')
 
     class Meta:
         model = Review
@@ -62,7 +62,7 @@ class ReviewSerializer(serializers.ModelSerializer):
         return value
 
 
-class OrderSerializer(serializers.ModelSerializer):
+class OrderSerializer(TimedModelSerializer):
     """
     Validates orders and check permissions
     """
@@ -117,9 +117,10 @@ class OrderSerializer(serializers.ModelSerializer):
         customer_user = request.user
         offer_detail_id = validated_data.pop('offer_detail_id', None)
 
-       # Ensure the OfferDetail exists
+        # Ensure the OfferDetail exists, loaded with its offer and business user in one query
         try:
-            offer_detail = OfferDetail.objects.get(id=offer_detail_id)
+            offer_detail = OfferDetail.objects.select_related('offer__user').get(
+                id=offer_detail_id, offer__isnull=False)
         except OfferDetail.DoesNotExist:
             raise serializers.ValidationError({"offer_detail_id": ["Angebotsdetail mit dieser ID existiert nicht."]})
 
@@ -140,7 +141,7 @@ class OrderSerializer(serializers.ModelSerializer):
         return order
 
 
-class OfferDetailSerializer(serializers.ModelSerializer):
+class OfferDetailSerializer(TimedModelSerializer):
     """
     Validates OfferDetails
     """
@@ -169,6 +170,12 @@ class OfferDetailSerializer(serializers.ModelSerializer):
         if features is not None and not features:
             errors['features'] = "Mindestens ein Feature muss angegeben werden."
 
+        # An offer has at most one detail per offer_type
+        offer_type = data.get('offer_type')
+        if (offer_type is not None and isinstance(self.instance, OfferDetail) and self.instance.offer_id
+                and self.instance.offer.details.exclude(pk=self.instance.pk).filter(offer_type=offer_type).exists()):
+            errors['offer_type'] = f"The offer already has a '{offer_type}' detail."
+
         # Raise ValidationError if there are any errors
         if errors:
             raise serializers.ValidationError(errors)
@@ -177,24 +184,16 @@ class OfferDetailSerializer(serializers.ModelSerializer):
 
 
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(TimedModelSerializer):
     """
     Define fields for user
     """
-
-    def validate_first_name(self, value):
-        """Clean HTML tags from first_name."""
-        return strip_tags(value)
-
-    def validate_last_name(self, value):
-        """Clean HTML tags from last_name."""
-        return strip_tags(value)
     class Meta:
         model = User
         fields = ['pk', 'first_name', 'last_name', 'username']
 
 
-class BusinessSerializer(serializers.ModelSerializer):
+class BusinessSerializer(TimedModelSerializer):
     """
     Define fields for business profiles with nested user data
     """
@@ -231,7 +230,7 @@ class BusinessSerializer(serializers.ModelSerializer):
         return representation
 
 
-class CustomerSerializer(serializers.ModelSerializer):
+class CustomerSerializer(TimedModelSerializer):
     """
     Define fields for customer profiles with nested user data
     """
@@ -272,7 +271,7 @@ class CustomerSerializer(serializers.ModelSerializer):
     
 
 
-class OfferSerializer(serializers.ModelSerializer):
+class OfferSerializer(TimedModelSerializer):
     details = OfferDetailSerializer(many=True)  # Für POST verwenden wir den vollständigen Detail-Serializer
     min_price = serializers.SerializerMethodField()
     min_delivery_time = serializers.SerializerMethodField()
@@ -287,12 +286,10 @@ class OfferSerializer(serializers.ModelSerializer):
         ]
 
     def get_min_price(self, obj):
-        min_price = obj.details.aggregate(min_price=Min('price'))['min_price']
-        return float(min_price) if min_price is not None else None
+        return float(obj.min_price) if obj.min_price is not None else None
 
     def get_min_delivery_time(self, obj):
-        min_delivery_time = obj.details.aggregate(min_delivery_time=Min('delivery_time_in_days'))['min_delivery_time']
-        return int(min_delivery_time) if min_delivery_time is not None else None
+        return int(obj.min_delivery_time) if obj.min_delivery_time is not None else None
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -304,27 +301,66 @@ class OfferSerializer(serializers.ModelSerializer):
 
 
 
-    def create(self, validated_data):
+    def validate_details(self, details_data):
         """
-        Erstelle ein Angebot und die zugehörigen Angebotsdetails.
+        A new offer needs exactly one detail of each type. Checked during
+        validation, so bulk imports can report it per offer. Updates may send
+        any of the types, each at most once.
         """
-        details_data = validated_data.pop('details', [])
+        if self.instance is not None:
+            return self.validate_detail_updates(details_data)
 
         # Prüfen, ob genau 3 Details vorhanden sind
         if len(details_data) != 3:
-            raise serializers.ValidationError({"details": ["Es müssen genau 3 Angebotsdetails übergeben werden."]})
+            raise serializers.ValidationError("Es müssen genau 3 Angebotsdetails übergeben werden.")
 
         offer_types = {detail.get('offer_type') for detail in details_data}
         if offer_types != {'basic', 'standard', 'premium'}:
-            raise serializers.ValidationError({"details": ["Die 3 Angebotsdetails müssen die Typen 'basic', 'standard' und 'premium' enthalten."]})
+            raise serializers.ValidationError("Die 3 Angebotsdetails müssen die Typen 'basic', 'standard' und 'premium' enthalten.")
+
+        return details_data
 
-        # Erstelle das Angebot
-        offer = Offer.objects.create(**validated_data)
+    def validate_detail_updates(self, details_data):
+        offer_types = [detail.get('offer_type') for detail in details_data]
+        if None in offer_types:
+            raise serializers.ValidationError("Jedes Angebotsdetail braucht einen 'offer_type'.")
+        if len(set(offer_types)) != len(offer_types):
+            raise serializers.ValidationError("Jeder 'offer_type' darf nur einmal vorkommen.")
 
-        # Erstelle die zugehörigen Angebotsdetails
+        # Types the offer does not have yet are created and need all fields
+        existing = {detail.offer_type for detail in self.instance.details.all()}
+        required = [name for name, field in OfferDetailSerializer().fields.items()
+                    if field.required and not field.read_only]
         for detail_data in details_data:
-            OfferDetail.objects.create(offer=offer, **detail_data)
+            missing = [name for name in required if name not in detail_data]
+            if detail_data['offer_type'] not in existing and missing:
+                raise serializers.ValidationError(
+                    f"Neues Angebotsdetail '{detail_data['offer_type']}': {', '.join(missing)} fehlt.")
+        return details_data
+
+    @staticmethod
+    def build_offer(validated_data, **kwargs):
+        """
+        Unsaved offer and details from validated data. The minimums are taken
+        from the details here, so the details can be inserted with bulk_create,
+        which does not send the signals that would otherwise compute them.
+        """
+        validated_data = dict(validated_data, **kwargs)
+        details = [OfferDetail(**detail_data) for detail_data in validated_data.pop('details', [])]
+        offer = Offer(**validated_data)
+        offer.set_detail_minimums(details)
+        return offer, details
 
+    def create(self, validated_data):
+        """
+        Erstelle ein Angebot und die zugehörigen Angebotsdetails.
+        """
+        offer, details = self.build_offer(validated_data)
+        with transaction.atomic():
+            offer.save()
+            for detail in details:
+                detail.offer = offer
+            OfferDetail.objects.bulk_create(details)
         return offer
 
     def update(self, instance, validated_data):
@@ -333,26 +369,59 @@ class OfferSerializer(serializers.ModelSerializer):
         """
         details_data = validated_data.pop('details', None)
 
-        # Wenn Details im PATCH enthalten sind, dann aktualisieren
-        if details_data is not None:
-            # Entferne alle bestehenden Details und füge die neuen hinzu
-            instance.details.all().delete()
-            for detail_data in details_data:
-                OfferDetail.objects.create(offer=instance, **detail_data)
+        with transaction.atomic():
+            # Wenn Details im PATCH enthalten sind, dann aktualisieren
+            if details_data is not None:
+                self.upsert_details(instance, details_data)
 
-        # Aktualisiere die Felder des Angebots
-        for attr, value in validated_data.items():
-            setattr(instance, attr, value)
-        instance.save()
+            # Aktualisiere die Felder des Angebots
+            for attr, value in validated_data.items():
+                setattr(instance, attr, value)
+            instance.save()
 
         return instance
 
+    @staticmethod
+    def upsert_details(offer, details_data):
+        """
+        Apply the details by their offer_type: missing types are created,
+        existing details get only their changed fields written, unchanged ones
+        are skipped. Details keep their ids, and a single changed tier is a
+        single UPDATE. The offer minimums are set in memory and written by the
+        caller's offer.save(), since bulk writes send no signals. Returns all
+        details of the offer by their type.
+        """
+        details = {detail.offer_type: detail for detail in offer.details.all()}
+        now = timezone.now()
+        created = []
+        changed = defaultdict(list)  # changed fields -> details
+        for detail_data in details_data:
+            detail = details.get(detail_data['offer_type'])
+            if detail is None:
+                detail = details[detail_data['offer_type']] = OfferDetail(offer=offer, **detail_data)
+                created.append(detail)
+                continue
+
+            fields = tuple(sorted(field for field, value in detail_data.items() if getattr(detail, field) != value))
+            if fields:
+                for field in fields:
+                    setattr(detail, field, detail_data[field])
+                detail.updated_at = now
+                changed[fields].append(detail)
 
+        if created:
+            OfferDetail.objects.bulk_create(created)
+        for fields, changed_details in changed.items():
+            OfferDetail.objects.bulk_update(changed_details, [*fields, 'updated_at'])
+        offer.set_detail_minimums(details.values())
+        return details
 
 
 
 
-class ProfileSerializer(serializers.ModelSerializer):
+
+
+class ProfileSerializer(TimedModelSerializer):
     """
     Defines fields for profile and include nested user data
     """
@@ -382,18 +451,6 @@ class ProfileSerializer(serializers.ModelSerializer):
             'file': {'required': False}
         }
 
-    def validate_description(self, value):
-        """Clean HTML tags from description field."""
-        return strip_tags(value)
-
-    def validate_location(self, value):
-        """Clean HTML tags from location field."""
-        return strip_tags(value)
-
-    def validate_working_hours(self, value):
-        """Clean HTML tags from working_hours field."""
-        return strip_tags(value)
-
     def to_representation(self, instance):
         representation = super().to_representation(instance)
 
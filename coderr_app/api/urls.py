@@ -9,9 +9,10 @@ The Coderr backend serves endpoints for managing user profiles, offers, orders,
 and reviews. It also provides utility endpoints like order counts and base information.
 """
 
+from django.conf import settings
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import ProfileViewSet, BusinessProfilesView, CustomerProfilesView, OfferViewSet, OrderViewSet, OfferDetailsViewSet, ReviewViewSet, OrderCountView, CompletedOrderCountView, BaseInfo, OfferDetailView
+from .views import ProfileViewSet, BusinessProfilesView, CustomerProfilesView, OfferViewSet, OrderViewSet, OfferDetailsViewSet, ReviewViewSet, OrderCountView, CompletedOrderCountView, OrderCountBatchView, BaseInfo
 
 # Create a router for standard viewsets
 router = DefaultRouter()
@@ -54,10 +55,26 @@ urlpatterns = [
          OrderCountView.as_view(), name='order_count'),
     path('completed-order-count/<int:business_user_id>/',
          CompletedOrderCountView.as_view(), name='completed_order_count'),
+    path('order-counts/', OrderCountBatchView.as_view(), name='order_counts'),
 
     # Endpoint for general application base information
     path('base-info/', BaseInfo.as_view(), name='base-info'),
-#     path('offers/<int:pk>/', OfferDetailView.as_view(), name='offer-detail'),
    
     
 ]
+
+if settings.ASYNC_VIEWS:
+    from .async_views import (AsyncOfferListView, AsyncOfferDetailView, AsyncOfferDetailsDetailView,
+                              AsyncReviewListView, AsyncBaseInfoView, AsyncBusinessProfilesView)
+
+    # Async variants of the hot read endpoints, matched before the sync routes
+    urlpatterns = [
+        path('offers/', AsyncOfferListView.as_view(), name='offer-list'),
+        path('offers/<int:pk>/', AsyncOfferDetailView.as_view(), name='offer-detail'),
+        path('offerdetails/<int:pk>/', AsyncOfferDetailsDetailView.as_view(), name='offerdetails-detail'),
+        path('reviews/', AsyncReviewListView.as_view(), name='reviews-list'),
+        path('base-info/', AsyncBaseInfoView.as_view(), name='base-info'),
+        path('profiles/business/', AsyncBusinessProfilesView.as_view(), name='business_profiles'),
+        path('profiles/business/<int:pk>/', AsyncBusinessProfilesView.as_view(),
+             name='business_profile_detail'),
+    ] + urlpatterns
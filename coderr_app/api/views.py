@@ -7,58 +7,58 @@ serializers, permissions, and querysets.
 """
 
 from rest_framework import viewsets, filters, status
-from coderr_app.models import Profile, Offer, Order, OfferDetail, Review
+from coderr_app.models import Profile, Offer, Order, OfferDetail, Review, PlatformStatistics
 from .serializers import ProfileSerializer, UserSerializer, OfferSerializer, OrderSerializer, OfferDetailSerializer, ReviewSerializer, BusinessSerializer, CustomerSerializer
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.views import APIView
 from django.contrib.auth.models import User
 from django.shortcuts import get_object_or_404
-from rest_framework.pagination import PageNumberPagination
+from rest_framework.pagination import PageNumberPagination, CursorPagination
 from django_filters.rest_framework import DjangoFilterBackend
-from django.db.models import Avg, Min
 from rest_framework.exceptions import AuthenticationFailed, PermissionDenied
 from .permissions import IsBusinessUserOrReadOnly, IsReviewerOrAdmin, IsAuthenticatedOrReadOnlyForProfile, IsOwnerOrReadOnly
 from decimal import Decimal
 from coderr_app.api import serializers
-from math import ceil
-from django.db.models import Q
+from coderr_app.search import search_offers
+from coderr_app import catalog_cache, idempotency
+from coderr_app.offer_import import import_offers
+from coderr_project.parsers import SanitizingJSONParser, SanitizingNDJSONParser
+from rest_framework.decorators import action
+from django.conf import settings
+from django.db import transaction
+from .conditional import ConditionalGetMixin, list_validators, object_validators
+from django.http import StreamingHttpResponse
+from rest_framework.utils.encoders import JSONEncoder
+from itertools import islice
+import json
 
 
 class BaseInfo(APIView):
     """
     Provides general application statistics like review count, average ratings,
-    number of business profiles, and total offers.
+    number of business profiles, and total offers, read from PlatformStatistics.
     """
     permission_classes = [AllowAny]
 
     def get(self, *args, **kwargs):
-        # Total number of reviews
-        review_count = Review.objects.count()
+        # The counters are maintained on every write, so this is a single row read
+        statistics = PlatformStatistics.load()
+        return Response(self.get_data(statistics), status=status.HTTP_200_OK)
 
-        # Calculate and round average rating to one decimal place
-        average_rating_data = Review.objects.aggregate(
-            average_rating=Avg("rating"))
-        average_rating = average_rating_data.get("average_rating") or 0.0
-        average_rating = round(Decimal(average_rating), 1)
-
-        # Count of business profiles
-        business_profile_count = Profile.objects.filter(
-            type="business").count()
-
-        # Count of offers
-        offer_count = Offer.objects.count()
+    @staticmethod
+    def get_data(statistics):
+        # Round average rating to one decimal place
+        average_rating = round(Decimal(statistics.average_rating or 0.0), 1)
 
         # Collect the data
-        data = {
-            "review_count": review_count,
+        return {
+            "review_count": statistics.review_count,
             "average_rating": average_rating,
-            "business_profile_count": business_profile_count,
-            "offer_count": offer_count,
+            "business_profile_count": statistics.business_profile_count,
+            "offer_count": statistics.offer_count,
         }
 
-        return Response(data, status=status.HTTP_200_OK)
-
 
 class OrderCountView(APIView):
     """
@@ -66,15 +66,12 @@ class OrderCountView(APIView):
     """
 
     def get(self, request, business_user_id):
-        # Count orders with status "in_progress"
-        order_count = Order.objects.filter(
-            business_user_id=business_user_id, status="in_progress").count()
-
-        # Check if the business user exists
-        if not Profile.objects.filter(user=business_user_id).exists():
+        # Count orders per status and check that the business user exists in one query
+        counts = Order.count_by_status([business_user_id]).get(business_user_id)
+        if counts is None:
             return Response({"detail": ["Business user not found."]}, status=status.HTTP_404_NOT_FOUND)
 
-        return Response({"order_count": order_count}, status=status.HTTP_200_OK)
+        return Response({"order_count": counts["in_progress"]}, status=status.HTTP_200_OK)
 
 
 class CompletedOrderCountView(APIView):
@@ -83,30 +80,119 @@ class CompletedOrderCountView(APIView):
     """
 
     def get(self, request, business_user_id):
-        # Count orders with status "completed"
-        completed_order_count = Order.objects.filter(
-            business_user_id=business_user_id, status="completed").count()
-
-        # Check if the business user exists
-        if not Profile.objects.filter(user=business_user_id).exists():
+        # Count orders per status and check that the business user exists in one query
+        counts = Order.count_by_status([business_user_id]).get(business_user_id)
+        if counts is None:
             return Response({"detail": ["Business user not found."]}, status=status.HTTP_404_NOT_FOUND)
 
-        return Response({"completed_order_count": completed_order_count}, status=status.HTTP_200_OK)
+        return Response({"completed_order_count": counts["completed"]}, status=status.HTTP_200_OK)
+
+
+class OrderCountBatchView(APIView):
+    """
+    Provides the in-progress, completed and cancelled order counts for many
+    business users at once, e.g. `?business_user_ids=1,2,3`. Unknown users
+    are returned as null.
+    """
+    max_ids = 100
+
+    def get(self, request):
+        raw_ids = ','.join(request.query_params.getlist('business_user_ids'))
+        try:
+            business_user_ids = list(dict.fromkeys(int(value) for value in raw_ids.split(',') if value.strip()))
+        except ValueError:
+            return Response({"business_user_ids": ["Only integer IDs are allowed."]}, status=status.HTTP_400_BAD_REQUEST)
+
+        if not business_user_ids:
+            return Response({"business_user_ids": ["This field is required."]}, status=status.HTTP_400_BAD_REQUEST)
+        if len(business_user_ids) > self.max_ids:
+            return Response({"business_user_ids": [f"At most {self.max_ids} IDs are allowed."]}, status=status.HTTP_400_BAD_REQUEST)
+
+        counts = Order.count_by_status(business_user_ids)
+        data = {}
+        for business_user_id in business_user_ids:
+            user_counts = counts.get(business_user_id)
+            data[business_user_id] = user_counts and {
+                "order_count": user_counts["in_progress"],
+                "completed_order_count": user_counts["completed"],
+                "cancelled_order_count": user_counts["cancelled"],
+            }
+
+        return Response(data, status=status.HTTP_200_OK)
 
 
 class LargeResultsSetPagination(PageNumberPagination):
     """
     Pagination class for large datasets. Default page size is 6, and the maximum is 100.
+    While one of `reset_page_params` is set, a page beyond the last one falls back
+    to the first page, because the result set shrinks as the user types.
+    """
+    page_size = 6
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    reset_page_params = ['search', 'max_delivery_time']
+
+    def get_page_number(self, request, paginator):
+        page_number = super().get_page_number(request, paginator)
+        if not any(request.query_params.get(param, '').strip() for param in self.reset_page_params):
+            return page_number
+
+        try:
+            # The count is cached on the paginator and reused for the page itself
+            if int(page_number) > paginator.num_pages:
+                return 1
+        except ValueError:
+            pass  # Let the paginator handle 'last' and invalid input
+        return page_number
+
+
+class OfferCursorPagination(CursorPagination):
+    """
+    Keyset pagination for the offer catalog. Pages are addressed by an opaque
+    cursor instead of a page number, so the result set is never counted and
+    deep pages cost the same as the first one. Supports the default ordering
+    by `updated_at` and `ordering=min_price` (both indexed), each with the id
+    as tie-breaker.
     """
     page_size = 6
     page_size_query_param = 'page_size'
     max_page_size = 100
+    ordering = ('-updated_at', '-id')
 
+    def get_ordering(self, request, queryset, view):
+        ordering = tuple(super().get_ordering(request, queryset, view))
+        if not any(field.lstrip('-') == 'id' for field in ordering):
+            ordering += ('-id' if ordering[0].startswith('-') else 'id',)
+        return ordering
 
-class ReviewViewSet(viewsets.ModelViewSet):
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.get_ordering(request, queryset, view)[0].lstrip('-') == 'min_price':
+            # Offers without details have no price to build a cursor position from
+            queryset = queryset.filter(min_price__isnull=False)
+        return super().paginate_queryset(queryset, request, view)
+
+
+class OptionalCursorPaginationMixin:
+    """
+    Lets clients opt into `cursor_pagination_class` with `?pagination=cursor`,
+    while requests without the parameter keep the regular `pagination_class`.
+    """
+    cursor_pagination_class = None
+
+    @property
+    def paginator(self):
+        if not hasattr(self, '_paginator'):
+            if self.request.query_params.get('pagination') == 'cursor' and self.cursor_pagination_class:
+                self._paginator = self.cursor_pagination_class()
+            else:
+                self._paginator = super().paginator
+        return self._paginator
+
+
+class ReviewViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     """
     Handles CRUD operations for reviews. Reviews can only be created by authenticated
-    users with a customer profile.
+    users with a customer profile. GET supports conditional requests.
     """
     queryset = Review.objects.all()
     serializer_class = ReviewSerializer
@@ -171,145 +257,124 @@ class ReviewViewSet(viewsets.ModelViewSet):
         serializer.save(reviewer=user, business_user=business_user)
 
 
-class OfferDetailsViewSet(viewsets.ModelViewSet):
+class OfferDetailsViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     """
-    Handles CRUD operations for offer details. Accessible by any user.
+    Handles CRUD operations for offer details. Accessible by any user. GET
+    supports conditional requests.
     """
     queryset = OfferDetail.objects.all()
     serializer_class = OfferDetailSerializer
     permission_classes = [AllowAny]
 
 
-class OrderViewSet(viewsets.ModelViewSet):
+class OrderCursorPagination(CursorPagination):
+    """
+    Keyset pagination for the order history, newest first.
+    """
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    ordering = ('-created_at', '-id')
+
+
+class OrderViewSet(OptionalCursorPaginationMixin, viewsets.ModelViewSet):
     """
     Handles CRUD operations for orders. Only authenticated users can access.
+    Lists are unpaginated unless the client asks for `?pagination=cursor`, and
+    can be filtered by `?status=`.
     """
     queryset = Order.objects.all()
     serializer_class = OrderSerializer
     permission_classes = [IsAuthenticated]
     pagination_class = None  # Disable pagination
+    cursor_pagination_class = OrderCursorPagination
 
     def get_queryset(self):
         """
         Filters orders to include only those where the user is involved.
         """
         user = self.request.user
-        queryset = Order.objects.filter(
-            customer_user=user) | Order.objects.filter(business_user=user)
-        return queryset.order_by('-created_at')
+        customer_orders = Order.objects.filter(customer_user=user)
+        business_orders = Order.objects.filter(business_user=user)
 
-class OfferDetailView(APIView):
-    permission_classes = [IsAuthenticated, IsOwnerOrReadOnly]
+        order_status = self.request.query_params.get('status')
+        if order_status:
+            if order_status not in dict(Order.STATUS_CHOICES):
+                raise serializers.ValidationError({"status": [f"'{order_status}' is not a valid status."]})
+            customer_orders = customer_orders.filter(status=order_status)
+            business_orders = business_orders.filter(status=order_status)
 
-    def get_object(self, pk):
-        """
-        Holen Sie sich das Angebot anhand der ID.
-        """
-        try:
-            return Offer.objects.get(pk=pk)
-        except Offer.DoesNotExist:
-            raise Response({"detail": ["Angebot nicht gefunden."]}, status=status.HTTP_404_NOT_FOUND)
-        
-    def patch(self, request, pk, format=None):
-        """
-        Partielle Aktualisierung von Offer und OfferDetails.
-        """
-        offer = self.get_object(pk)
-
-        # Überprüfen, ob der angemeldete Benutzer der Eigentümer ist
-        if offer.user != request.user:
-            return Response({"detail": "Sie sind nicht der Eigentümer dieses Angebots."}, status=status.HTTP_403_FORBIDDEN)
-
-        # Angebot aktualisieren (nur Felder aus dem Payload)
-        offer_data = {key: value for key, value in request.data.items() if key != 'details'}
-        offer_serializer = OfferSerializer(offer, data=offer_data, partial=True)
-
-        if offer_serializer.is_valid():
-            offer_serializer.save()
-        else:
-            return Response(offer_serializer.errors, status=status.HTTP_400_BAD_REQUEST)
-
-        # Details aktualisieren (falls im Payload enthalten)
-        updated_details = []
-        details_data = request.data.get('details', [])
-
-        for detail_data in details_data:
-            offer_type = detail_data.get('offer_type')
-            if not offer_type:
-                return Response({"details": "Jedes Angebotsdetail muss einen 'offer_type' enthalten."}, status=status.HTTP_400_BAD_REQUEST)
+        # A UNION of two index range scans instead of an OR over both user columns
+        order_ids = customer_orders.values('pk').union(business_orders.values('pk'))
+        return Order.objects.filter(pk__in=order_ids).order_by('-created_at')
 
-            try:
-                # Bestehendes Detail aktualisieren
-                detail = OfferDetail.objects.get(offer=offer, offer_type=offer_type)
-                detail_serializer = OfferDetailSerializer(detail, data=detail_data, partial=True)
-                if detail_serializer.is_valid():
-                    detail_serializer.save()
-                    updated_detail = {key: detail_serializer.data[key] for key in detail_data.keys()}
-                    updated_detail['id'] = detail.id  # ID hinzufügen
-                    updated_details.append(updated_detail)
-                else:
-                    return Response(detail_serializer.errors, status=status.HTTP_400_BAD_REQUEST)
-            except OfferDetail.DoesNotExist:
-                # Neues Detail erstellen
-                detail_data['offer'] = offer.id
-                detail_serializer = OfferDetailSerializer(data=detail_data)
-                if detail_serializer.is_valid():
-                    detail_serializer.save()
-                    updated_detail = {key: detail_serializer.data[key] for key in detail_data.keys()}
-                    updated_detail['id'] = detail_serializer.instance.id  # ID hinzufügen
-                    updated_details.append(updated_detail)
-                else:
-                    return Response(detail_serializer.errors, status=status.HTTP_400_BAD_REQUEST)
-
-        # Response zurückgeben
-        offer_response = {key: offer_serializer.data[key] for key in offer_data.keys()}
-        offer_response['id'] = offer.id  # Offer-ID hinzufügen
-        if details_data:
-            offer_response['details'] = updated_details
-
-        return Response(offer_response, status=status.HTTP_200_OK)
-
-    def delete(self, request, pk, format=None):
+    def create(self, request, *args, **kwargs):
         """
-        Löschen Sie das Angebot nur, wenn der Benutzer der Eigentümer ist.
+        Create an order. With an `Idempotency-Key` header, retries of the same
+        request return the order created by the first one.
         """
-        offer = self.get_object(pk)
-        
-        # Überprüfen, ob der angemeldete Benutzer der Eigentümer des Angebots ist
-        if offer.user != request.user:
-            return Response({"detail": ["Sie sind nicht der Eigentümer dieses Angebots."]}, status=status.HTTP_403_FORBIDDEN)
-        
-        # Löschen des Angebots
-        offer.delete()
-        return Response(status=status.HTTP_204_NO_CONTENT)
-
-class OfferViewSet(viewsets.ModelViewSet):
+        key = request.headers.get('Idempotency-Key')
+        if key is None:
+            return super().create(request, *args, **kwargs)
+        if not key or len(key) > idempotency.MAX_KEY_LENGTH:
+            return Response({"detail": "Invalid Idempotency-Key."}, status=status.HTTP_400_BAD_REQUEST)
+
+        fingerprint = idempotency.get_fingerprint(request.data)
+        earlier = idempotency.lookup(request.user, 'order', key)
+        if earlier is not None:
+            return self.replay(request, fingerprint, earlier)
+        with transaction.atomic():
+            # A failed request rolls the key back, so the client can retry it
+            idempotency_key, claimed = idempotency.claim(request.user, 'order', key, fingerprint)
+            if not claimed:
+                return self.replay(request, fingerprint, idempotency_key)
+            response = super().create(request, *args, **kwargs)
+            idempotency.complete(idempotency_key, response.data['id'])
+        return response
+
+    def replay(self, request, fingerprint, idempotency_key):
+        if idempotency_key.fingerprint != fingerprint:
+            return Response({"detail": "Idempotency-Key was already used for a different request."},
+                            status=status.HTTP_422_UNPROCESSABLE_ENTITY)
+        order = get_object_or_404(Order, pk=idempotency_key.result_id)
+        return Response(self.get_serializer(order).data, status=status.HTTP_201_CREATED,
+                        headers={'Idempotent-Replayed': 'true'})
+
+
+class OfferViewSet(ConditionalGetMixin, OptionalCursorPaginationMixin, viewsets.ModelViewSet):
     """
-    Handles CRUD operations for offers.
+    Handles CRUD operations for offers. Lists are paginated by page number, or
+    by cursor with `?pagination=cursor`. GET supports conditional requests.
     """
     queryset = Offer.objects.all()
     serializer_class = OfferSerializer
     permission_classes = [IsBusinessUserOrReadOnly, IsOwnerOrReadOnly]
     pagination_class = LargeResultsSetPagination
+    cursor_pagination_class = OfferCursorPagination
     ordering_fields = ['updated_at', 'min_price']
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
-    search_fields = ['title', 'description']
+    # The list shows the names of the users, which are saved with their profile
+    last_modified_fields = ('updated_at', 'user__profile__updated_at')
+    # `search` is handled by the full-text index in get_queryset
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
 
     def get_queryset(self):
         queryset = super().get_queryset()
 
-        # Annotate the queryset with min_price and min_delivery_time
-        queryset = queryset.annotate(
-            min_price=Min('details__price'),
-            min_delivery_time=Min('details__delivery_time_in_days')
-        )
+        # min_price and min_delivery_time are indexed columns on Offer, so the
+        # filters and the ordering below do not need to aggregate the details
 
-        # Handle search filters
+        # Join the user and prefetch the details, so serializing a page runs
+        # a fixed number of queries regardless of the page size. The profile
+        # is joined for the validators, see last_modified_fields
+        queryset = queryset.select_related('user__profile').prefetch_related('details')
+
+        # Handle search through the full-text index, best matches first unless
+        # the client asks for another ordering
         search = self.request.query_params.get('search')
         if search:
-            queryset = queryset.filter(
-                Q(title__icontains=search) | Q(description__icontains=search)
-            )
+            queryset = search_offers(queryset, search)
+            if 'search_rank' in queryset.query.annotations:
+                queryset = queryset.order_by('search_rank', '-updated_at')
 
         # Additional filters for delivery time, price, etc.
         max_delivery_time = self.request.query_params.get('max_delivery_time')
@@ -339,27 +404,23 @@ class OfferViewSet(viewsets.ModelViewSet):
 
     def list(self, request, *args, **kwargs):
         """
-        Handles filtering, pagination, and optional removal of the `page` parameter.
+        Anonymous catalog requests are answered from the versioned response
+        cache, see coderr_app.catalog_cache.
         """
-        search_query = request.query_params.get('search', '').strip()
-        max_delivery_time = request.query_params.get('max_delivery_time', '').strip()
-        page = request.query_params.get('page', '').strip()
-        page = int(page) if page else 1
-
-        if not search_query and not max_delivery_time:
+        if not catalog_cache.is_cacheable(request):
             return super().list(request, *args, **kwargs)
 
-        # Execute the QuerySet to count the filtered results
-        filtered_queryset = self.filter_queryset(self.get_queryset())
-        total_results = filtered_queryset.count()
-        page_size = getattr(self.pagination_class(), 'page_size', 6)
+        key = catalog_cache.get_key(request)
+        cached = catalog_cache.get_data(key)
+        if cached is not None:
+            data, validators = cached
+            return self.check_not_modified(request, validators) or Response(data, headers={'X-Cache': 'HIT'})
 
-        if page > ceil(total_results / page_size):
-            request.query_params._mutable = True  # Set QueryDict to mutable
-            request.query_params.pop('page', 1)  # set `page` to 1
-            request.query_params._mutable = False  # Set QueryDict to unmutable again
-        
-        return super().list(request, *args, **kwargs)
+        response = super().list(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            catalog_cache.set_data(key, (response.data, self.validators))
+        response['X-Cache'] = 'MISS'
+        return response
 
     def create(self, request, *args, **kwargs):
         """
@@ -388,6 +449,25 @@ class OfferViewSet(viewsets.ModelViewSet):
         """
         serializer.save(user=self.request.user)
 
+    @action(detail=False, methods=['post'], url_path='import', url_name='import',
+            parser_classes=[SanitizingJSONParser, SanitizingNDJSONParser])
+    def import_offers(self, request):
+        """
+        Bulk import offers of the current user from a JSON array or NDJSON
+        (`Content-Type: application/x-ndjson`). Valid offers are created, the
+        others are reported with their index.
+        """
+        items = request.data
+        if not isinstance(items, list):
+            return Response({"detail": "Expected a JSON array or NDJSON of offers."},
+                            status=status.HTTP_400_BAD_REQUEST)
+        if len(items) > settings.OFFER_IMPORT_MAX_ITEMS:
+            return Response({"detail": f"At most {settings.OFFER_IMPORT_MAX_ITEMS} offers per import."},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        report = import_offers(items, request.user)
+        return Response(report, status=status.HTTP_201_CREATED if report['created'] else status.HTTP_400_BAD_REQUEST)
+
     def update(self, request, *args, **kwargs):
         """
         Custom PATCH method to return only the necessary fields in the response.
@@ -399,14 +479,17 @@ class OfferViewSet(viewsets.ModelViewSet):
         # Perform the update and return the custom response
         self.perform_update(serializer)
 
+        # The details were prefetched before they were updated
+        instance._prefetched_objects_cache = {}
 
         return Response(serializer.data)
     
 
 
-class ProfileViewSet(viewsets.ModelViewSet):
+class ProfileViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     """
     Handles CRUD operations for profiles. Only profile owners can update their profile.
+    GET supports conditional requests.
     """
     queryset = Profile.objects.all()
     serializer_class = ProfileSerializer
@@ -429,6 +512,9 @@ class ProfileViewSet(viewsets.ModelViewSet):
         """
         user_id = kwargs.get('pk')
         profile = get_object_or_404(Profile, user__id=user_id)
+        not_modified = self.check_not_modified(request, object_validators(profile))
+        if not_modified:
+            return not_modified
         serializer = ProfileSerializer(profile)
         return Response(serializer.data)
 
@@ -468,14 +554,85 @@ class ProfileViewSet(viewsets.ModelViewSet):
         return Response(profile_serializer.data)
 
 
-class BusinessProfilesView(APIView):
+class ProfileCursorPagination(CursorPagination):
+    """
+    Keyset pagination for the profile listings, ordered by the primary key.
+    """
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    ordering = 'id'
+
+
+class ProfileListMixin(ConditionalGetMixin):
+    """
+    List handling shared by the business and customer profile views.
+
+    Without parameters the full list is returned as before. `?pagination=cursor`
+    returns it page by page, and `?stream=json` or `?stream=ndjson` streams every
+    profile while reading them in chunks from the database, so memory stays flat
+    regardless of the number of profiles. Lists and single profiles support
+    conditional requests, streams do not.
+    """
+    stream_chunk_size = 500
+
+    def list_profiles(self, request, queryset, serializer_class):
+        queryset = queryset.select_related('user').order_by('id')
+
+        stream = request.query_params.get('stream')
+        if stream in ('json', 'ndjson'):
+            return self.stream_profiles(queryset, serializer_class, stream)
+
+        if request.query_params.get('pagination') == 'cursor':
+            paginator = ProfileCursorPagination()
+            page = paginator.paginate_queryset(queryset, request, view=self)
+            not_modified = self.check_not_modified(request, list_validators(page))
+            if not_modified:
+                return not_modified
+            serializer = serializer_class(page, many=True)
+            return paginator.get_paginated_response(serializer.data)
+
+        profiles = list(queryset)
+        not_modified = self.check_not_modified(request, list_validators(profiles))
+        if not_modified:
+            return not_modified
+        serializer = serializer_class(profiles, many=True)
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
+    def stream_profiles(self, queryset, serializer_class, stream):
+        def serialized_chunks():
+            profiles = queryset.iterator(chunk_size=self.stream_chunk_size)
+            while chunk := list(islice(profiles, self.stream_chunk_size)):
+                yield serializer_class(chunk, many=True).data
+
+        def ndjson():
+            for chunk in serialized_chunks():
+                yield ''.join(json.dumps(item, cls=JSONEncoder) + '\n' for item in chunk)
+
+        def json_array():
+            separator = '['
+            for chunk in serialized_chunks():
+                for item in chunk:
+                    yield separator + json.dumps(item, cls=JSONEncoder)
+                    separator = ','
+            yield '[]' if separator == '[' else ']'
+
+        if stream == 'ndjson':
+            return StreamingHttpResponse(ndjson(), content_type='application/x-ndjson')
+        return StreamingHttpResponse(json_array(), content_type='application/json')
+
+
+class BusinessProfilesView(ProfileListMixin, APIView):
     """
     Shows list or single business profiles.
     """
     def get(self, request, pk=None, *args, **kwargs):
         if pk:  # If a profile ID is provided, show details
             try:
-                profile = Profile.objects.get(user__pk=pk, type="business")
+                profile = Profile.objects.select_related('user').get(user__pk=pk, type="business")
+                not_modified = self.check_not_modified(request, object_validators(profile))
+                if not_modified:
+                    return not_modified
                 serializer = BusinessSerializer(profile)
                 return Response(serializer.data, status=status.HTTP_200_OK)
             except Profile.DoesNotExist:
@@ -483,11 +640,10 @@ class BusinessProfilesView(APIView):
 
         # Otherwise, list all business profiles
         business_profiles = Profile.objects.filter(type="business")
-        serializer = BusinessSerializer(business_profiles, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        return self.list_profiles(request, business_profiles, BusinessSerializer)
 
 
-class CustomerProfilesView(APIView):
+class CustomerProfilesView(ProfileListMixin, APIView):
     """
     Shows list or single customer profiles.
     """
@@ -495,13 +651,15 @@ class CustomerProfilesView(APIView):
     def get(self, request, pk=None, *args, **kwargs):
         if pk:  # If a profile ID is provided, show details
             try:
-                profile = Profile.objects.get(user__pk=pk, type="customer")
+                profile = Profile.objects.select_related('user').get(user__pk=pk, type="customer")
+                not_modified = self.check_not_modified(request, object_validators(profile))
+                if not_modified:
+                    return not_modified
                 serializer = CustomerSerializer(profile)
                 return Response(serializer.data, status=status.HTTP_200_OK)
             except Profile.DoesNotExist:
                 return Response({"detail": ["Profile not found"]}, status=status.HTTP_404_NOT_FOUND)
 
         # Otherwise, list all customer profiles
-        business_profiles = Profile.objects.filter(type="customer")
-        serializer = CustomerSerializer(business_profiles, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        customer_profiles = Profile.objects.filter(type="customer")
+        return self.list_profiles(request, customer_profiles, CustomerSerializer)
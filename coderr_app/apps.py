@@ -4,3 +4,12 @@ from django.apps import AppConfig
 class CoderrAppConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'coderr_app'
+
+    def ready(self):
+        # Register the signal handlers
+        from coderr_app import signals  # noqa: F401
+
+        from django.conf import settings
+        if settings.QUERY_STATS:
+            from coderr_project import querystats
+            querystats.install()
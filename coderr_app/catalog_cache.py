@@ -0,0 +1,109 @@
+"""
+Versioned response cache for the public offer catalog.
+
+Anonymous `GET /offers/` responses are cached under a key built from the
+normalized query string and the current catalog version. Every Offer,
+OfferDetail or User write bumps the version (see coderr_app.signals), so
+cached entries are never served once the catalog changed. Entries of old
+versions are simply never read again and are evicted by the size limit or
+the timeout of the cache backend.
+
+The entries live in the Django cache `settings.OFFER_CACHE_ALIAS`, by default
+a LocMemCache per process. The version lives in the cache
+`settings.OFFER_CACHE_VERSION_ALIAS`, which all workers must share (a file
+based cache by default), so a write handled by one worker invalidates the
+entries of all of them. Hits and misses are counted in the entry cache.
+"""
+
+import hashlib
+import time
+from urllib.parse import urlencode
+from django.conf import settings
+from django.core.cache import caches
+from coderr_project import metrics
+
+VERSION_KEY = 'offer-catalog:version'
+HITS_KEY = 'offer-catalog:hits'
+MISSES_KEY = 'offer-catalog:misses'
+
+
+def get_cache():
+    return caches[getattr(settings, 'OFFER_CACHE_ALIAS', 'offers')]
+
+
+def get_version_cache():
+    return caches[getattr(settings, 'OFFER_CACHE_VERSION_ALIAS', 'shared')]
+
+
+def get_version():
+    cache = get_version_cache()
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        # Start from the clock, so a lost version key never revives old entries
+        cache.add(VERSION_KEY, time.time_ns(), timeout=None)
+        version = cache.get(VERSION_KEY)
+    return version
+
+
+def bump_version():
+    # A new clock value rather than incr(), which file based caches do not do
+    # atomically: concurrent bumps must never end on a version already used
+    get_version_cache().set(VERSION_KEY, time.time_ns(), timeout=None)
+
+
+def is_cacheable(request):
+    """
+    Only anonymous GET requests are cached: no token and no session.
+    """
+    return (request.method == 'GET'
+            and 'HTTP_AUTHORIZATION' not in request.META
+            and settings.SESSION_COOKIE_NAME not in request.COOKIES)
+
+
+def get_key(request):
+    """
+    Cache key of the request for the current catalog version. The host is part
+    of the key because the pagination links are absolute URLs.
+    """
+    params = sorted((key, value) for key, values in request.GET.lists() for value in values)
+    digest = hashlib.sha1(f"{request.get_host()}?{urlencode(params)}".encode()).hexdigest()
+    return f'offer-catalog:{get_version()}:{digest}'
+
+
+def get_data(key):
+    """
+    The cached entry (response data and validators), or None on a miss.
+    Counts hits and misses.
+    """
+    data = get_cache().get(key)
+    _count(HITS_KEY if data is not None else MISSES_KEY)
+    metrics.registry.count_cache('offers', data is not None)
+    return data
+
+
+def set_data(key, data):
+    get_cache().set(key, data)
+
+
+def get_stats():
+    cache = get_cache()
+    hits = cache.get(HITS_KEY) or 0
+    misses = cache.get(MISSES_KEY) or 0
+    return {
+        'version': get_version_cache().get(VERSION_KEY),
+        'hits': hits,
+        'misses': misses,
+        'hit_ratio': round(hits / (hits + misses), 3) if hits + misses else None,
+    }
+
+
+def reset_stats():
+    get_cache().delete_many([HITS_KEY, MISSES_KEY])
+
+
+def _count(key):
+    cache = get_cache()
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, 1, timeout=None)
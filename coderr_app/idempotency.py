@@ -0,0 +1,64 @@
+"""
+Idempotency keys for POST requests.
+
+A client sends an `Idempotency-Key` header with a write and the same header
+when it retries. The first request stores the key with the id of the object it
+created, so retries within `settings.IDEMPOTENCY_KEY_TTL` seconds are answered
+with the original object instead of writing again.
+
+Keys are `IdempotencyKey` rows, unique per user and scope, and are inserted in
+the same transaction as the object. Every worker sees them, a request that
+fails rolls its key back, and a concurrent request with the same key waits for
+the first one on the unique constraint and then replays its result. Expired
+keys of a user are deleted whenever that user sends a key.
+"""
+
+import hashlib
+import json
+from datetime import timedelta
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from coderr_app.models import IdempotencyKey
+
+MAX_KEY_LENGTH = 255
+
+
+def get_fingerprint(data):
+    """
+    Short digest of the request data, to detect a key reused for another request.
+    """
+    payload = json.dumps(data, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha1(payload.encode()).hexdigest()[:16]
+
+
+def get_cutoff():
+    return timezone.now() - timedelta(seconds=settings.IDEMPOTENCY_KEY_TTL)
+
+
+def lookup(user, scope, key):
+    """
+    The unexpired key of an earlier request, or None. Retries are answered
+    from it without a write.
+    """
+    return IdempotencyKey.objects.filter(user=user, scope=scope, key=key, created_at__gte=get_cutoff()).first()
+
+
+def claim(user, scope, key, fingerprint):
+    """
+    Claim the key for a new request. Must run in the transaction that creates
+    the object. Returns the new key and True, or the key of a concurrent
+    request that committed first and False.
+    """
+    # Expired keys of the user, an expired earlier use of this key included
+    IdempotencyKey.objects.filter(user=user, scope=scope, created_at__lt=get_cutoff()).delete()
+    try:
+        with transaction.atomic():
+            return IdempotencyKey.objects.create(user=user, scope=scope, key=key, fingerprint=fingerprint), True
+    except IntegrityError:
+        return IdempotencyKey.objects.get(user=user, scope=scope, key=key), False
+
+
+def complete(idempotency_key, result):
+    idempotency_key.result_id = result
+    idempotency_key.save(update_fields=['result_id'])
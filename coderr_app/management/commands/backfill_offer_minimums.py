@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+from coderr_app.models import Offer
+
+
+class Command(BaseCommand):
+    """
+    Recomputes the denormalized min_price and min_delivery_time of all offers.
+    """
+    help = "Backfill Offer.min_price and Offer.min_delivery_time from the offer details."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help="Number of offers updated per statement.")
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        offer_ids = list(Offer.objects.order_by('pk').values_list('pk', flat=True))
+
+        updated = 0
+        for start in range(0, len(offer_ids), batch_size):
+            updated += Offer.refresh_detail_minimums(offer_ids[start:start + batch_size])
+
+        self.stdout.write(self.style.SUCCESS(f"Updated {updated} offers."))
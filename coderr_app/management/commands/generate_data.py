@@ -0,0 +1,222 @@
+import hashlib
+import itertools
+import random
+import time
+from decimal import Decimal
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from rest_framework.authtoken.models import Token
+from coderr_app import catalog_cache
+from coderr_app.models import Offer, OfferDetail, Order, PlatformStatistics, Profile, Review
+
+FIRST_NAMES = ['Anna', 'Ben', 'Clara', 'David', 'Elif', 'Felix', 'Greta', 'Hannes', 'Ida', 'Jonas',
+               'Lea', 'Mehmet', 'Nina', 'Oskar', 'Paula', 'Sven', 'Tara', 'Yusuf']
+LAST_NAMES = ['Becker', 'Fischer', 'Hoffmann', 'Kaya', 'Koch', 'Meyer', 'Müller', 'Neumann',
+              'Richter', 'Schmidt', 'Schneider', 'Schulz', 'Wagner', 'Weber', 'Yilmaz']
+CITIES = ['Berlin', 'Hamburg', 'München', 'Köln', 'Frankfurt', 'Stuttgart', 'Leipzig', 'Dresden']
+TOPICS = ['Webseite', 'Logo Design', 'Onlineshop', 'App Entwicklung', 'SEO Optimierung', 'Texterstellung',
+          'Videoschnitt', 'Social Media', 'Datenbank', 'Übersetzung', 'Fotografie', 'Buchhaltung']
+FEATURES = ['Startseite', 'Kontaktformular', 'Responsive Design', 'Quellcode', 'Hosting', 'Support',
+            'Druckdateien', 'Logo Varianten', 'Analyse', 'Schulung']
+TIERS = [('basic', Decimal('1.0'), 1.0), ('standard', Decimal('1.8'), 0.7), ('premium', Decimal('3.0'), 0.5)]
+TIER_WEIGHTS = [50, 35, 15]
+ORDER_STATUSES = [('in_progress', 20), ('completed', 70), ('cancelled', 10)]
+RATING_WEIGHTS = [3, 5, 12, 35, 45]  # 1 to 5 stars
+GUESTS = [
+    ('Anbieter', 'Michael', 'Schmidt', 'michael@example.com', 'business'),
+    ('Kunde', 'Maria', 'Müller', 'maria@example.com', 'customer'),
+]
+
+
+def power_law_weights(count, exponent):
+    """
+    Cumulative Zipf weights of ranks 1..count, for random.choices(cum_weights=...).
+    """
+    return list(itertools.accumulate(1 / rank ** exponent for rank in range(1, count + 1)))
+
+
+class Command(BaseCommand):
+    """
+    Generates a reproducible synthetic dataset for development and load tests.
+
+    The same seed and options always produce the same data. Offers per business
+    user and orders per offer follow power laws, like real marketplaces where a
+    few sellers and offers get most of the traffic. All rows are written with
+    bulk_create in chunks, and all synthetic users share one password hash,
+    computed once. Since bulk_create sends no signals, the offer minimums are
+    set before the insert and the platform statistics are recounted at the end.
+    """
+    help = "Generate a reproducible synthetic dataset (users, profiles, offers, orders, reviews)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--businesses', type=int, default=200)
+        parser.add_argument('--customers', type=int, default=2000)
+        parser.add_argument('--offers', type=int, default=2000)
+        parser.add_argument('--orders', type=int, default=10000)
+        parser.add_argument('--reviews', type=int, default=5000)
+        parser.add_argument('--offer-exponent', type=float, default=1.1,
+                            help="Power-law exponent of the offers per business user.")
+        parser.add_argument('--order-exponent', type=float, default=1.2,
+                            help="Power-law exponent of the orders per offer.")
+        parser.add_argument('--password', default='password123', help="Password of all synthetic users.")
+        parser.add_argument('--prefix', default='gen', help="Prefix of the synthetic usernames.")
+        parser.add_argument('--chunk-size', type=int, default=5000, help="Rows written per transaction.")
+        parser.add_argument('--no-guests', action='store_true',
+                            help="Do not create the guest accounts of the frontend.")
+
+    def handle(self, *args, **options):
+        if User.objects.filter(username__startswith=f"{options['prefix']}_").exists():
+            raise CommandError(f"Users with the prefix '{options['prefix']}' exist, choose another --prefix.")
+        if options['businesses'] < 1 and (options['offers'] or options['orders'] or options['reviews']):
+            raise CommandError("Offers, orders and reviews need at least one business user.")
+        if options['customers'] < 1 and (options['orders'] or options['reviews']):
+            raise CommandError("Orders and reviews need at least one customer user.")
+
+        self.seed = options['seed']
+        self.rng = random.Random(self.seed)
+        self.chunk_size = options['chunk_size']
+        self.password = make_password(options['password'])
+        started = time.perf_counter()
+
+        business_ids = self.create_users(options['prefix'], 'business', options['businesses'])
+        customer_ids = self.create_users(options['prefix'], 'customer', options['customers'])
+        details = self.create_offers(business_ids, options['offers'], options['offer_exponent'])
+        self.create_orders(customer_ids, details, options['orders'], options['order_exponent'])
+        self.create_reviews(business_ids, customer_ids, options['reviews'], options['offer_exponent'])
+        if not options['no_guests']:
+            self.create_guests()
+
+        # The counters are maintained by signals, which bulk_create does not send
+        PlatformStatistics.objects.filter(pk=PlatformStatistics.load().pk).update(**PlatformStatistics.recount())
+        catalog_cache.bump_version()
+        self.stdout.write(self.style.SUCCESS(f"Done in {time.perf_counter() - started:.1f}s."))
+
+    def bulk_create(self, model, objects):
+        """
+        Insert the objects in chunks, one transaction each, and return them with their ids.
+        """
+        created = []
+        started = time.perf_counter()
+        objects = iter(objects)
+        while chunk := list(itertools.islice(objects, self.chunk_size)):
+            with transaction.atomic():
+                created += model.objects.bulk_create(chunk)
+        self.stdout.write(f"{model._meta.verbose_name_plural}: {len(created)} in {time.perf_counter() - started:.1f}s")
+        return created
+
+    def create_users(self, prefix, profile_type, count):
+        rng = self.rng
+        users = self.bulk_create(User, (
+            User(username=f'{prefix}_{profile_type}_{i}', password=self.password,
+                 first_name=rng.choice(FIRST_NAMES), last_name=rng.choice(LAST_NAMES),
+                 email=f'{prefix}_{profile_type}_{i}@example.com')
+            for i in range(count)))
+        self.bulk_create(Profile, (
+            Profile(user_id=user.pk, type=profile_type, email=user.email, location=rng.choice(CITIES),
+                    description=f'{user.first_name} {user.last_name}', working_hours='9-17',
+                    tel=f'0{rng.randrange(10**9, 10**10)}')
+            for user in users))
+        # Deterministic keys, so load tests can be scripted against a seed
+        self.bulk_create(Token, (
+            Token(key=hashlib.sha1(f'{self.seed}:{user.username}'.encode()).hexdigest(), user_id=user.pk)
+            for user in users))
+        return [user.pk for user in users]
+
+    def create_offers(self, business_ids, count, exponent):
+        """
+        Create `count` offers with their three details and return the details
+        as (business_user_id, OfferDetail) for the orders.
+        """
+        if not count:
+            return []
+        rng = self.rng
+        owners = business_ids[:]
+        rng.shuffle(owners)
+        owners = rng.choices(owners, cum_weights=power_law_weights(len(owners), exponent), k=count)
+
+        built = []
+        for i, owner in enumerate(owners):
+            topic = rng.choice(TOPICS)
+            base_price = Decimal(rng.randrange(30, 800))
+            base_days = rng.randint(5, 30)
+            offer = Offer(user_id=owner, title=f'{topic} {i + 1}',
+                          description=f'{topic} vom Profi, schnell und zuverlässig.')
+            offer_details = [
+                OfferDetail(title=f'{topic} {offer_type.capitalize()}', revisions=rng.choice([1, 2, 3, 5, -1]),
+                            delivery_time_in_days=max(1, round(base_days * days_factor)),
+                            price=base_price * price_factor, features=rng.sample(FEATURES, 2 + j),
+                            offer_type=offer_type)
+                for j, (offer_type, price_factor, days_factor) in enumerate(TIERS)
+            ]
+            offer.set_detail_minimums(offer_details)
+            built.append((offer, offer_details))
+
+        offers = self.bulk_create(Offer, (offer for offer, _ in built))
+        for offer, offer_details in built:
+            for detail in offer_details:
+                detail.offer_id = offer.pk
+        self.bulk_create(OfferDetail, (detail for _, offer_details in built for detail in offer_details))
+        return [[(offer.user_id, detail) for detail in offer_details] for offer, offer_details in built]
+
+    def create_orders(self, customer_ids, details, count, exponent):
+        if not details or not count:
+            return
+        rng = self.rng
+        offers = details[:]
+        rng.shuffle(offers)
+        ordered_offers = rng.choices(offers, cum_weights=power_law_weights(len(offers), exponent), k=count)
+        tiers = rng.choices(range(len(TIERS)), weights=TIER_WEIGHTS, k=count)
+        statuses = rng.choices([status for status, _ in ORDER_STATUSES],
+                               weights=[weight for _, weight in ORDER_STATUSES], k=count)
+
+        def orders():
+            for offer_details, tier, status in zip(ordered_offers, tiers, statuses):
+                business_id, detail = offer_details[tier]
+                yield Order(customer_user_id=rng.choice(customer_ids), business_user_id=business_id,
+                            title=detail.title, revisions=detail.revisions,
+                            delivery_time_in_days=detail.delivery_time_in_days, price=detail.price,
+                            features=detail.features, offer_type=detail.offer_type, status=status)
+
+        self.bulk_create(Order, orders())
+
+    def create_reviews(self, business_ids, customer_ids, count, exponent):
+        """
+        At most one review per customer and business user, like the API allows.
+        """
+        count = min(count, len(business_ids) * len(customer_ids))
+        if not count:
+            return
+        rng = self.rng
+        businesses = business_ids[:]
+        rng.shuffle(businesses)
+        weights = power_law_weights(len(businesses), exponent)
+
+        if count * 2 > len(business_ids) * len(customer_ids):
+            # Dense: most pairs get a review, sampling them directly is faster
+            pairs = rng.sample(list(itertools.product(business_ids, customer_ids)), count)
+        else:
+            pairs = set()
+            while len(pairs) < count:
+                for business_id in rng.choices(businesses, cum_weights=weights, k=count - len(pairs)):
+                    pairs.add((business_id, rng.choice(customer_ids)))
+
+        self.bulk_create(Review, (
+            Review(business_user_id=business_id, reviewer_id=reviewer_id,
+                   rating=rng.choices(range(1, 6), weights=RATING_WEIGHTS)[0],
+                   description='Sehr zufrieden.' if reviewer_id % 2 else 'Gerne wieder.')
+            for business_id, reviewer_id in sorted(pairs)))
+
+    def create_guests(self):
+        """
+        The guest accounts of the frontend login, with password 123456.
+        """
+        password = make_password('123456')
+        for username, first_name, last_name, email, profile_type in GUESTS:
+            user, created = User.objects.get_or_create(username=username, defaults={
+                'first_name': first_name, 'last_name': last_name, 'email': email, 'password': password})
+            if created:
+                Profile.objects.create(user=user, type=profile_type, email=email)
+            Token.objects.get_or_create(user=user)
@@ -0,0 +1,45 @@
+import json
+import sys
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.exceptions import ParseError
+from coderr_app.offer_import import DEFAULT_CHUNK_SIZE, import_offers, read_offers
+
+
+class Command(BaseCommand):
+    """
+    Imports offers of a business user from a JSON array or NDJSON file, with
+    the same validation as POST /offers/import/.
+    """
+    help = "Bulk import offers from a JSON array or NDJSON file ('-' reads stdin)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('file')
+        parser.add_argument('--user', required=True, help="Username of the business user owning the offers.")
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+                            help="Offers written per transaction.")
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.select_related('profile').get(username=options['user'])
+        except User.DoesNotExist:
+            raise CommandError(f"User {options['user']} does not exist.")
+        if getattr(getattr(user, 'profile', None), 'type', None) != 'business':
+            raise CommandError("Offers can only be imported for business users.")
+
+        try:
+            if options['file'] == '-':
+                items = read_offers(sys.stdin)
+            else:
+                with open(options['file'], encoding='utf-8') as stream:
+                    items = read_offers(stream)
+        except (OSError, ValueError, ParseError) as exc:
+            raise CommandError(f"Cannot read {options['file']}: {exc}")
+        if not isinstance(items, list):
+            raise CommandError("Expected a JSON array or NDJSON of offers.")
+
+        report = import_offers(items, user, chunk_size=options['chunk_size'])
+        for error in report['errors']:
+            self.stdout.write(self.style.WARNING(f"Offer {error['index']}: {json.dumps(error['errors'])}"))
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {len(report['created'])} offers, rejected {len(report['errors'])}."))
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+from coderr_app import catalog_cache
+
+
+class Command(BaseCommand):
+    """
+    Reports or resets the offer catalog response cache. With the per-process
+    LocMemCache backend this command only sees its own, empty cache; use a
+    shared backend (file or database) to inspect the running workers.
+    """
+    help = "Show the hit/miss counters of the offer catalog cache, or invalidate it."
+
+    def add_arguments(self, parser):
+        parser.add_argument('action', choices=['stats', 'clear'], nargs='?', default='stats')
+
+    def handle(self, *args, **options):
+        if options['action'] == 'clear':
+            catalog_cache.bump_version()
+            catalog_cache.reset_stats()
+            self.stdout.write(self.style.SUCCESS("Offer catalog cache invalidated."))
+            return
+
+        for name, value in catalog_cache.get_stats().items():
+            self.stdout.write(f"{name}: {value}")
@@ -0,0 +1,86 @@
+import io
+import pstats
+from collections import Counter
+from datetime import datetime
+from django.core.management.base import BaseCommand, CommandError
+from coderr_project import profiling
+
+SORT_KEYS = ['cumulative', 'tottime', 'ncalls', 'filename']
+
+
+class Command(BaseCommand):
+    """
+    Inspects the request profiles stored by ProfilingMiddleware.
+
+    `list` shows the stored profiles, `show <id>` the hottest functions and
+    the queries of one profile, `aggregate` the hottest functions over all
+    profiles (or those of one route), e.g. to find the serializer methods
+    that dominate `offer-list`. `clear` deletes all profiles.
+    """
+    help = "List, show, aggregate or clear the stored request profiles."
+
+    def add_arguments(self, parser):
+        parser.add_argument('action', choices=['list', 'show', 'aggregate', 'clear'], nargs='?', default='list')
+        parser.add_argument('profile_id', nargs='?', help="Profile to show.")
+        parser.add_argument('--route', help="Only profiles of this route, e.g. offer-list.")
+        parser.add_argument('--sort', choices=SORT_KEYS, default='cumulative')
+        parser.add_argument('--limit', type=int, default=30, help="Number of functions to show.")
+        parser.add_argument('--filter', dest='pattern',
+                            help="Only functions whose file or name matches this regular expression, e.g. coderr_app.")
+
+    def handle(self, *args, **options):
+        metas = [profiling.load_meta(profile_id) for profile_id in profiling.get_profile_ids()]
+        if options['route']:
+            metas = [meta for meta in metas if meta['route'] == options['route']]
+
+        if options['action'] == 'clear':
+            for meta in metas:
+                profiling.delete(meta['id'])
+            self.stdout.write(self.style.SUCCESS(f"Deleted {len(metas)} profiles."))
+        elif options['action'] == 'list':
+            self.list(metas)
+        elif options['action'] == 'show':
+            if not options['profile_id']:
+                raise CommandError("Give the id of the profile to show.")
+            try:
+                meta = profiling.load_meta(options['profile_id'])
+            except FileNotFoundError:
+                raise CommandError(f"No profile {options['profile_id']}.")
+            self.show(meta, options)
+        else:
+            if not metas:
+                raise CommandError("No profiles stored.")
+            self.aggregate(metas, options)
+
+    def list(self, metas):
+        for meta in metas:
+            created = datetime.fromtimestamp(meta['created']).strftime('%Y-%m-%d %H:%M:%S')
+            self.stdout.write(f"{meta['id']}  {created}  {meta['method']:<6} {meta['status']}  "
+                              f"{meta['duration_ms']:>8}ms {len(meta['queries']):>4} queries  {meta['url']}")
+        self.stdout.write(f"{len(metas)} profiles.")
+
+    def show(self, meta, options):
+        self.stdout.write(f"{meta['method']} {meta['url']} ({meta['route']}): {meta['status']} in "
+                          f"{meta['duration_ms']}ms, {len(meta['queries'])} queries")
+        self.print_stats([meta], options)
+        for query in meta['queries']:
+            self.stdout.write(f"{query['ms']:>8}ms  {query['sql']}")
+
+    def aggregate(self, metas, options):
+        durations = sorted(meta['duration_ms'] for meta in metas)
+        self.stdout.write(f"{len(metas)} profiles, median {durations[len(durations) // 2]}ms, "
+                          f"max {durations[-1]}ms")
+        self.print_stats(metas, options)
+        queries = Counter(query['sql'] for meta in metas for query in meta['queries'])
+        self.stdout.write("Most frequent queries:")
+        for sql, count in queries.most_common(10):
+            self.stdout.write(f"{count / len(metas):>8.1f}x  {sql}")
+
+    def print_stats(self, metas, options):
+        output = io.StringIO()
+        stats = pstats.Stats(*(str(profiling.get_stats_path(meta['id'])) for meta in metas), stream=output)
+        if options['pattern']:
+            stats.sort_stats(options['sort']).print_stats(options['pattern'], options['limit'])
+        else:
+            stats.strip_dirs().sort_stats(options['sort']).print_stats(options['limit'])
+        self.stdout.write(output.getvalue())
@@ -0,0 +1,36 @@
+import os
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from coderr_project import querystats
+
+
+class Command(BaseCommand):
+    """
+    Shows the SQL fingerprints collected with QUERY_STATS=1, most expensive
+    first. A fingerprint with many calls per request and a small mean is an
+    N+1 query, one with a large mean a query that needs an index or rewrite.
+    """
+    help = "Show the SQL fingerprints with the highest total time, or clear the statistics."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--path', default=settings.QUERY_STATS_PATH, help="Statistics file.")
+        parser.add_argument('--route', help="Only queries of this route, e.g. offer-list; '-' for non-requests.")
+        parser.add_argument('--sort', choices=['total_ms', 'mean_ms', 'max_ms', 'calls'], default='total_ms')
+        parser.add_argument('--limit', type=int, default=20)
+        parser.add_argument('--width', type=int, default=160, help="Truncate the SQL to this many characters.")
+        parser.add_argument('--clear', action='store_true', help="Delete all statistics.")
+
+    def handle(self, *args, **options):
+        if not os.path.exists(options['path']):
+            raise CommandError(f"No statistics in {options['path']}, run the server with QUERY_STATS=1.")
+        if options['clear']:
+            querystats.clear(options['path'])
+            self.stdout.write(self.style.SUCCESS("Query statistics cleared."))
+            return
+
+        rows = querystats.load(options['path'], options['route'], options['sort'], options['limit'])
+        self.stdout.write(f"{'total ms':>12}{'calls':>9}{'mean ms':>10}{'max ms':>10}  {'route':<24}sql")
+        for sql, route, calls, total_ms, max_ms in rows:
+            if len(sql) > options['width']:
+                sql = sql[:options['width'] - 3] + '...'
+            self.stdout.write(f"{total_ms:>12.1f}{calls:>9}{total_ms / calls:>10.2f}{max_ms:>10.2f}  {route:<24}{sql}")
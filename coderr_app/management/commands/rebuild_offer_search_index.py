@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand, CommandError
+from coderr_app import search
+
+
+class Command(BaseCommand):
+    """
+    Rebuilds the full-text index over offer titles and descriptions.
+    """
+    help = "Rebuild the FTS5 search index of the offers."
+
+    def handle(self, *args, **options):
+        if not search.is_available():
+            raise CommandError("The full-text index is only available on SQLite.")
+
+        search.rebuild_index()
+        self.stdout.write(self.style.SUCCESS("Offer search index rebuilt."))
@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from coderr_app.models import PlatformStatistics
+
+
+class Command(BaseCommand):
+    """
+    Verifies the incrementally maintained platform statistics against a full
+    recount and repairs any drift.
+    """
+    help = "Compare the /base-info/ counters with a full recount and repair drift."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true',
+                            help="Only report drift, do not repair it.")
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            statistics = PlatformStatistics.load()
+            expected = PlatformStatistics.recount()
+
+            drift = {
+                field: (getattr(statistics, field), value)
+                for field, value in expected.items()
+                if getattr(statistics, field) != value
+            }
+            if not drift:
+                self.stdout.write(self.style.SUCCESS("Statistics are consistent."))
+                return
+
+            for field, (stored, value) in drift.items():
+                self.stdout.write(f"{field}: stored {stored}, counted {value}")
+
+            if options['dry_run']:
+                self.stdout.write(self.style.WARNING("Drift found, nothing repaired (dry run)."))
+                return
+
+            PlatformStatistics.objects.filter(pk=statistics.pk).update(**expected)
+        self.stdout.write(self.style.SUCCESS("Statistics repaired."))
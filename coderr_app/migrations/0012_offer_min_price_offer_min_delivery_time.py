@@ -0,0 +1,35 @@
+# Generated by Django 5.1.3 on 2026-10-17 06:15
+
+from django.db import migrations, models
+from django.db.models import Min, OuterRef, Subquery
+
+
+def backfill_detail_minimums(apps, schema_editor):
+    Offer = apps.get_model('coderr_app', 'Offer')
+    OfferDetail = apps.get_model('coderr_app', 'OfferDetail')
+    details = OfferDetail.objects.filter(offer=OuterRef('pk')).order_by().values('offer')
+    Offer.objects.update(
+        min_price=Subquery(details.annotate(value=Min('price')).values('value')),
+        min_delivery_time=Subquery(details.annotate(value=Min('delivery_time_in_days')).values('value')),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('coderr_app', '0011_alter_offer_description_alter_offer_title'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='offer',
+            name='min_delivery_time',
+            field=models.PositiveIntegerField(blank=True, db_index=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='offer',
+            name='min_price',
+            field=models.DecimalField(blank=True, db_index=True, decimal_places=2, max_digits=10, null=True),
+        ),
+        migrations.RunPython(backfill_detail_minimums, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,63 @@
+# Creates the SQLite FTS5 index used by coderr_app.search
+
+from django.db import migrations
+
+
+CREATE_SQL = [
+    """
+    CREATE VIRTUAL TABLE coderr_app_offer_fts USING fts5(
+        title, description,
+        content='coderr_app_offer', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER coderr_app_offer_fts_insert AFTER INSERT ON coderr_app_offer BEGIN
+        INSERT INTO coderr_app_offer_fts(rowid, title, description)
+        VALUES (new.id, new.title, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER coderr_app_offer_fts_delete AFTER DELETE ON coderr_app_offer BEGIN
+        INSERT INTO coderr_app_offer_fts(coderr_app_offer_fts, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER coderr_app_offer_fts_update AFTER UPDATE OF title, description ON coderr_app_offer BEGIN
+        INSERT INTO coderr_app_offer_fts(coderr_app_offer_fts, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+        INSERT INTO coderr_app_offer_fts(rowid, title, description)
+        VALUES (new.id, new.title, new.description);
+    END
+    """,
+    "INSERT INTO coderr_app_offer_fts(coderr_app_offer_fts) VALUES ('rebuild')",
+]
+
+DROP_SQL = [
+    "DROP TRIGGER IF EXISTS coderr_app_offer_fts_update",
+    "DROP TRIGGER IF EXISTS coderr_app_offer_fts_delete",
+    "DROP TRIGGER IF EXISTS coderr_app_offer_fts_insert",
+    "DROP TABLE IF EXISTS coderr_app_offer_fts",
+]
+
+
+def run_sql(statements):
+    def run(apps, schema_editor):
+        # FTS5 is SQLite specific, other backends use the icontains fallback
+        if schema_editor.connection.vendor != 'sqlite':
+            return
+        for statement in statements:
+            schema_editor.execute(statement)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('coderr_app', '0012_offer_min_price_offer_min_delivery_time'),
+    ]
+
+    operations = [
+        migrations.RunPython(run_sql(CREATE_SQL), run_sql(DROP_SQL)),
+    ]
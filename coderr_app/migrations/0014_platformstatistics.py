@@ -0,0 +1,44 @@
+# Generated by Django 5.1.3 on 2026-10-17 06:17
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def create_statistics(apps, schema_editor):
+    PlatformStatistics = apps.get_model('coderr_app', 'PlatformStatistics')
+    Review = apps.get_model('coderr_app', 'Review')
+    Profile = apps.get_model('coderr_app', 'Profile')
+    Offer = apps.get_model('coderr_app', 'Offer')
+    reviews = Review.objects.aggregate(review_count=Count('id'), rating_sum=Sum('rating'))
+    PlatformStatistics.objects.create(
+        pk=1,
+        review_count=reviews['review_count'],
+        rating_sum=reviews['rating_sum'] or 0,
+        business_profile_count=Profile.objects.filter(type='business').count(),
+        offer_count=Offer.objects.count(),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('coderr_app', '0013_offer_fts'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PlatformStatistics',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('review_count', models.PositiveIntegerField(default=0)),
+                ('rating_sum', models.PositiveBigIntegerField(default=0)),
+                ('business_profile_count', models.PositiveIntegerField(default=0)),
+                ('offer_count', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name_plural': 'platform statistics',
+            },
+        ),
+        migrations.RunPython(create_statistics, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.1.3 on 2026-10-17 07:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('coderr_app', '0015_order_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='offerdetail',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='profile',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.1.3 on 2026-10-17 07:21
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def check_duplicate_details(apps, schema_editor):
+    """
+    Stop before adding the constraint if an offer has several details of one
+    type. Which of them is right cannot be decided here, so they are listed
+    for the operator to resolve, e.g. in the admin, instead of being deleted.
+    """
+    OfferDetail = apps.get_model('coderr_app', 'OfferDetail')
+
+    duplicates = list(OfferDetail.objects.filter(offer__isnull=False).order_by()
+                      .values('offer', 'offer_type').annotate(total=Count('id')).filter(total__gt=1)
+                      .order_by('offer', 'offer_type'))
+    if not duplicates:
+        return
+
+    lines = []
+    for duplicate in duplicates:
+        ids = OfferDetail.objects.filter(
+            offer=duplicate['offer'], offer_type=duplicate['offer_type']).order_by('id').values_list('id', flat=True)
+        lines.append(f"  offer {duplicate['offer']}, {duplicate['offer_type']}: details {', '.join(map(str, ids))}")
+    raise RuntimeError(
+        "Offers with several details of the same type, keep one detail per offer and type and migrate again:\n"
+        + '\n'.join(lines))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('coderr_app', '0016_profile_updated_at_offerdetail_updated_at'),
+    ]
+
+    operations = [
+        migrations.RunPython(check_duplicate_details, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='offerdetail',
+            constraint=models.UniqueConstraint(fields=('offer', 'offer_type'), name='offerdetail_offer_type_unique'),
+        ),
+    ]
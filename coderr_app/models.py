@@ -1,4 +1,7 @@
 from django.db import models
+from django.db.models import Count, F, Min, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import Greatest
+from django.utils import timezone
 from django.contrib.auth.models import User
 from django.core.validators import MinValueValidator, MaxValueValidator
 
@@ -53,9 +56,29 @@ class Order(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            # Order history of a customer, newest first
+            models.Index(fields=['customer_user', 'created_at'], name='order_customer_created_idx'),
+            # Order history and status counts of a business user
+            models.Index(fields=['business_user', 'status', 'created_at'], name='order_business_status_idx'),
+        ]
+
     def __str__(self):
         return f"Order #{self.id} - {self.title} ({self.get_status_display()})"
 
+    @classmethod
+    def count_by_status(cls, business_user_ids):
+        """
+        Count the orders of every status for each of the given business users in
+        one grouped query. Users without a profile are missing from the result.
+        """
+        counts = Profile.objects.filter(user_id__in=business_user_ids).values('user_id').annotate(**{
+            status: Count('user__business_orders', filter=Q(user__business_orders__status=status))
+            for status, _ in cls.STATUS_CHOICES
+        })
+        return {row.pop('user_id'): row for row in counts}
+
 
 class Profile(models.Model):
     """
@@ -75,6 +98,7 @@ class Profile(models.Model):
         max_length=8, choices=TYPE_CHOICES, blank=True, null=True)
     email = models.EmailField()
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
 
 class Offer(models.Model):
@@ -86,12 +110,40 @@ class Offer(models.Model):
     title = models.CharField(max_length=255)
     image = models.FileField(upload_to='offer_images/', blank=True, null=True)
     description = models.TextField(max_length=255)
+    # Denormalized from the details, kept up to date by coderr_app.signals
+    min_price = models.DecimalField(
+        max_digits=10, decimal_places=2, blank=True, null=True, db_index=True)
+    min_delivery_time = models.PositiveIntegerField(blank=True, null=True, db_index=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return f"{self.title} ({self.pk})"
 
+    def set_detail_minimums(self, details):
+        """
+        Set min_price and min_delivery_time from details in memory, for writes
+        that bypass the detail signals (bulk_create, bulk_update).
+        """
+        details = list(details)
+        self.min_price = min((detail.price for detail in details), default=None)
+        self.min_delivery_time = min((detail.delivery_time_in_days for detail in details), default=None)
+
+    @classmethod
+    def refresh_detail_minimums(cls, offer_ids):
+        """
+        Recompute min_price and min_delivery_time of the given offers from their
+        details in a single UPDATE. A detail change counts as a change of the
+        offer, so updated_at is touched as well.
+        """
+        details = OfferDetail.objects.filter(offer=OuterRef('pk')).order_by().values('offer')
+        return cls.objects.filter(pk__in=offer_ids).update(
+            updated_at=timezone.now(),
+            min_price=Subquery(details.annotate(value=Min('price')).values('value')),
+            min_delivery_time=Subquery(
+                details.annotate(value=Min('delivery_time_in_days')).values('value')),
+        )
+
 
 class OfferDetail(models.Model):
     """
@@ -109,6 +161,97 @@ class OfferDetail(models.Model):
     price = models.DecimalField(max_digits=10, decimal_places=2)
     features = models.JSONField()  # Speichert eine Liste von Features als JSON
     offer_type = models.CharField(max_length=10, choices=OFFER_TYPE_CHOICES)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            # One detail per tier, details are upserted by their type
+            models.UniqueConstraint(fields=['offer', 'offer_type'], name='offerdetail_offer_type_unique'),
+        ]
 
     def __str__(self):
         return f"{self.id} {self.title} ({self.offer_type}) - {self.price}€"
+
+
+class PlatformStatistics(models.Model):
+    """
+    Single row holding the platform statistics shown by /base-info/. The counters
+    are maintained incrementally by coderr_app.signals, so reading them is O(1).
+    `reconcile_statistics` compares them with a full recount and repairs drift.
+    """
+    SINGLETON_PK = 1
+
+    review_count = models.PositiveIntegerField(default=0)
+    rating_sum = models.PositiveBigIntegerField(default=0)
+    business_profile_count = models.PositiveIntegerField(default=0)
+    offer_count = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name_plural = 'platform statistics'
+
+    def __str__(self):
+        return f"{self.review_count} reviews, {self.business_profile_count} businesses, {self.offer_count} offers"
+
+    @property
+    def average_rating(self):
+        if not self.review_count:
+            return None
+        return self.rating_sum / self.review_count
+
+    @classmethod
+    def recount(cls):
+        """
+        Count every statistic from scratch.
+        """
+        reviews = Review.objects.aggregate(review_count=Count('id'), rating_sum=Sum('rating'))
+        return {
+            'review_count': reviews['review_count'],
+            'rating_sum': reviews['rating_sum'] or 0,
+            'business_profile_count': Profile.objects.filter(type='business').count(),
+            'offer_count': Offer.objects.count(),
+        }
+
+    @classmethod
+    def load(cls):
+        """
+        Return the statistics row, creating it from a full recount if it is missing.
+        """
+        try:
+            return cls.objects.get(pk=cls.SINGLETON_PK)
+        except cls.DoesNotExist:
+            statistics, _ = cls.objects.get_or_create(pk=cls.SINGLETON_PK, defaults=cls.recount())
+            return statistics
+
+    @classmethod
+    def increment(cls, **deltas):
+        """
+        Atomically add the given deltas to the counters, e.g. increment(offer_count=1).
+        Counters that drifted stop at 0 instead of violating their CHECK constraint.
+        """
+        deltas = {field: delta for field, delta in deltas.items() if delta}
+        if deltas:
+            cls.objects.filter(pk=cls.SINGLETON_PK).update(
+                **{field: Greatest(F(field) + delta, 0) for field, delta in deltas.items()})
+
+
+class IdempotencyKey(models.Model):
+    """
+    An Idempotency-Key sent with a POST request and the id of the object that
+    request created, see coderr_app.idempotency.
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='idempotency_keys')
+    scope = models.CharField(max_length=20)
+    key = models.CharField(max_length=255)
+    fingerprint = models.CharField(max_length=16)
+    result_id = models.PositiveBigIntegerField(null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            # Concurrent requests with the same key conflict on the insert
+            models.UniqueConstraint(fields=['user', 'scope', 'key'], name='idempotencykey_user_scope_key_unique'),
+        ]
+
+    def __str__(self):
+        return f"{self.scope} {self.key} of {self.user_id}"
@@ -0,0 +1,82 @@
+"""
+Bulk import of offers.
+
+Every offer is validated with OfferSerializer, exactly like a single POST,
+and invalid offers are reported by their position instead of failing the
+whole import. Valid offers are written in chunks, each in one transaction
+with one bulk INSERT for the offers and one for their details.
+
+bulk_create does not send signals, so the work of the signal handlers is
+done here once per chunk: the minimums are set by OfferSerializer.build_offer,
+the platform statistics are incremented and the catalog cache is
+invalidated. The full-text index is maintained by its triggers.
+"""
+
+import json
+from django.db import DatabaseError, transaction
+from rest_framework.exceptions import ValidationError
+from rest_framework.serializers import as_serializer_error
+from coderr_app import catalog_cache
+from coderr_app.api.serializers import OfferSerializer
+from coderr_app.models import Offer, OfferDetail, PlatformStatistics
+from coderr_project.parsers import parse_ndjson, sanitize
+
+DEFAULT_CHUNK_SIZE = 500
+
+
+def import_offers(items, user, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Validate and create offers of `user` from a list of offer dicts.
+
+    Returns a report with the ids of the created offers and the errors of
+    the rejected ones: {"created": [...], "errors": [{"index": 3, "errors": {...}}]}
+    """
+    report = {'created': [], 'errors': []}
+    valid = []
+    # One serializer validates every item, like the child of a ListSerializer,
+    # so its fields are built once instead of once per offer
+    serializer = OfferSerializer()
+    for index, item in enumerate(items):
+        try:
+            valid.append((index, serializer.run_validation(item)))
+        except ValidationError as exc:
+            report['errors'].append({'index': index, 'errors': as_serializer_error(exc)})
+
+    for start in range(0, len(valid), chunk_size):
+        chunk = valid[start:start + chunk_size]
+        try:
+            report['created'] += create_chunk([data for _, data in chunk], user)
+        except DatabaseError as exc:
+            report['errors'] += [{'index': index, 'errors': {'non_field_errors': [str(exc)]}} for index, _ in chunk]
+
+    report['errors'].sort(key=lambda error: error['index'])
+    return report
+
+
+def create_chunk(validated_items, user):
+    built = [OfferSerializer.build_offer(data, user=user) for data in validated_items]
+    with transaction.atomic():
+        offers = Offer.objects.bulk_create([offer for offer, _ in built])
+        details = []
+        for offer, offer_details in built:
+            for detail in offer_details:
+                detail.offer = offer
+                details.append(detail)
+        OfferDetail.objects.bulk_create(details)
+        PlatformStatistics.increment(offer_count=len(offers))
+        catalog_cache.bump_version()
+        transaction.on_commit(catalog_cache.bump_version)
+    return [offer.pk for offer in offers]
+
+
+def read_offers(stream):
+    """
+    Read offers from a text stream holding a JSON array or NDJSON, with HTML
+    tags removed like in the API.
+    """
+    content = stream.read()
+    if content.lstrip().startswith('['):
+        items = json.loads(content)
+    else:
+        items = parse_ndjson(content.splitlines())
+    return sanitize(items)
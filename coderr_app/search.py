@@ -0,0 +1,69 @@
+"""
+Full-text search over offer titles and descriptions.
+
+On SQLite the offers are indexed in the FTS5 table `coderr_app_offer_fts`
+(created by migration 0013). The table uses the offer table as external
+content and is kept up to date by triggers on insert, update and delete, so
+bulk writes are indexed as well. Other database backends fall back to a
+case-insensitive substring match.
+"""
+
+import re
+from django.db import connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+from coderr_app.models import Offer
+
+FTS_TABLE = 'coderr_app_offer_fts'
+
+# Title matches weigh more than description matches in the relevance ranking
+TITLE_WEIGHT = 4.0
+DESCRIPTION_WEIGHT = 1.0
+
+
+def is_available():
+    """
+    Whether the database supports the FTS5 index.
+    """
+    return connection.vendor == 'sqlite'
+
+
+def build_match_query(term):
+    """
+    Turn free user input into an FTS5 query. Every word is quoted, so FTS
+    syntax in the input is matched literally, and used as a prefix, so partial
+    words typed into the search field already match.
+    """
+    words = re.findall(r'\w+', term)
+    return ' '.join(f'"{word}"*' for word in words)
+
+
+def search_offers(queryset, term):
+    """
+    Restrict the offer queryset to offers matching `term` and annotate the
+    relevance as `search_rank` (lower is more relevant). A term without any
+    word, e.g. only punctuation, matches nothing.
+    """
+    if not is_available():
+        return queryset.filter(Q(title__icontains=term) | Q(description__icontains=term))
+
+    match = build_match_query(term)
+    if not match:
+        return queryset.none()
+
+    return queryset.filter(
+        pk__in=RawSQL(f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s", [match])
+    ).annotate(search_rank=RawSQL(
+        f"SELECT bm25({FTS_TABLE}, %s, %s) FROM {FTS_TABLE} "
+        f"WHERE {FTS_TABLE} MATCH %s AND rowid = {Offer._meta.db_table}.id",
+        [TITLE_WEIGHT, DESCRIPTION_WEIGHT, match],
+    ))
+
+
+def rebuild_index():
+    """
+    Rebuild the whole index from the offer table and merge its segments.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+        cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('optimize')")
@@ -0,0 +1,93 @@
+"""
+Signal handlers for the Coderr backend.
+
+They keep denormalized data, like the offer minimums and the platform
+statistics, in sync with the rows it is derived from, and invalidate the
+offer catalog cache.
+"""
+
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models.signals import post_init, post_save, post_delete
+from django.dispatch import receiver
+from coderr_app import catalog_cache
+from coderr_app.models import Offer, OfferDetail, PlatformStatistics, Profile, Review
+
+
+@receiver(post_save, sender=OfferDetail)
+@receiver(post_delete, sender=OfferDetail)
+def refresh_offer_minimums(sender, instance, **kwargs):
+    """
+    Recompute min_price and min_delivery_time of the offer whenever one of its
+    details is created, updated or deleted.
+    """
+    if instance.offer_id is not None:
+        Offer.refresh_detail_minimums([instance.offer_id])
+
+
+@receiver(post_init, sender=Review)
+def remember_review_rating(sender, instance, **kwargs):
+    # The rating as loaded, to apply only the difference when it is changed.
+    # Read from __dict__ so deferred fields are not loaded one query per row.
+    instance._statistics_rating = instance.__dict__.get('rating')
+
+
+@receiver(post_save, sender=Review)
+def count_saved_review(sender, instance, created, **kwargs):
+    if created:
+        PlatformStatistics.increment(review_count=1, rating_sum=instance.rating)
+    else:
+        PlatformStatistics.increment(rating_sum=instance.rating - (instance._statistics_rating or 0))
+    instance._statistics_rating = instance.rating
+
+
+@receiver(post_delete, sender=Review)
+def count_deleted_review(sender, instance, **kwargs):
+    PlatformStatistics.increment(review_count=-1, rating_sum=-(instance._statistics_rating or 0))
+
+
+@receiver(post_init, sender=Profile)
+def remember_profile_type(sender, instance, **kwargs):
+    # The type as loaded, to notice a profile switching to or from business
+    instance._statistics_type = instance.__dict__.get('type')
+
+
+@receiver(post_save, sender=Profile)
+def count_saved_profile(sender, instance, created, **kwargs):
+    was_business = not created and instance._statistics_type == 'business'
+    is_business = instance.type == 'business'
+    PlatformStatistics.increment(business_profile_count=int(is_business) - int(was_business))
+    instance._statistics_type = instance.type
+
+
+@receiver(post_delete, sender=Profile)
+def count_deleted_profile(sender, instance, **kwargs):
+    if instance._statistics_type == 'business':
+        PlatformStatistics.increment(business_profile_count=-1)
+
+
+@receiver(post_save, sender=Offer)
+def count_saved_offer(sender, instance, created, **kwargs):
+    if created:
+        PlatformStatistics.increment(offer_count=1)
+
+
+@receiver(post_delete, sender=Offer)
+def count_deleted_offer(sender, instance, **kwargs):
+    PlatformStatistics.increment(offer_count=-1)
+
+
+@receiver(post_save, sender=Offer)
+@receiver(post_delete, sender=Offer)
+@receiver(post_save, sender=OfferDetail)
+@receiver(post_delete, sender=OfferDetail)
+@receiver(post_save, sender=User)
+def invalidate_offer_catalog(sender, **kwargs):
+    """
+    Bump the catalog version on every write that shows up in the offer list.
+    It is bumped again after the commit, because a request running between
+    the write and the commit could otherwise cache the old data under the new
+    version.
+    """
+    catalog_cache.bump_version()
+    transaction.on_commit(catalog_cache.bump_version)
@@ -0,0 +1,1090 @@
+import importlib
+import importlib.util
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+from io import StringIO
+from pathlib import Path
+from unittest import mock
+from decimal import Decimal
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import IntegrityError, connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.test import AsyncRequestFactory, SimpleTestCase, override_settings
+from django.urls import URLPattern, reverse
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase
+
+from coderr_app import catalog_cache, idempotency
+from coderr_app.api import urls as api_urls
+from coderr_app.api.serializers import OfferSerializer
+from coderr_app.api.async_views import (AsyncOfferListView, AsyncOfferDetailView, AsyncOfferDetailsDetailView,
+                                        AsyncReviewListView, AsyncBaseInfoView, AsyncBusinessProfilesView)
+from coderr_app.models import Profile, Offer, OfferDetail, Order, Review, PlatformStatistics, IdempotencyKey
+from coderr_project import metrics, profiling, querystats, timing
+
+
+def create_business_user(username):
+    user = User.objects.create_user(username=username)
+    Profile.objects.create(user=user, type='business', email=f'{username}@example.com')
+    return user
+
+
+def create_offer(user, title='Webseite', prices=(100, 200, 300)):
+    offer = Offer.objects.create(user=user, title=title, description='Beschreibung')
+    for offer_type, price, days in zip(['basic', 'standard', 'premium'], prices, [7, 5, 3]):
+        OfferDetail.objects.create(
+            offer=offer, title=offer_type, revisions=2, delivery_time_in_days=days,
+            price=price, features=['Feature'], offer_type=offer_type)
+    return offer
+
+
+class OfferQueryBudgetTests(APITestCase):
+    """
+    The offer list and retrieve endpoints must run a fixed number of queries,
+    independent of how many offers are on the page.
+    """
+
+    def setUp(self):
+        self.users = [create_business_user(f'anbieter{i}') for i in range(5)]
+
+    def create_offers(self, count):
+        for i in range(count):
+            create_offer(self.users[i % len(self.users)], title=f'Angebot {i}')
+
+    def test_list_query_count_is_independent_of_page_size(self):
+        self.create_offers(30)
+        # count + offers (with joined user) + prefetched details
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse('offer-list'), {'page_size': 5})
+        self.assertEqual(len(response.json()['results']), 5)
+
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse('offer-list'), {'page_size': 30})
+        self.assertEqual(len(response.json()['results']), 30)
+
+    def test_list_with_filters_stays_within_budget(self):
+        self.create_offers(12)
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse('offer-list'), {
+                'search': 'Angebot', 'max_delivery_time': 7, 'ordering': 'min_price'})
+        self.assertEqual(response.json()['count'], 12)
+
+    def test_retrieve_query_count(self):
+        offer = create_offer(self.users[0])
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('offer-detail', args=[offer.pk]))
+        data = response.json()
+        self.assertEqual(data['min_price'], 100.0)
+        self.assertEqual(data['min_delivery_time'], 3)
+        self.assertEqual(data['user_details']['username'], 'anbieter0')
+        self.assertEqual(len(data['details']), 3)
+
+
+class OfferMinimumTests(APITestCase):
+    """
+    Offer.min_price and Offer.min_delivery_time follow every change of the details.
+    """
+
+    def setUp(self):
+        self.offer = create_offer(create_business_user('anbieter'))
+
+    def test_minimums_are_set_on_create(self):
+        self.offer.refresh_from_db()
+        self.assertEqual(self.offer.min_price, 100)
+        self.assertEqual(self.offer.min_delivery_time, 3)
+
+    def test_minimums_follow_update_and_delete(self):
+        basic = self.offer.details.get(offer_type='basic')
+        basic.price = 50
+        basic.save()
+        self.offer.refresh_from_db()
+        self.assertEqual(self.offer.min_price, 50)
+
+        self.offer.details.get(offer_type='premium').delete()
+        self.offer.refresh_from_db()
+        self.assertEqual(self.offer.min_delivery_time, 5)
+
+        self.offer.details.all().delete()
+        self.offer.refresh_from_db()
+        self.assertIsNone(self.offer.min_price)
+        self.assertIsNone(self.offer.min_delivery_time)
+
+
+def offer_payload(title='Webseite', basic_price=100):
+    return {
+        'title': title, 'description': 'Beschreibung',
+        'details': [
+            {'title': offer_type, 'revisions': 2, 'delivery_time_in_days': days, 'price': price,
+             'features': ['Feature'], 'offer_type': offer_type}
+            for offer_type, price, days in zip(['basic', 'standard', 'premium'], [basic_price, 200, 300], [7, 5, 3])
+        ],
+    }
+
+
+class OfferImportTests(APITestCase):
+    """
+    Offers are created with bulk inserts, one by one or imported in batches.
+    """
+
+    def setUp(self):
+        self.user = create_business_user('anbieter')
+        self.client.force_authenticate(self.user)
+
+    def test_create_inserts_details_in_bulk(self):
+        response = self.client.post(reverse('offer-list'), offer_payload(), format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(response.data['details']), 3)
+        offer = Offer.objects.get(pk=response.data['id'])
+        self.assertEqual((offer.min_price, offer.min_delivery_time), (100, 3))
+
+        response = self.client.post(reverse('offer-list'), dict(offer_payload(), details=[]), format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('details', response.data)
+
+    def test_import_json_array(self):
+        invalid = dict(offer_payload(), details=offer_payload()['details'][:2])
+        items = [offer_payload('Logo <b>Design</b>', 80), invalid, offer_payload('Webseite')]
+        response = self.client.post(reverse('offer-import'), items, format='json')
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(response.data['created']), 2)
+        self.assertEqual([error['index'] for error in response.data['errors']], [1])
+        offer = Offer.objects.get(pk=response.data['created'][0])
+        self.assertEqual((offer.title, offer.user, offer.min_price), ('Logo Design', self.user, 80))
+        self.assertEqual(offer.details.count(), 3)
+        self.assertEqual(PlatformStatistics.load().offer_count, 2)
+
+        response = self.client.get(reverse('offer-list'), {'search': 'logo'})
+        self.assertEqual(response.json()['count'], 1)
+
+    def test_import_ndjson(self):
+        body = '\n'.join(json.dumps(offer_payload(f'Angebot {i}')) for i in range(3)) + '\n'
+        response = self.client.post(reverse('offer-import'), body, content_type='application/x-ndjson')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(Offer.objects.filter(user=self.user).count(), 3)
+
+        response = self.client.post(reverse('offer-import'), '{"title":\n', content_type='application/x-ndjson')
+        self.assertEqual(response.status_code, 400)
+
+    def test_import_command(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.ndjson', delete=False) as stream:
+            stream.write('\n'.join(json.dumps(offer_payload(f'Angebot {i}')) for i in range(5)))
+        self.addCleanup(os.remove, stream.name)
+
+        out = StringIO()
+        call_command('import_offers', stream.name, user='anbieter', chunk_size=2, stdout=out)
+        self.assertIn('Imported 5 offers', out.getvalue())
+        self.assertEqual(OfferDetail.objects.filter(offer__user=self.user).count(), 15)
+
+
+class OfferDetailUpsertTests(APITestCase):
+    """
+    PATCHing the details of an offer updates them in place by their offer_type.
+    """
+
+    def setUp(self):
+        self.user = create_business_user('anbieter')
+        self.offer = create_offer(self.user)
+        self.client.force_authenticate(self.user)
+        self.url = reverse('offer-detail', args=[self.offer.pk])
+
+    def detail_writes(self, data):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.patch(self.url, data, format='json')
+        self.assertEqual(response.status_code, 200)
+        return response, [query['sql'].split()[0] for query in queries
+                          if 'coderr_app_offerdetail' in query['sql'].split('WHERE')[0]
+                          and not query['sql'].startswith('SELECT')]
+
+    def test_price_change_is_a_single_update(self):
+        ids = set(self.offer.details.values_list('id', flat=True))
+        response, writes = self.detail_writes({'details': [{'offer_type': 'basic', 'price': 50}]})
+        self.assertEqual(writes, ['UPDATE'])
+        self.assertEqual(set(self.offer.details.values_list('id', flat=True)), ids)
+        self.assertEqual(response.data['min_price'], 50.0)
+        self.assertEqual(len(response.data['details']), 3)
+        self.assertEqual(self.offer.details.get(offer_type='standard').price, 200)
+
+    def test_unchanged_details_are_skipped(self):
+        payload = offer_payload()['details']
+        _, writes = self.detail_writes({'title': 'Neu', 'details': payload})
+        self.assertEqual(writes, [])
+        self.offer.refresh_from_db()
+        self.assertEqual(self.offer.title, 'Neu')
+
+    def test_invalid_detail_updates(self):
+        response = self.client.patch(self.url, {'details': [
+            {'offer_type': 'basic', 'price': 1}, {'offer_type': 'basic', 'price': 2}]}, format='json')
+        self.assertEqual(response.status_code, 400)
+        response = self.client.patch(self.url, {'details': [{'price': 1}]}, format='json')
+        self.assertEqual(response.status_code, 400)
+
+    def test_one_detail_per_type(self):
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            OfferDetail.objects.create(offer=self.offer, title='basic', delivery_time_in_days=1, price=1,
+                                       features=['Feature'], offer_type='basic')
+
+    def test_detail_cannot_take_the_type_of_a_sibling(self):
+        detail = self.offer.details.get(offer_type='basic')
+        url = reverse('offerdetails-detail', args=[detail.pk])
+        response = self.client.patch(url, {'offer_type': 'standard'}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('offer_type', response.json())
+        response = self.client.patch(url, {'offer_type': 'basic', 'price': 60}, format='json')
+        self.assertEqual(response.status_code, 200)
+
+
+class OfferPatchTests(APITestCase):
+    """
+    PATCH /offers/<id>/ validates everything first and writes in batches.
+    """
+
+    def setUp(self):
+        self.user = create_business_user('anbieter')
+        self.offer = create_offer(self.user)
+        self.client.force_authenticate(self.user)
+
+    def patch(self, data):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.patch(reverse('offer-detail', args=[self.offer.pk]), data, format='json')
+        return response, len(queries)
+
+    def test_queries_do_not_scale_with_details(self):
+        response, one = self.patch({'title': 'Neu', 'details': [{'offer_type': 'basic', 'price': 50}]})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['title'], 'Neu')
+        self.assertEqual(response.data['details'][0]['price'], '50.00')
+
+        response, three = self.patch({'details': [
+            {'offer_type': offer_type, 'price': 60} for offer_type in ['basic', 'standard', 'premium']]})
+        self.assertEqual(three, one)
+        self.offer.refresh_from_db()
+        self.assertEqual((self.offer.title, self.offer.min_price), ('Neu', 60))
+
+    def test_invalid_detail_writes_nothing(self):
+        response, _ = self.patch({'title': 'Neu', 'details': [
+            {'offer_type': 'basic', 'price': 50}, {'offer_type': 'premium', 'delivery_time_in_days': 0}]})
+        self.assertEqual(response.status_code, 400)
+        self.offer.refresh_from_db()
+        self.assertEqual((self.offer.title, self.offer.min_price), ('Webseite', 100))
+
+
+class OfferSearchTests(APITestCase):
+    """
+    The `search` parameter uses the full-text index with prefix matching and ranking.
+    """
+
+    def setUp(self):
+        user = create_business_user('anbieter')
+        self.logo = create_offer(user, title='Logo Design')
+        self.website = create_offer(user, title='Webseite mit Logo')
+        self.shop = create_offer(user, title='Onlineshop')
+
+    def search(self, term):
+        response = self.client.get(reverse('offer-list'), {'search': term})
+        return [offer['id'] for offer in response.json()['results']]
+
+    def test_prefix_match_and_ranking(self):
+        self.assertEqual(self.search('Log'), [self.logo.pk, self.website.pk])
+
+    def test_index_follows_updates_and_deletes(self):
+        self.shop.title = 'Onlineshop mit Logo'
+        self.shop.save()
+        self.assertIn(self.shop.pk, self.search('logo'))
+
+        self.logo.delete()
+        self.assertNotIn(self.logo.pk, self.search('logo'))
+
+    def test_search_syntax_is_matched_literally(self):
+        self.assertEqual(self.search('"Logo'), [self.logo.pk, self.website.pk])
+        self.assertEqual(self.search('OR AND'), [])
+        self.assertEqual(self.search('-'), [])
+        self.assertEqual(self.search('"'), [])
+
+
+class OfferCursorPaginationTests(APITestCase):
+    """
+    `?pagination=cursor` walks the catalog by keyset without counting it.
+    """
+
+    def setUp(self):
+        user = create_business_user('anbieter')
+        for i in range(7):
+            create_offer(user, title=f'Angebot {i}', prices=(100 + i % 3, 200, 300))
+
+    def collect(self, params):
+        ids = []
+        url = reverse('offer-list')
+        while url:
+            # offers + prefetched details, no COUNT
+            with self.assertNumQueries(2):
+                response = self.client.get(url, params)
+            self.assertNotIn('count', response.data)
+            ids += [offer['id'] for offer in response.data['results']]
+            url, params = response.data['next'], None
+        return ids
+
+    def test_default_ordering(self):
+        ids = self.collect({'pagination': 'cursor', 'page_size': 2})
+        expected = list(Offer.objects.order_by('-updated_at', '-id').values_list('id', flat=True))
+        self.assertEqual(ids, expected)
+
+    def test_min_price_ordering(self):
+        ids = self.collect({'pagination': 'cursor', 'page_size': 2, 'ordering': 'min_price'})
+        expected = list(Offer.objects.order_by('min_price', 'id').values_list('id', flat=True))
+        self.assertEqual(ids, expected)
+
+    def test_page_number_mode_is_unchanged(self):
+        response = self.client.get(reverse('offer-list'), {'page': 2, 'page_size': 5})
+        self.assertEqual(response.json()['count'], 7)
+        self.assertEqual(len(response.json()['results']), 2)
+
+    def test_out_of_range_page_falls_back_while_searching(self):
+        response = self.client.get(reverse('offer-list'), {'page': 9, 'search': 'Angebot'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()['results']), 6)
+
+
+class OfferCatalogCacheTests(APITestCase):
+    """
+    Anonymous offer lists are served from the cache until the catalog changes.
+    """
+
+    def setUp(self):
+        self.user = create_business_user('anbieter')
+        self.offer = create_offer(self.user)
+        catalog_cache.reset_stats()
+
+    def test_repeated_request_is_a_hit_without_queries(self):
+        first = self.client.get(reverse('offer-list'), {'page_size': 3, 'ordering': 'min_price'})
+        self.assertEqual(first['X-Cache'], 'MISS')
+        # Same parameters in another order
+        with self.assertNumQueries(0):
+            second = self.client.get(reverse('offer-list'), {'ordering': 'min_price', 'page_size': 3})
+        self.assertEqual(second['X-Cache'], 'HIT')
+        self.assertEqual(second.json(), first.json())
+        self.assertEqual(catalog_cache.get_stats()['hits'], 1)
+        self.assertEqual(catalog_cache.get_stats()['misses'], 1)
+
+    def test_writes_invalidate(self):
+        self.client.get(reverse('offer-list'))
+        detail = self.offer.details.get(offer_type='basic')
+        detail.price = 50
+        detail.save()
+
+        response = self.client.get(reverse('offer-list'))
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.json()['results'][0]['min_price'], 50.0)
+
+        Offer.objects.filter(pk=self.offer.pk).get().delete()
+        response = self.client.get(reverse('offer-list'))
+        self.assertEqual(response.json()['count'], 0)
+
+    @override_settings(CACHES={
+        **settings.CACHES,
+        'worker_a': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'worker-a'},
+        'worker_b': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'worker-b'},
+    })
+    def test_a_write_on_one_worker_invalidates_the_others(self):
+        # Two workers with their own entry caches and the shared version cache
+        with self.settings(OFFER_CACHE_ALIAS='worker_b'):
+            self.client.get(reverse('offer-list'))
+            self.assertEqual(self.client.get(reverse('offer-list'))['X-Cache'], 'HIT')
+        with self.settings(OFFER_CACHE_ALIAS='worker_a'):
+            detail = self.offer.details.get(offer_type='basic')
+            detail.price = 50
+            detail.save()
+        with self.settings(OFFER_CACHE_ALIAS='worker_b'):
+            response = self.client.get(reverse('offer-list'))
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.json()['results'][0]['min_price'], 50.0)
+
+    def test_authenticated_requests_bypass_the_cache(self):
+        token = Token.objects.create(user=self.user)
+        self.client.get(reverse('offer-list'))
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
+        response = self.client.get(reverse('offer-list'))
+        self.assertNotIn('X-Cache', response)
+
+
+class ConditionalGetTests(APITestCase):
+    """
+    GET responses carry validators and unchanged resources are answered with 304.
+    """
+
+    def setUp(self):
+        self.user = create_business_user('anbieter')
+        self.offer = create_offer(self.user)
+
+    def assertNotModified(self, url, params=None):
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['ETag'].startswith('W/'))
+        revalidated = self.client.get(url, params, headers={'If-None-Match': response['ETag']})
+        self.assertEqual(revalidated.status_code, 304)
+        self.assertEqual(revalidated['ETag'], response['ETag'])
+        return response
+
+    def test_offer(self):
+        url = reverse('offer-detail', args=[self.offer.pk])
+        response = self.assertNotModified(url)
+
+        # A detail change is a change of the offer
+        detail = self.offer.details.get(offer_type='premium')
+        detail.price = 400
+        detail.save()
+        changed = self.client.get(url, headers={'If-None-Match': response['ETag']})
+        self.assertEqual(changed.status_code, 200)
+        self.assertNotEqual(changed['ETag'], response['ETag'])
+
+        self.assertNotModified(reverse('offerdetails-detail', args=[detail.pk]))
+
+    def test_offer_list(self):
+        response = self.assertNotModified(reverse('offer-list'), {'page_size': 2})
+        create_offer(self.user, title='Logo Design')
+        changed = self.client.get(reverse('offer-list'), {'page_size': 2},
+                                  headers={'If-None-Match': response['ETag']})
+        self.assertEqual(changed.status_code, 200)
+        self.assertEqual(changed.json()['count'], 2)
+
+    def test_list_has_no_last_modified(self):
+        # The latest updated_at of a page does not change when a delete moves
+        # older offers onto it, so only the ETag validates lists
+        response = self.assertNotModified(reverse('offer-list'), {'page_size': 2})
+        self.assertNotIn('Last-Modified', response)
+        revalidated = self.client.get(reverse('offer-list'), {'page_size': 2},
+                                      headers={'If-Modified-Since': 'Fri, 01 Jan 2100 00:00:00 GMT'})
+        self.assertEqual(revalidated.status_code, 200)
+
+    def test_offer_list_follows_the_profiles(self):
+        # The list shows the names of the users, which are saved with their profile;
+        # authenticated, so the catalog cache is bypassed
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {Token.objects.create(user=self.user).key}')
+        response = self.assertNotModified(reverse('offer-list'), {'pagination': 'cursor'})
+        Profile.objects.get(user=self.user).save()
+        changed = self.client.get(reverse('offer-list'), {'pagination': 'cursor'},
+                                  headers={'If-None-Match': response['ETag']})
+        self.assertEqual(changed.status_code, 200)
+
+    def test_if_modified_since(self):
+        url = reverse('business_profile_detail', args=[self.user.pk])
+        response = self.assertNotModified(url)
+        revalidated = self.client.get(url, headers={'If-Modified-Since': response['Last-Modified']})
+        self.assertEqual(revalidated.status_code, 304)
+
+    def test_profiles_and_reviews(self):
+        customer = User.objects.create_user(username='kunde')
+        Review.objects.create(business_user=self.user, reviewer=customer, rating=4)
+        self.assertNotModified(reverse('business_profiles'))
+        token = Token.objects.create(user=customer)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
+        self.assertNotModified(reverse('reviews-list'))
+        self.assertNotModified(reverse('profile-detail', args=[self.user.pk]))
+
+
+class PlatformStatisticsTests(APITestCase):
+    """
+    /base-info/ reads counters that follow every review, profile and offer write.
+    """
+
+    def get_base_info(self):
+        with self.assertNumQueries(1):
+            return self.client.get(reverse('base-info')).json()
+
+    def test_counters_follow_writes(self):
+        business = create_business_user('anbieter')
+        customer = User.objects.create_user(username='kunde')
+        profile = Profile.objects.create(user=customer, type='customer', email='kunde@example.com')
+        offer = create_offer(business)
+        review = Review.objects.create(business_user=business, reviewer=customer, rating=4)
+        Review.objects.create(business_user=create_business_user('anbieter2'), reviewer=customer, rating=5)
+
+        data = self.get_base_info()
+        self.assertEqual(data['review_count'], 2)
+        self.assertEqual(data['average_rating'], Decimal('4.5'))
+        self.assertEqual(data['business_profile_count'], 2)
+        self.assertEqual(data['offer_count'], 1)
+
+        review.rating = 1
+        review.save()
+        profile.type = 'business'
+        profile.save()
+        offer.delete()
+        data = self.get_base_info()
+        self.assertEqual(data['average_rating'], Decimal('3.0'))
+        self.assertEqual(data['business_profile_count'], 3)
+        self.assertEqual(data['offer_count'], 0)
+
+        business.delete()
+        data = self.get_base_info()
+        self.assertEqual(data['review_count'], 1)
+        self.assertEqual(data['business_profile_count'], 2)
+        self.assertEqual(PlatformStatistics.load().review_count, PlatformStatistics.recount()['review_count'])
+
+    def test_drifted_counters_stop_at_zero(self):
+        PlatformStatistics.load()
+        PlatformStatistics.increment(offer_count=-1, review_count=2)
+        statistics = PlatformStatistics.load()
+        self.assertEqual((statistics.offer_count, statistics.review_count), (0, 2))
+
+
+class OrderCountTests(APITestCase):
+    """
+    The order count endpoints are served from one grouped query.
+    """
+
+    def setUp(self):
+        customer = User.objects.create_user(username='kunde')
+        self.client.force_authenticate(customer)
+        self.businesses = [create_business_user(f'anbieter{i}') for i in range(3)]
+        for business, statuses in zip(self.businesses, [['in_progress', 'in_progress', 'completed'], ['cancelled'], []]):
+            for order_status in statuses:
+                Order.objects.create(
+                    customer_user=customer, business_user=business, title='Logo', revisions=1,
+                    delivery_time_in_days=3, price=100, features=['Logo'], offer_type='basic',
+                    status=order_status)
+
+    def test_batch_counts(self):
+        ids = ','.join(str(user.pk) for user in self.businesses)
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('order_counts'), {'business_user_ids': f'{ids},999'})
+        first, second, third = (response.data[user.pk] for user in self.businesses)
+        self.assertEqual(first, {'order_count': 2, 'completed_order_count': 1, 'cancelled_order_count': 0})
+        self.assertEqual(second, {'order_count': 0, 'completed_order_count': 0, 'cancelled_order_count': 1})
+        self.assertEqual(third, {'order_count': 0, 'completed_order_count': 0, 'cancelled_order_count': 0})
+        self.assertIsNone(response.data[999])
+
+    def test_single_counts(self):
+        pk = self.businesses[0].pk
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('order_count', args=[pk]))
+        self.assertEqual(response.data, {'order_count': 2})
+        response = self.client.get(reverse('completed_order_count', args=[pk]))
+        self.assertEqual(response.data, {'completed_order_count': 1})
+        response = self.client.get(reverse('order_count', args=[999]))
+        self.assertEqual(response.status_code, 404)
+
+
+class OrderListTests(APITestCase):
+    """
+    /orders/ lists the orders of both sides and supports status filter and cursor pagination.
+    """
+
+    def setUp(self):
+        self.user = create_business_user('anbieter')
+        other = create_business_user('anbieter2')
+        self.client.force_authenticate(self.user)
+        for customer, business, order_status in [
+            (other, self.user, 'in_progress'), (self.user, other, 'completed'),
+            (other, self.user, 'completed'), (other, other, 'completed'),
+        ]:
+            Order.objects.create(
+                customer_user=customer, business_user=business, title='Logo', revisions=1,
+                delivery_time_in_days=3, price=100, features=['Logo'], offer_type='basic',
+                status=order_status)
+
+    def test_list_and_status_filter(self):
+        response = self.client.get(reverse('order-list'))
+        self.assertEqual(len(response.data), 3)
+        response = self.client.get(reverse('order-list'), {'status': 'completed'})
+        self.assertEqual(len(response.data), 2)
+        response = self.client.get(reverse('order-list'), {'status': 'unknown'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_cursor_pagination(self):
+        response = self.client.get(reverse('order-list'), {'pagination': 'cursor', 'page_size': 2})
+        self.assertEqual(len(response.data['results']), 2)
+        response = self.client.get(response.data['next'])
+        self.assertEqual(len(response.data['results']), 1)
+        self.assertIsNone(response.data['next'])
+
+
+class OrderCreateTests(APITestCase):
+    """
+    POST /orders/ resolves the offer in one query and honours Idempotency-Key.
+    """
+
+    def setUp(self):
+        self.business = create_business_user('anbieter')
+        self.detail = create_offer(self.business).details.get(offer_type='standard')
+        customer = User.objects.create_user(username='kunde')
+        Profile.objects.create(user=customer, type='customer', email='kunde@example.com')
+        # Loaded with its profile, like the token authentication does
+        self.client.force_authenticate(User.objects.select_related('profile').get(pk=customer.pk))
+
+    def order(self, key=None, offer_detail_id=None):
+        headers = {'Idempotency-Key': key} if key else {}
+        return self.client.post(reverse('order-list'), {'offer_detail_id': offer_detail_id or self.detail.pk},
+                                format='json', headers=headers)
+
+    def test_create_query_count(self):
+        # offer detail with offer and business user + insert
+        with self.assertNumQueries(2):
+            response = self.order()
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['business_user'], self.business.pk)
+        self.assertEqual(response.data['price'], 200)
+
+    def test_retry_returns_the_original_order(self):
+        first = self.order(key='abc')
+        # key + order
+        with self.assertNumQueries(2):
+            retry = self.order(key='abc')
+        self.assertEqual(retry.status_code, 201)
+        self.assertEqual(retry.data['id'], first.data['id'])
+        self.assertEqual(retry['Idempotent-Replayed'], 'true')
+        self.assertEqual(Order.objects.count(), 1)
+
+        self.assertEqual(self.order(key='def').status_code, 201)
+        self.assertEqual(Order.objects.count(), 2)
+
+    def test_key_reused_for_another_request(self):
+        self.order(key='abc')
+        other = self.business.offers.get().details.get(offer_type='basic')
+        self.assertEqual(self.order(key='abc', offer_detail_id=other.pk).status_code, 422)
+
+    def test_failed_request_releases_the_key(self):
+        self.assertEqual(self.order(key='abc', offer_detail_id=999).status_code, 400)
+        self.assertFalse(IdempotencyKey.objects.exists())
+        self.assertEqual(self.order(key='abc').status_code, 201)
+
+    def test_key_is_stored_with_the_order(self):
+        # In the database, so a retry on another worker sees it
+        order = self.order(key='abc')
+        stored = IdempotencyKey.objects.get()
+        self.assertEqual((stored.scope, stored.key, stored.result_id), ('order', 'abc', order.data['id']))
+
+    def test_concurrent_claim_returns_the_committed_key(self):
+        order = self.order(key='abc')
+        user = User.objects.get(username='kunde')
+        stored, claimed = idempotency.claim(user, 'order', 'abc', 'other')
+        self.assertFalse(claimed)
+        self.assertEqual(stored.result_id, order.data['id'])
+
+    @override_settings(IDEMPOTENCY_KEY_TTL=-1)
+    def test_expired_key_creates_a_new_order(self):
+        first = self.order(key='abc')
+        retry = self.order(key='abc')
+        self.assertEqual(retry.status_code, 201)
+        self.assertNotEqual(retry.data['id'], first.data['id'])
+        self.assertEqual(IdempotencyKey.objects.get().result_id, retry.data['id'])
+
+
+class ProfileListTests(APITestCase):
+    """
+    The profile listings join the user and support cursor pagination and streaming.
+    """
+
+    def setUp(self):
+        self.users = [create_business_user(f'anbieter{i}') for i in range(5)]
+
+    def test_list_query_count(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('business_profiles'))
+        self.assertEqual([profile['user']['username'] for profile in response.json()],
+                         [user.username for user in self.users])
+
+    def test_cursor_pagination(self):
+        response = self.client.get(reverse('business_profiles'), {'pagination': 'cursor', 'page_size': 3})
+        self.assertEqual(len(response.data['results']), 3)
+        response = self.client.get(response.data['next'])
+        self.assertEqual(len(response.data['results']), 2)
+
+    def test_streaming(self):
+        response = self.client.get(reverse('business_profiles'), {'stream': 'ndjson'})
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual([json.loads(line)['user']['pk'] for line in lines], [user.pk for user in self.users])
+
+        response = self.client.get(reverse('business_profiles'), {'stream': 'json'})
+        profiles = json.loads(b''.join(response.streaming_content))
+        self.assertEqual(len(profiles), 5)
+
+        response = self.client.get(reverse('customer_profiles'), {'stream': 'json'})
+        self.assertEqual(json.loads(b''.join(response.streaming_content)), [])
+
+
+class GenerateDataTests(APITestCase):
+    """
+    generate_data builds the same dataset from the same seed.
+    """
+
+    def generate(self, prefix, **options):
+        call_command('generate_data', prefix=prefix, seed=7, businesses=3, customers=4, offers=10, orders=25,
+                     reviews=6, stdout=StringIO(), **options)
+        return list(Offer.objects.filter(user__username__startswith=prefix).order_by('id')
+                    .values_list('title', 'min_price', 'min_delivery_time'))
+
+    def test_dataset(self):
+        offers = self.generate('a')
+        self.assertEqual(len(offers), 10)
+        self.assertEqual(OfferDetail.objects.count(), 30)
+        self.assertEqual(Order.objects.count(), 25)
+        self.assertEqual(Review.objects.count(), 6)
+        self.assertEqual(PlatformStatistics.load().offer_count, 10)
+        self.assertTrue(User.objects.get(username='Kunde').check_password('123456'))
+        self.assertTrue(User.objects.get(username='a_customer_0').check_password('password123'))
+
+        self.assertEqual(self.generate('b', no_guests=True), offers)
+
+
+class SanitizationTests(APITestCase):
+    """
+    HTML tags are removed from JSON and form input while the body is parsed.
+    """
+
+    def setUp(self):
+        self.user = create_business_user('anbieter')
+        self.client.force_authenticate(self.user)
+
+    def test_json_and_multipart_input_is_sanitized(self):
+        url = reverse('profile-detail', args=[self.user.pk])
+        response = self.client.patch(url, {
+            'description': '<script>alert(1)</script>Fullstack &amp; <b>Django</b>',
+            'first_name': '<i>Michael</i>',
+        }, format='json')
+        self.assertEqual(response.data['description'], 'alert(1)Fullstack &amp; Django')
+        self.assertEqual(response.data['first_name'], 'Michael')
+
+        response = self.client.patch(url, {'location': '<p>Berlin</p>'}, format='multipart')
+        self.assertEqual(response.data['location'], 'Berlin')
+
+    def test_views_can_exempt_fields(self):
+        from coderr_project.parsers import sanitize
+        data = {'html': '<b>x</b>', 'nested': [{'html': '<b>y</b>', 'text': '<i>z</i>'}], 'price': 10}
+        self.assertEqual(sanitize(data, frozenset({'html'})), {
+            'html': '<b>x</b>', 'nested': [{'html': '<b>y</b>', 'text': 'z'}], 'price': 10})
+
+
+class ServerTimingTests(APITestCase):
+    """
+    Every response reports its timings, slow requests are logged.
+    """
+
+    def setUp(self):
+        self.user = create_business_user('anbieter')
+        self.client.force_authenticate(self.user)
+
+    def get_timings(self, response):
+        metrics = {}
+        for metric in response['Server-Timing'].split(', '):
+            name, *params = metric.split(';')
+            metrics[name] = dict(param.split('=', 1) for param in params)
+        return metrics
+
+    def test_header_reports_queries_and_phases(self):
+        url = reverse('profile-detail', args=[self.user.pk])
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.patch(url, {'description': '<b>Django</b>'}, format='json')
+        metrics = self.get_timings(response)
+        self.assertEqual(metrics['db']['desc'], f'"{len(queries)} queries"')
+        self.assertEqual(set(metrics), {'db', 'serialize', 'render', 'sanitize', 'app', 'total'})
+        self.assertGreater(float(metrics['total']['dur']), 0)
+
+    def test_serializers_are_timed_without_their_queries(self):
+        offer = create_offer(self.user)
+        timings, token = timing.start()
+        try:
+            # The details are not prefetched, so the serializer queries them
+            data = OfferSerializer(Offer.objects.get(pk=offer.pk)).data
+        finally:
+            timing.stop(token)
+        self.assertEqual(len(data['details']), 3)
+        self.assertGreater(timings.serialize, 0)
+        self.assertGreater(timings.queries, 1)
+        self.assertLess(timings.serialize + timings.db, timings.total())
+        self.assertEqual(timings.active, set())
+
+    @override_settings(SLOW_REQUEST_MS=0)
+    def test_slow_requests_are_logged(self):
+        with self.assertLogs('coderr.slow_requests', 'WARNING') as logs:
+            self.client.get(reverse('profile-detail', args=[self.user.pk]))
+        entry = json.loads(logs.records[0].getMessage())
+        self.assertEqual(entry['route'], 'profile-detail')
+        self.assertEqual(entry['status'], 200)
+        self.assertEqual(entry['user_id'], self.user.pk)
+
+
+class MetricsTests(APITestCase):
+    """
+    /metrics exposes per-route counters, summed over all worker processes.
+    """
+
+    def setUp(self):
+        catalog_cache.bump_version()
+        self.registry = metrics.Registry()
+        patcher = mock.patch.object(metrics, 'registry', self.registry)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_requests_and_cache_lookups_are_counted_per_route(self):
+        create_offer(create_business_user('anbieter'))
+        self.client.get('/offers/')
+        self.client.get('/offers/')
+        self.client.get('/unknown/')
+        response = self.client.get('/metrics')
+        self.assertEqual(response['Content-Type'], 'text/plain; version=0.0.4; charset=utf-8')
+        lines = response.content.decode().splitlines()
+        self.assertIn('coderr_http_requests_total{route="offer-list",method="GET",status="200"} 2', lines)
+        self.assertIn('coderr_http_requests_total{route="unmatched",method="GET",status="404"} 1', lines)
+        self.assertIn('coderr_http_request_duration_seconds_count{route="offer-list"} 2', lines)
+        self.assertIn('coderr_http_request_queries_bucket{route="offer-list",le="+Inf"} 2', lines)
+        self.assertIn('coderr_cache_hit_ratio{cache="offers"} 0.5', lines)
+
+    def registry_in(self, directory, flush_interval=1.0):
+        registry = metrics.Registry(directory, flush_interval)
+        self.addCleanup(registry.stop)
+        return registry
+
+    def test_counters_of_all_processes_are_summed(self):
+        with tempfile.TemporaryDirectory() as directory:
+            workers = [self.registry_in(directory), self.registry_in(directory)]
+            for worker in workers:
+                worker.observe_request('base-info', 'GET', 200, 0.02, 1)
+            workers[0].observe_request('base-info', 'GET', 200, 0.2, 1)
+            workers[0].flush()
+            merged = workers[1].collect()
+        self.assertEqual(merged['requests'][('base-info', 'GET', '200')], 3)
+        self.assertEqual(merged['latency']['base-info'][-1], 3)
+
+    def test_files_of_exited_workers_are_merged(self):
+        with tempfile.TemporaryDirectory() as directory:
+            for _ in range(2):
+                exited = self.registry_in(directory)
+                exited.name = '999999999-exited.json'  # no such pid
+                exited.count_event('worker_recycled')
+                exited.flush()
+                self.registry_in(directory).collect()
+            merged = self.registry_in(directory).collect()
+            self.assertEqual(sorted(path.name for path in Path(directory).glob('*.json')), ['exited.json'])
+        self.assertEqual(merged['events'][('worker_recycled',)], 2)
+
+    def test_counts_are_flushed_in_the_background(self):
+        with tempfile.TemporaryDirectory() as directory:
+            worker = self.registry_in(directory, flush_interval=0.01)
+            worker.count_cache('offers', hit=True)
+            path = Path(directory) / worker.name
+            for _ in range(200):
+                if path.exists():
+                    break
+                time.sleep(0.01)
+            self.assertEqual(json.loads(path.read_text())['cache'], [['offers', 'hit', 1]])
+
+    @override_settings(METRICS_TOKEN='geheim')
+    def test_token_is_required_if_configured(self):
+        self.assertEqual(self.client.get('/metrics').status_code, 401)
+        response = self.client.get('/metrics', headers={'Authorization': 'Bearer geheim'})
+        self.assertEqual(response.status_code, 200)
+
+
+class MemoryTracingTests(APITestCase):
+    """
+    With memory tracing, peaks are recorded per route and large responses are logged.
+    """
+
+    @override_settings(MEMORY_TRACING=True, MEMORY_SNAPSHOT_RATE=0, MEMORY_BUDGET_BYTES=1024, SLOW_REQUEST_MS=60000)
+    def test_over_budget_response_is_logged_with_its_allocation_sites(self):
+        self.addCleanup(tracemalloc.stop)
+        registry = metrics.Registry()
+        user = create_business_user('anbieter')
+        for i in range(20):
+            create_offer(user, title=f'Webseite {i}')
+
+        with mock.patch.object(metrics, 'registry', registry), self.assertLogs('coderr.memory') as logs:
+            self.client.get('/offers/', {'page_size': 20})
+        entry = json.loads(logs.records[0].getMessage())
+        self.assertEqual((entry['event'], entry['route']), ('memory_over_budget', 'offer-list'))
+        self.assertGreater(entry['peak_bytes'], 1024)
+        self.assertTrue(entry['sites'])
+        self.assertEqual(registry.memory['offer-list'][-1], 1)
+
+
+class WorkerRecyclingTests(SimpleTestCase):
+    """
+    gunicorn.conf.py recycles a worker whose memory grew above the limit.
+    """
+
+    def setUp(self):
+        spec = importlib.util.spec_from_file_location('gunicorn_conf', settings.BASE_DIR / 'gunicorn.conf.py')
+        self.conf = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(self.conf)
+        self.registry = metrics.Registry()
+        patcher = mock.patch.object(metrics, 'registry', self.registry)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.worker = mock.Mock(alive=True, pid=4242)
+
+    def post_request(self, rss_mb):
+        with mock.patch.object(self.conf, 'get_rss_bytes', return_value=rss_mb * 1024 * 1024):
+            self.conf.post_request(self.worker, mock.Mock(path='/offers/'), {}, None)
+
+    def test_worker_below_the_limit_keeps_running(self):
+        self.post_request(self.conf.WORKER_MAX_RSS_MB - 1)
+        self.assertTrue(self.worker.alive)
+        self.assertEqual(self.registry.events, {})
+
+    def test_worker_above_the_limit_is_recycled(self):
+        self.post_request(self.conf.WORKER_MAX_RSS_MB + 1)
+        self.assertFalse(self.worker.alive)
+        self.assertEqual(self.registry.events, {('worker_recycled',): 1})
+        entry = json.loads(self.worker.log.warning.call_args[0][0])
+        self.assertEqual((entry['event'], entry['pid'], entry['path']), ('worker_recycled', 4242, '/offers/'))
+
+    def test_rss_is_read(self):
+        self.assertGreater(self.conf.get_rss_bytes(), 0)
+
+
+class ProfilingTests(APITestCase):
+    """
+    Staff users can profile a request with `X-Profile: 1`; profiles are kept in a ring buffer.
+    """
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        settings_override = override_settings(PROFILE_DIR=directory.name, PROFILE_MAX_COUNT=2)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        create_offer(create_business_user('anbieter'))
+        self.staff = User.objects.create_user(username='admin', is_staff=True)
+        self.token = Token.objects.create(user=self.staff)
+
+    def test_only_staff_can_profile(self):
+        customer = User.objects.create_user(username='kunde')
+        token = Token.objects.create(user=customer)
+        response = self.client.get('/offers/', headers={'X-Profile': '1', 'Authorization': f'Token {token.key}'})
+        self.assertNotIn('X-Profile-Id', response)
+        self.assertEqual(profiling.get_profile_ids(), [])
+
+    def test_profiles_are_stored_in_a_ring_buffer(self):
+        headers = {'X-Profile': '1', 'Authorization': f'Token {self.token.key}'}
+        ids = [self.client.get('/offers/', headers=headers)['X-Profile-Id'] for _ in range(3)]
+        self.assertEqual(profiling.get_profile_ids(), ids[1:])
+
+        meta = profiling.load_meta(ids[-1])
+        self.assertEqual((meta['route'], meta['status'], meta['url']), ('offer-list', 200, '/offers/'))
+        self.assertTrue(meta['queries'])
+
+        out = StringIO()
+        call_command('profiles', 'aggregate', '--route', 'offer-list', '--filter', 'coderr_app', stdout=out)
+        self.assertIn('2 profiles', out.getvalue())
+        # The async views run outside the profiled thread, but their queries are recorded
+        self.assertIn('FROM "coderr_app_offer"', out.getvalue())
+
+
+class QueryStatsTests(APITestCase):
+    """
+    Statements are aggregated by fingerprint and route and shown by `querystats`.
+    """
+
+    def test_fingerprint_strips_literals_and_collapses_lists(self):
+        self.assertEqual(
+            querystats.fingerprint('SELECT "T3"."id" FROM "t" WHERE "id" IN (%s, %s, %s) AND "name" = \'a\'\'b\' LIMIT 21'),
+            'SELECT "T3"."id" FROM "t" WHERE "id" IN (...) AND "name" = ? LIMIT ?')
+        self.assertEqual(querystats.fingerprint('SELECT * FROM "t" WHERE "id" IN (%s)'),
+                         querystats.fingerprint('SELECT *\nFROM "t" WHERE "id" IN (%s, %s)'))
+
+    def test_queries_are_aggregated_per_route(self):
+        user = create_business_user('anbieter')
+        self.client.force_authenticate(user)
+        stats = querystats.QueryStats()
+        with connection.execute_wrapper(stats):
+            self.client.get(reverse('profile-detail', args=[user.pk]))
+            self.client.get(reverse('profile-detail', args=[user.pk]))
+        routes = {route for _, route in stats.stats}
+        self.assertEqual(routes, {'profile-detail'})
+        self.assertTrue(all(calls == 2 for calls, _, _ in stats.stats.values()))
+
+        with tempfile.TemporaryDirectory() as directory:
+            stats.path = os.path.join(directory, 'querystats.sqlite3')
+            stats.flush()
+            out = StringIO()
+            call_command('querystats', '--path', stats.path, stdout=out)
+        self.assertIn('coderr_app_profile', out.getvalue())
+        self.assertIn('profile-detail', out.getvalue())
+
+    def test_statistics_are_written_in_the_background(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'querystats.sqlite3')
+            stats = querystats.QueryStats(path, flush_interval=0.05)
+            stats.record('SELECT 1', 2.0)
+            self.assertFalse(os.path.exists(path))
+            for _ in range(100):
+                if os.path.exists(path) and querystats.load(path):
+                    break
+                time.sleep(0.01)
+            self.assertEqual(querystats.load(path), [('SELECT ?', '-', 1, 2.0, 2.0)])
+
+
+class AsyncReadViewTests(APITestCase):
+    """
+    The async read views return the same JSON as their sync counterparts.
+    """
+
+    def setUp(self):
+        self.business = create_business_user('anbieter')
+        self.customer = User.objects.create_user(username='kunde')
+        self.offer = create_offer(self.business)
+        create_offer(self.business, title='Logo Design')
+        Review.objects.create(business_user=self.business, reviewer=self.customer, rating=4)
+        self.headers = {}
+
+    def assertSameResponse(self, view, url, *args, **params):
+        expected = self.client.get(url, params, headers=self.headers)
+        request = AsyncRequestFactory().get(url, params, headers=self.headers)
+        response = async_to_sync(view.as_view())(request, *args)
+        if hasattr(response, 'render'):
+            response.render()  # responses delegated to the sync view
+        self.assertEqual(response.status_code, expected.status_code)
+        self.assertEqual(json.loads(response.content), expected.json())
+        self.assertEqual(response.get('ETag'), expected.get('ETag'))
+
+    def test_offers(self):
+        self.assertSameResponse(AsyncOfferListView, reverse('offer-list'))
+        self.assertSameResponse(AsyncOfferListView, reverse('offer-list'), search='logo', page_size=1, page=2)
+        self.assertSameResponse(AsyncOfferDetailView, reverse('offer-detail', args=[self.offer.pk]), self.offer.pk)
+        self.assertSameResponse(AsyncOfferDetailView, reverse('offer-detail', args=[999]), 999)
+        detail = self.offer.details.first()
+        self.assertSameResponse(AsyncOfferDetailsDetailView, reverse('offerdetails-detail', args=[detail.pk]), detail.pk)
+
+    def test_base_info_and_profiles(self):
+        self.assertSameResponse(AsyncBaseInfoView, reverse('base-info'))
+        self.assertSameResponse(AsyncBusinessProfilesView, reverse('business_profiles'))
+        self.assertSameResponse(AsyncBusinessProfilesView, reverse('business_profile_detail', args=[self.business.pk]),
+                                self.business.pk)
+
+    def test_reviews(self):
+        token = Token.objects.create(user=self.customer)
+        self.headers = {'Authorization': f'Token {token.key}'}
+        self.assertSameResponse(AsyncReviewListView, reverse('reviews-list'), business_user_id=self.business.pk)
+
+        # Unauthenticated requests are answered by the sync view
+        self.headers = {}
+        self.assertSameResponse(AsyncReviewListView, reverse('reviews-list'))
+
+    def test_invalid_token_is_rejected(self):
+        self.headers = {'Authorization': 'Token invalid'}
+        self.assertSameResponse(AsyncOfferListView, reverse('offer-list'))
+        self.assertSameResponse(AsyncBaseInfoView, reverse('base-info'))
+        self.assertSameResponse(AsyncBusinessProfilesView, reverse('business_profiles'))
+
+    def test_setting_switches_the_routes(self):
+        with override_settings(ASYNC_VIEWS=True):
+            urls = importlib.reload(api_urls)
+        self.addCleanup(importlib.reload, api_urls)
+        # The first route of a name is the one that matches
+        views = {}
+        for pattern in urls.urlpatterns:
+            if isinstance(pattern, URLPattern):
+                views.setdefault(pattern.name, getattr(pattern.callback, 'view_class', None))
+        self.assertIs(views['offer-list'], AsyncOfferListView)
+        self.assertIs(views['base-info'], AsyncBaseInfoView)
+        with override_settings(ASYNC_VIEWS=False):
+            urls = importlib.reload(api_urls)
+        self.assertNotIn(AsyncOfferListView, [getattr(pattern.callback, 'view_class', None)
+                                              for pattern in urls.urlpatterns if isinstance(pattern, URLPattern)])
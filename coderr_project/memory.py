@@ -0,0 +1,104 @@
+"""
+Optional memory instrumentation of requests with tracemalloc.
+
+Enabled with `MEMORY_TRACING=1`. Every request then records its peak traced
+allocation per route in the metrics registry. For a sampled share of the
+requests (`settings.MEMORY_SNAPSHOT_RATE`), and for every request above
+`settings.MEMORY_BUDGET_BYTES`, the allocation sites that grew most are
+logged as one JSON object to the `coderr.memory` logger, with the route, so
+the sites can be grouped per endpoint. Sampled requests are compared to a
+snapshot taken before them; requests only found to be over budget afterwards
+are compared to the snapshot of the first request of the process.
+
+tracemalloc counts the allocations of all threads, so the peak of a request
+is only exact with one request per process at a time, like gunicorn's sync
+workers. Tracing slows Python code down noticeably, so enable it for a
+limited time or on a few workers.
+"""
+
+import json
+import logging
+import random
+import tracemalloc
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from coderr_project import metrics
+
+logger = logging.getLogger('coderr.memory')
+
+# Allocations of tracemalloc itself and of imports; Snapshot.filter_traces()
+# is slow, so they are skipped when the sites are listed
+IGNORED_FILES = {tracemalloc.__file__, '<frozen importlib._bootstrap>',
+                 '<frozen importlib._bootstrap_external>', '<unknown>'}
+
+
+def get_top_sites(snapshot, baseline, limit):
+    """
+    The allocation sites whose traced memory grew most since `baseline`.
+    Each site names the allocating line and the innermost line of this
+    project on its stack, e.g. the serializer method that caused it.
+    """
+    project = str(settings.BASE_DIR)
+    sites = []
+    for stat in snapshot.compare_to(baseline, 'traceback'):
+        frames = list(stat.traceback)  # most recent call first
+        if stat.size_diff <= 0 or frames[0].filename in IGNORED_FILES:
+            continue
+        caller = next((frame for frame in frames if frame.filename.startswith(project)), None)
+        sites.append({
+            'site': f'{frames[0].filename}:{frames[0].lineno}',
+            'caller': f'{caller.filename}:{caller.lineno}' if caller else None,
+            'size_kb': round(stat.size_diff / 1024, 1),
+            'count': stat.count_diff,
+        })
+        if len(sites) == limit:
+            break
+    return sites
+
+
+class MemoryMiddleware:
+    """
+    Records the peak memory of every request, see the module docstring.
+    Removed from the middleware chain unless `settings.MEMORY_TRACING` is set.
+    """
+
+    def __init__(self, get_response):
+        if not settings.MEMORY_TRACING:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.budget = settings.MEMORY_BUDGET_BYTES
+        self.snapshot_rate = settings.MEMORY_SNAPSHOT_RATE
+        self.top_sites = settings.MEMORY_TOP_SITES
+        self.baseline = None
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(settings.MEMORY_TRACE_FRAMES)
+
+    def __call__(self, request):
+        if self.baseline is None:
+            self.baseline = tracemalloc.take_snapshot()
+        before = tracemalloc.take_snapshot() if random.random() < self.snapshot_rate else None
+        tracemalloc.reset_peak()
+        current = tracemalloc.get_traced_memory()[0]
+
+        response = self.get_response(request)
+
+        peak = tracemalloc.get_traced_memory()[1] - current
+        match = request.resolver_match
+        route = (match.url_name or match.view_name) if match else 'unmatched'
+        metrics.registry.observe_memory(route, peak)
+
+        over_budget = peak > self.budget
+        if before is not None or over_budget:
+            # The response still holds its data, so its allocations are in the snapshot
+            sites = get_top_sites(tracemalloc.take_snapshot(), before or self.baseline, self.top_sites)
+            (logger.warning if over_budget else logger.info)(json.dumps({
+                'event': 'memory_over_budget' if over_budget else 'memory_sample',
+                'method': request.method,
+                'path': request.path,
+                'route': route,
+                'status': response.status_code,
+                'peak_bytes': peak,
+                'budget_bytes': self.budget,
+                'sites': sites,
+            }))
+        return response
@@ -0,0 +1,342 @@
+"""
+Request metrics in the Prometheus text format.
+
+Every process counts requests, latencies, query counts and, with memory
+tracing, peak allocations per route (the resolved URL name, e.g.
+`offer-list`), as well as cache hits, events, the duration of operations such
+as password hashing and the depth of work queues in memory. With
+`settings.METRICS_DIR` set, each process also writes a snapshot of its
+counters to its own file in that directory from a background thread, every
+`METRICS_FLUSH_INTERVAL` seconds while it has new counts, and when it exits.
+`/metrics` sums the snapshots of all processes, so it reports the whole
+gunicorn server no matter which worker answers the scrape. gunicorn.conf.py
+sets up a fresh directory when the server starts. The counts of exited workers
+must not go down, so their files are merged into one file, `exited.json`,
+when the metrics are collected.
+"""
+
+import atexit
+import hmac
+import json
+import os
+import threading
+import uuid
+from bisect import bisect_left
+from contextlib import contextmanager
+from pathlib import Path
+from django.conf import settings
+from django.http import HttpResponse
+from django.views.decorators.http import require_GET
+
+try:
+    import fcntl
+except ImportError:  # Windows, where the files of exited workers are not merged
+    fcntl = None
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+EXITED = 'exited.json'
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+MEMORY_BUCKETS = tuple(2 ** exponent for exponent in range(16, 31, 2))  # 64 KiB to 1 GiB
+QUEUE_BUCKETS = (0, 1, 2, 4, 8, 16, 32, 64)
+# Sections of histograms by route, operation or queue
+HISTOGRAM_SECTIONS = ('latency', 'queries', 'memory', 'operations', 'queues')
+
+
+def new_histogram(buckets):
+    # Counts per bucket (the last one is +Inf), then sum and count
+    return [0] * (len(buckets) + 1) + [0, 0]
+
+
+def observe(histogram, buckets, value):
+    histogram[bisect_left(buckets, value)] += 1
+    histogram[-2] += value
+    histogram[-1] += 1
+
+
+class Registry:
+    """
+    The counters of one process.
+    """
+
+    def __init__(self, directory=None, flush_interval=1.0):
+        self.directory = Path(directory) if directory else None
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self.reset()
+
+    def reset(self):
+        self.pid = os.getpid()
+        # Unique per process, so a reused pid does not overwrite the file of an exited worker
+        self.name = f'{self.pid}-{uuid.uuid4().hex[:8]}.json'
+        self.requests = {}
+        self.latency = {}
+        self.queries = {}
+        self.cache = {}
+        self.memory = {}
+        self.operations = {}
+        self.queues = {}
+        self.events = {}
+        self.dirty = False
+        self.flusher = None
+
+    def check_fork(self):
+        # Forked workers start with their own counters and flusher thread
+        if os.getpid() != self.pid:
+            self.reset()
+        # Called before every change, which the flusher thread then writes
+        self.dirty = True
+        if self.directory is not None and self.flusher is None:
+            self.flusher = threading.Thread(target=self.run_flusher, name='metrics-flusher', daemon=True)
+            self.flusher.start()
+
+    def run_flusher(self):
+        pid = self.pid
+        while not self._stopped.wait(self.flush_interval) and os.getpid() == pid:
+            if self.dirty:
+                self.flush()
+
+    def stop(self):
+        self._stopped.set()
+
+    def observe_request(self, route, method, status, seconds, queries=None):
+        with self._lock:
+            self.check_fork()
+            key = (route, method, str(status))
+            self.requests[key] = self.requests.get(key, 0) + 1
+            if route not in self.latency:
+                self.latency[route] = new_histogram(LATENCY_BUCKETS)
+            observe(self.latency[route], LATENCY_BUCKETS, seconds)
+            if queries is not None:
+                if route not in self.queries:
+                    self.queries[route] = new_histogram(QUERY_BUCKETS)
+                observe(self.queries[route], QUERY_BUCKETS, queries)
+
+    def count_cache(self, cache, hit):
+        key = (cache, 'hit' if hit else 'miss')
+        with self._lock:
+            self.check_fork()
+            self.cache[key] = self.cache.get(key, 0) + 1
+
+    def observe_memory(self, route, peak_bytes):
+        with self._lock:
+            self.check_fork()
+            if route not in self.memory:
+                self.memory[route] = new_histogram(MEMORY_BUCKETS)
+            observe(self.memory[route], MEMORY_BUCKETS, peak_bytes)
+
+    def observe_operation(self, operation, seconds):
+        with self._lock:
+            self.check_fork()
+            if operation not in self.operations:
+                self.operations[operation] = new_histogram(LATENCY_BUCKETS)
+            observe(self.operations[operation], LATENCY_BUCKETS, seconds)
+
+    def observe_queue(self, queue, depth):
+        """
+        Record how many jobs were ahead in `queue` when a job was submitted.
+        """
+        with self._lock:
+            self.check_fork()
+            if queue not in self.queues:
+                self.queues[queue] = new_histogram(QUEUE_BUCKETS)
+            observe(self.queues[queue], QUEUE_BUCKETS, depth)
+
+    def count_event(self, event):
+        with self._lock:
+            self.check_fork()
+            self.events[(event,)] = self.events.get((event,), 0) + 1
+
+    def snapshot(self):
+        with self._lock:
+            return to_snapshot({
+                'requests': self.requests, 'latency': self.latency, 'queries': self.queries,
+                'cache': self.cache, 'memory': self.memory, 'operations': self.operations,
+                'queues': self.queues, 'events': self.events,
+            })
+
+    def flush(self):
+        """
+        Write the snapshot of this process atomically to its file.
+        """
+        if os.getpid() != self.pid:
+            return  # inherited from the parent, which writes its own counts
+        self.dirty = False
+        write_json(self.directory, self.name, self.snapshot())
+
+    def collect(self):
+        """
+        The sum of the snapshots of all processes.
+        """
+        snapshots = [self.snapshot()]
+        if self.directory is not None and self.directory.is_dir():
+            with merged_exited(self.directory):
+                for path in self.directory.glob('*.json'):
+                    if path.name != self.name:
+                        snapshot = read_json(path)
+                        if snapshot is not None:
+                            snapshots.append(snapshot)
+        return merge(snapshots)
+
+
+def to_snapshot(counters):
+    snapshot = {section: [[*key, count] for key, count in counters[section].items()]
+                for section in ('requests', 'cache', 'events')}
+    snapshot.update({section: {route: histogram[:] for route, histogram in counters[section].items()}
+                     for section in HISTOGRAM_SECTIONS})
+    return snapshot
+
+
+def write_json(directory, name, data):
+    directory.mkdir(parents=True, exist_ok=True)
+    temporary = directory / f'{name}.{os.getpid()}.{threading.get_ident()}.tmp'
+    temporary.write_text(json.dumps(data))
+    os.replace(temporary, directory / name)
+
+
+def read_json(path):
+    try:
+        return json.loads(path.read_text())
+    except (OSError, ValueError):
+        return None  # removed or being replaced
+
+
+def is_running(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+@contextmanager
+def merged_exited(directory):
+    """
+    Add the files of exited processes to `exited.json` and remove them, so
+    recycled workers do not leave a growing number of files behind, then
+    hold a shared lock while the block reads the files. The lock keeps other
+    processes from counting a file both before and after it is merged.
+    """
+    if fcntl is None:
+        yield
+        return
+    with open(directory / '.lock', 'w') as lock:
+        try:
+            fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            pass  # another process is merging
+        else:
+            exited = [path for path in directory.glob('*-*.json')
+                      if path.name.split('-')[0].isdigit() and not is_running(int(path.name.split('-')[0]))]
+            if exited:
+                snapshots = [read_json(directory / EXITED) or {}]
+                snapshots += [snapshot for snapshot in map(read_json, exited) if snapshot is not None]
+                write_json(directory, EXITED, to_snapshot(merge(snapshots)))
+                for path in exited:
+                    path.unlink(missing_ok=True)
+        fcntl.flock(lock, fcntl.LOCK_SH)
+        yield
+
+
+def merge(snapshots):
+    merged = {'requests': {}, 'cache': {}, 'events': {}, **{section: {} for section in HISTOGRAM_SECTIONS}}
+    for snapshot in snapshots:
+        for section in ('requests', 'cache', 'events'):
+            for *key, count in snapshot.get(section, ()):
+                merged[section][tuple(key)] = merged[section].get(tuple(key), 0) + count
+        for section in HISTOGRAM_SECTIONS:
+            for route, histogram in snapshot.get(section, {}).items():
+                total = merged[section].setdefault(route, [0] * len(histogram))
+                for index, value in enumerate(histogram):
+                    total[index] += value
+    return merged
+
+
+def format_value(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def format_labels(**labels):
+    escaped = (str(value).replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n')
+               for value in labels.values())
+    return '{' + ','.join(f'{name}="{value}"' for name, value in zip(labels, escaped)) + '}'
+
+
+def render_histogram(lines, name, buckets, histograms, label='route'):
+    lines.append(f'# TYPE {name} histogram')
+    for value, histogram in sorted(histograms.items()):
+        cumulative = 0
+        for bound, count in zip((*buckets, '+Inf'), histogram):
+            cumulative += count
+            lines.append(f'{name}_bucket{format_labels(**{label: value}, le=bound)} {cumulative}')
+        lines.append(f'{name}_sum{format_labels(**{label: value})} {format_value(histogram[-2])}')
+        lines.append(f'{name}_count{format_labels(**{label: value})} {histogram[-1]}')
+
+
+def render(merged):
+    """
+    The metrics in the Prometheus text exposition format.
+    """
+    lines = [
+        '# HELP coderr_http_requests_total Requests by route, method and status code.',
+        '# TYPE coderr_http_requests_total counter',
+    ]
+    for (route, method, status), count in sorted(merged['requests'].items()):
+        lines.append(f'coderr_http_requests_total{format_labels(route=route, method=method, status=status)} {count}')
+
+    lines.append('# HELP coderr_http_request_duration_seconds Request latency by route.')
+    render_histogram(lines, 'coderr_http_request_duration_seconds', LATENCY_BUCKETS, merged['latency'])
+    lines.append('# HELP coderr_http_request_queries SQL queries per request by route.')
+    render_histogram(lines, 'coderr_http_request_queries', QUERY_BUCKETS, merged['queries'])
+    if merged['memory']:
+        lines.append('# HELP coderr_http_request_peak_memory_bytes Peak traced allocation per request by route.')
+        render_histogram(lines, 'coderr_http_request_peak_memory_bytes', MEMORY_BUCKETS, merged['memory'])
+    if merged['operations']:
+        lines.append('# HELP coderr_operation_duration_seconds Duration of operations, e.g. password_hash.')
+        render_histogram(lines, 'coderr_operation_duration_seconds', LATENCY_BUCKETS, merged['operations'],
+                         label='operation')
+    if merged['queues']:
+        lines.append('# HELP coderr_queue_depth Jobs ahead in a queue when a job was submitted.')
+        render_histogram(lines, 'coderr_queue_depth', QUEUE_BUCKETS, merged['queues'], label='queue')
+
+    lines += [
+        '# HELP coderr_cache_requests_total Cache lookups by cache and result.',
+        '# TYPE coderr_cache_requests_total counter',
+    ]
+    caches = sorted({cache for cache, _ in merged['cache']})
+    for (cache, result), count in sorted(merged['cache'].items()):
+        lines.append(f'coderr_cache_requests_total{format_labels(cache=cache, result=result)} {count}')
+    lines += [
+        '# HELP coderr_cache_hit_ratio Share of cache lookups that were hits.',
+        '# TYPE coderr_cache_hit_ratio gauge',
+    ]
+    for cache in caches:
+        hits, misses = merged['cache'].get((cache, 'hit'), 0), merged['cache'].get((cache, 'miss'), 0)
+        lines.append(f'coderr_cache_hit_ratio{format_labels(cache=cache)} {format_value(hits / (hits + misses))}')
+    lines += [
+        '# HELP coderr_events_total Operational events, e.g. worker_recycled.',
+        '# TYPE coderr_events_total counter',
+    ]
+    for (event,), count in sorted(merged['events'].items()):
+        lines.append(f'coderr_events_total{format_labels(event=event)} {count}')
+    return '\n'.join(lines) + '\n'
+
+
+@require_GET
+def metrics_view(request):
+    """
+    GET /metrics for Prometheus. Requires `Authorization: Bearer <METRICS_TOKEN>`
+    if that setting is set.
+    """
+    token = getattr(settings, 'METRICS_TOKEN', None)
+    if token and not hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {token}'):
+        return HttpResponse('Unauthorized', status=401, content_type='text/plain')
+    return HttpResponse(render(registry.collect()), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+registry = Registry(getattr(settings, 'METRICS_DIR', None), getattr(settings, 'METRICS_FLUSH_INTERVAL', 1.0))
+if registry.directory is not None:
+    # Keep the last counts of a worker that exits
+    atexit.register(lambda: registry.dirty and registry.flush())
@@ -1,32 +1,129 @@
-from django.utils.html import strip_tags
+"""
+Middleware that reports where each request spent its time.
+"""
+
 import json
+import logging
+import time
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from coderr_project import metrics, timing
+
+logger = logging.getLogger('coderr.slow_requests')
+
+
+class ServerTimingMiddleware:
+    """
+    Adds a `Server-Timing` header with the total, database, serialization,
+    rendering and sanitization time and the query count of every request, e.g.
+
+        Server-Timing: db;dur=3.1;desc="4 queries", serialize;dur=1.9, render;dur=0.8, sanitize;dur=0, app;dur=3.3, total;dur=9.1
+
+    `serialize` is the time serializers spend turning objects into data,
+    without the queries they run, `render` the JSON encoding. `app` is the
+    rest of the time, spent in views, middleware and validation.
+    Requests slower than `settings.SLOW_REQUEST_MS` or with more than
+    `settings.SLOW_REQUEST_QUERIES` queries are logged as one JSON object to
+    the `coderr.slow_requests` logger. Streamed bodies are produced after the
+    middleware returns and are not included.
+    """
+    sync_capable = True
+    async_capable = True
 
-class StripHTMLMiddleware:
     def __init__(self, get_response):
         self.get_response = get_response
+        self.slow_ms = settings.SLOW_REQUEST_MS
+        self.slow_queries = settings.SLOW_REQUEST_QUERIES
+        timing.install()
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
 
     def __call__(self, request):
-        if request.method in ['POST', 'PUT', 'PATCH']:
-            if request.content_type == 'application/json':  # Nur JSON-Daten prüfen
-                try:
-                    # Den Body des Requests parsen
-                    data = json.loads(request.body)                    
-                    # HTML-Bereinigung anwenden
-                    cleaned_data = self.clean_data(data)                    
-                    # Den bereinigten Body zurücksetzen
-                    request._body = json.dumps(cleaned_data).encode('utf-8')
-                except json.JSONDecodeError:
-                    print("Invalid JSON format in request body.")
-        return self.get_response(request)
-
-    def clean_data(self, data):
-        """
-        Recursively clean HTML tags from data.
-        """
-        if isinstance(data, dict):
-            return {key: self.clean_data(value) for key, value in data.items()}
-        elif isinstance(data, list):
-            return [self.clean_data(item) for item in data]
-        elif isinstance(data, str):
-            return strip_tags(data)
-        return data
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        timings, token = timing.start()
+        try:
+            response = self.get_response(request)
+        finally:
+            timing.stop(token)
+        return self.finish(request, response, timings)
+
+    async def __acall__(self, request):
+        timings, token = timing.start()
+        try:
+            response = await self.get_response(request)
+        finally:
+            timing.stop(token)
+        return self.finish(request, response, timings)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        # Lets the query statistics attribute queries to the view
+        timings = timing.get_current()
+        if timings is not None:
+            match = request.resolver_match
+            timings.route = match.url_name or match.view_name
+
+    def finish(self, request, response, timings):
+        total = timings.total() * 1000
+        db, serialize, render = timings.db * 1000, timings.serialize * 1000, timings.render * 1000
+        sanitize = timings.sanitize * 1000
+        app = max(0.0, total - db - serialize - render - sanitize)
+        response['Server-Timing'] = (
+            f'db;dur={db:.1f};desc="{timings.queries} queries", serialize;dur={serialize:.1f}, '
+            f'render;dur={render:.1f}, sanitize;dur={sanitize:.1f}, app;dur={app:.1f}, total;dur={total:.1f}')
+
+        if total >= self.slow_ms or timings.queries > self.slow_queries:
+            match = request.resolver_match
+            user = getattr(request, 'user', None)
+            logger.warning(json.dumps({
+                'event': 'slow_request',
+                'method': request.method,
+                'path': request.path,
+                'route': match.view_name if match else None,
+                'status': response.status_code,
+                'user_id': user.pk if user is not None and user.is_authenticated else None,
+                'total_ms': round(total, 1),
+                'db_ms': round(db, 1),
+                'queries': timings.queries,
+                'serialize_ms': round(serialize, 1),
+                'render_ms': round(render, 1),
+                'sanitize_ms': round(sanitize, 1),
+                'app_ms': round(app, 1),
+            }))
+        return response
+
+
+class MetricsMiddleware:
+    """
+    Counts every request in the metrics registry by its route, the resolved
+    URL name, or `unmatched` for unknown paths. The query count is taken from
+    ServerTimingMiddleware when it runs around this middleware.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        started = time.perf_counter()
+        response = self.get_response(request)
+        self.observe(request, response, started)
+        return response
+
+    async def __acall__(self, request):
+        started = time.perf_counter()
+        response = await self.get_response(request)
+        self.observe(request, response, started)
+        return response
+
+    def observe(self, request, response, started):
+        match = request.resolver_match
+        route = (match.url_name or match.view_name) if match else 'unmatched'
+        timings = timing.get_current()
+        metrics.registry.observe_request(route, request.method, response.status_code, time.perf_counter() - started,
+                                         timings.queries if timings is not None else None)
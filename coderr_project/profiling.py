@@ -0,0 +1,165 @@
+"""
+Sampled profiling of live requests.
+
+`ProfilingMiddleware` runs a request under cProfile when a staff user sends
+`X-Profile: 1`, or at random for `settings.PROFILE_SAMPLE_RATE` of all
+requests. Each profile is stored in `settings.PROFILE_DIR` as a pstats file
+next to a JSON file with the URL, route, status, duration and executed SQL
+(without parameters). The directory is a ring buffer: beyond
+`settings.PROFILE_MAX_COUNT` profiles the oldest are deleted. Inspect the
+profiles with `python manage.py profiles`.
+"""
+
+import cProfile
+import json
+import os
+import random
+import threading
+import time
+from pathlib import Path
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from rest_framework.exceptions import AuthenticationFailed
+from coderr_project import timing
+
+PROFILE_HEADER = 'X-Profile'
+
+# cProfile hooks into the interpreter, one profile per process at a time
+_profiling = threading.Lock()
+
+
+def get_directory():
+    return Path(settings.PROFILE_DIR)
+
+
+def get_profile_ids():
+    """
+    Ids of the stored profiles, oldest first.
+    """
+    return sorted(path.stem for path in get_directory().glob('*.json'))
+
+
+def load_meta(profile_id):
+    return json.loads((get_directory() / f'{profile_id}.json').read_text())
+
+
+def get_stats_path(profile_id):
+    return get_directory() / f'{profile_id}.prof'
+
+
+def save(profiler, meta):
+    """
+    Store a finished profile and drop the oldest ones beyond the limit.
+    """
+    directory = get_directory()
+    directory.mkdir(parents=True, exist_ok=True)
+    profile_id = f'{time.time_ns()}-{os.getpid()}'
+    profiler.dump_stats(get_stats_path(profile_id))
+    (directory / f'{profile_id}.json').write_text(json.dumps({'id': profile_id, **meta}))
+
+    for old_id in get_profile_ids()[:-settings.PROFILE_MAX_COUNT]:
+        delete(old_id)
+    return profile_id
+
+
+def delete(profile_id):
+    for suffix in ('.json', '.prof'):
+        (get_directory() / f'{profile_id}{suffix}').unlink(missing_ok=True)
+
+
+def is_staff_request(request):
+    """
+    Whether the request comes from a staff user, logged in by session or token.
+    Authentication normally happens in the DRF view, so a token is checked here.
+    """
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_authenticated:
+        return user.is_staff
+    keyword, _, key = request.headers.get('Authorization', '').partition(' ')
+    if keyword != 'Token' or not key:
+        return False
+    from user_auth_app.authentication import CachedTokenAuthentication
+    try:
+        user, _ = CachedTokenAuthentication().authenticate_credentials(key.strip())
+    except AuthenticationFailed:
+        return False
+    return user.is_staff
+
+
+class ProfilingMiddleware:
+    """
+    Profiles requests on demand or sampled, see the module docstring. Under
+    ASGI only the event loop thread is profiled, so sync views run through
+    `sync_to_async` show up as waiting.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.sample_rate = settings.PROFILE_SAMPLE_RATE
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def should_profile(self, request):
+        if request.headers.get(PROFILE_HEADER) == '1' and is_staff_request(request):
+            return True
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not self.should_profile(request) or not _profiling.acquire(blocking=False):
+            return self.get_response(request)
+        try:
+            profiler, timings, token = self.start()
+            try:
+                response = self.get_response(request)
+            finally:
+                profiler.disable()
+                self.stop(timings, token)
+            return self.finish(request, response, profiler, timings)
+        finally:
+            _profiling.release()
+
+    async def __acall__(self, request):
+        if not self.should_profile(request) or not _profiling.acquire(blocking=False):
+            return await self.get_response(request)
+        try:
+            profiler, timings, token = self.start()
+            try:
+                response = await self.get_response(request)
+            finally:
+                profiler.disable()
+                self.stop(timings, token)
+            return self.finish(request, response, profiler, timings)
+        finally:
+            _profiling.release()
+
+    def start(self):
+        # Reuse the timings of ServerTimingMiddleware to record the queries
+        timings, token = timing.get_current(), None
+        if timings is None:
+            timings, token = timing.start()
+        timings.query_log = []
+        profiler = cProfile.Profile()
+        profiler.enable()
+        return profiler, timings, token
+
+    def stop(self, timings, token):
+        if token is not None:
+            timing.stop(token)
+
+    def finish(self, request, response, profiler, timings):
+        match = request.resolver_match
+        query_log, timings.query_log = timings.query_log, None
+        response['X-Profile-Id'] = save(profiler, {
+            'method': request.method,
+            'url': request.get_full_path(),
+            'route': (match.url_name or match.view_name) if match else None,
+            'status': response.status_code,
+            'duration_ms': round(timings.total() * 1000, 1),
+            'created': time.time(),
+            'queries': [{'sql': sql, 'ms': round(duration * 1000, 2)} for sql, duration in query_log],
+        })
+        return response
@@ -0,0 +1,195 @@
+"""
+SQL statistics by fingerprint, and a slow query log.
+
+With `QUERY_STATS=1`, every statement run through a Django connection is
+reduced to a fingerprint, its SQL with all literals and parameters replaced by
+`?` and lists of them collapsed, so `WHERE id IN (1, 2, 3)` and
+`WHERE id IN (4, 5)` count as one query. Calls, total and maximum time are
+aggregated per fingerprint and route (the URL name of the view, or `-` outside
+requests) in process, and added to the SQLite file `settings.QUERY_STATS_PATH`
+by a background thread every `QUERY_STATS_FLUSH_INTERVAL` seconds and when the
+process exits, so requests never wait for the file. All processes add to the
+same file. Statements slower than `SLOW_QUERY_MS` are
+also logged to the `coderr.slow_queries` logger. `python manage.py querystats`
+shows the fingerprints that cost the most time.
+"""
+
+import atexit
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from functools import lru_cache
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from coderr_project import timing
+
+logger = logging.getLogger('coderr.slow_queries')
+
+STRING = re.compile(r"'(?:[^']|'')*'")
+NUMBER = re.compile(r'(?<![\w."])-?\d+(?:\.\d+)?(?![\w"])')
+PARAMETER = re.compile(r'%s|%\(\w+\)s|\?')
+PARAMETER_LIST = re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)')
+ROW_LIST = re.compile(r'(\(\.\.\.\))(?:\s*,\s*\(\.\.\.\))+')
+WHITESPACE = re.compile(r'\s+')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS querystats (
+    fingerprint TEXT NOT NULL,
+    route TEXT NOT NULL,
+    calls INTEGER NOT NULL,
+    total_ms REAL NOT NULL,
+    max_ms REAL NOT NULL,
+    PRIMARY KEY (fingerprint, route)
+)
+"""
+
+
+@lru_cache(maxsize=4096)
+def fingerprint(sql):
+    """
+    The SQL with literals replaced by `?`, lists of them and the rows of a
+    bulk insert collapsed to `(...)`, and whitespace normalized.
+    """
+    sql = STRING.sub('?', sql)
+    sql = NUMBER.sub('?', sql)
+    sql = PARAMETER.sub('?', sql)
+    sql = PARAMETER_LIST.sub('(...)', sql)
+    sql = ROW_LIST.sub(r'\1', sql)
+    return WHITESPACE.sub(' ', sql).strip()
+
+
+class QueryStats:
+    """
+    Execute wrapper that aggregates the statements of this process.
+    """
+
+    def __init__(self, path=None, flush_interval=10.0, slow_ms=None):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.slow_ms = slow_ms
+        self.stats = {}
+        self.pid = os.getpid()
+        self.flusher = None
+        self._lock = threading.Lock()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.record(sql, (time.perf_counter() - started) * 1000)
+
+    def record(self, sql, duration_ms):
+        if self.pid != os.getpid() or (self.path and self.flusher is None):
+            self.check_process()
+        timings = timing.get_current()
+        route = timings.route if timings is not None and timings.route else '-'
+        key = (fingerprint(sql), route)
+        with self._lock:
+            entry = self.stats.get(key)
+            if entry is None:
+                self.stats[key] = [1, duration_ms, duration_ms]
+            else:
+                entry[0] += 1
+                entry[1] += duration_ms
+                if duration_ms > entry[2]:
+                    entry[2] = duration_ms
+
+        if self.slow_ms is not None and duration_ms >= self.slow_ms:
+            logger.warning(json.dumps({
+                'event': 'slow_query', 'route': route, 'duration_ms': round(duration_ms, 2),
+                'fingerprint': key[0],
+            }))
+
+    def check_process(self):
+        with self._lock:
+            if self.pid != os.getpid():
+                # Forked: the statistics so far are the parent's, which writes them
+                self.pid, self.stats, self.flusher = os.getpid(), {}, None
+            if self.path and self.flusher is None:
+                self.flusher = threading.Thread(target=self.run_flusher, name='querystats-flusher', daemon=True)
+                self.flusher.start()
+
+    def run_flusher(self):
+        while True:
+            time.sleep(self.flush_interval)
+            self.flush()
+
+    def flush(self):
+        """
+        Add the statistics since the last flush to the SQLite file.
+        """
+        if self.pid != os.getpid():
+            return
+        with self._lock:
+            stats, self.stats = self.stats, {}
+        if not stats:
+            return
+        try:
+            with sqlite3.connect(self.path, timeout=5) as database:
+                database.execute(SCHEMA)
+                database.executemany("""
+                    INSERT INTO querystats (fingerprint, route, calls, total_ms, max_ms) VALUES (?, ?, ?, ?, ?)
+                    ON CONFLICT (fingerprint, route) DO UPDATE SET
+                        calls = calls + excluded.calls,
+                        total_ms = total_ms + excluded.total_ms,
+                        max_ms = max(max_ms, excluded.max_ms)
+                """, [(*key, *entry) for key, entry in stats.items()])
+            database.close()
+        except sqlite3.Error as exc:
+            logger.warning(json.dumps({'event': 'querystats_flush_failed', 'error': str(exc)}))
+            with self._lock:
+                # Keep the numbers for the next flush
+                for key, (calls, total_ms, max_ms) in stats.items():
+                    entry = self.stats.setdefault(key, [0, 0.0, 0.0])
+                    entry[0] += calls
+                    entry[1] += total_ms
+                    entry[2] = max(entry[2], max_ms)
+
+
+def load(path, route=None, order_by='total_ms', limit=20):
+    """
+    The stored statistics, most expensive first.
+    """
+    order = {'total_ms': 'total_ms', 'max_ms': 'max_ms', 'calls': 'calls', 'mean_ms': 'total_ms / calls'}[order_by]
+    with sqlite3.connect(path) as database:
+        database.execute(SCHEMA)
+        rows = database.execute(
+            f"""SELECT fingerprint, route, calls, total_ms, max_ms FROM querystats
+                WHERE ? IS NULL OR route = ? ORDER BY {order} DESC LIMIT ?""", (route, route, limit)).fetchall()
+    database.close()
+    return rows
+
+
+def clear(path):
+    with sqlite3.connect(path) as database:
+        database.execute(SCHEMA)
+        database.execute('DELETE FROM querystats')
+    database.close()
+
+
+query_stats = None
+
+
+def install_query_stats(connection, **kwargs):
+    if query_stats not in connection.execute_wrappers:
+        connection.execute_wrappers.append(query_stats)
+
+
+def install():
+    """
+    Aggregate the statements of every connection of this process.
+    """
+    global query_stats
+    if query_stats is not None:
+        return
+    query_stats = QueryStats(settings.QUERY_STATS_PATH, settings.QUERY_STATS_FLUSH_INTERVAL, settings.SLOW_QUERY_MS)
+    connection_created.connect(install_query_stats, dispatch_uid='coderr_project.querystats')
+    for connection in connections.all(initialized_only=True):
+        install_query_stats(connection)
+    atexit.register(query_stats.flush)
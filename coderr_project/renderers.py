@@ -0,0 +1,16 @@
+"""
+Response renderers that record their time for the Server-Timing header.
+"""
+
+from rest_framework.renderers import JSONRenderer
+from coderr_project.timing import timed
+
+
+class TimedJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer whose encoding time is reported as `render`.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        with timed('render'):
+            return super().render(data, accepted_media_type, renderer_context)
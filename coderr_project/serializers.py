@@ -0,0 +1,18 @@
+"""
+Serializers that record their time for the Server-Timing header.
+"""
+
+from rest_framework import serializers
+from coderr_project.timing import timed
+
+
+class TimedModelSerializer(serializers.ModelSerializer):
+    """
+    ModelSerializer whose `to_representation`, which `.data` runs inside the
+    view, is reported as `serialize`. Nested serializers count as part of the
+    outermost one.
+    """
+
+    def to_representation(self, instance):
+        with timed('serialize'):
+            return super().to_representation(instance)
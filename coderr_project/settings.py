@@ -14,6 +14,7 @@ from pathlib import Path
 from dotenv import load_dotenv
 load_dotenv()
 import os
+import tempfile
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -51,14 +52,16 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
-   'coderr_project.middleware.StripHTMLMiddleware',  
+    'coderr_project.middleware.ServerTimingMiddleware',
+    'coderr_project.middleware.MetricsMiddleware',
+    'coderr_project.memory.MemoryMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     # 'django.middleware.csrf.CsrfViewMiddleware',
-    # 'coderr_project.middleware.StripHTMLMiddleware',  
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'coderr_project.profiling.ProfilingMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     
@@ -101,11 +104,49 @@ WSGI_APPLICATION = 'coderr_project.wsgi.application'
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        # Overridable so benchmarks can run against a separate seeded database
+        'NAME': os.environ.get('SQLITE_PATH', BASE_DIR / 'db.sqlite3'),
     }
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    # Small state all worker processes of a host must agree on, like the offer
+    # catalog version. Use a DatabaseCache or Redis when running several hosts.
+    'shared': {
+        'BACKEND': os.environ.get('SHARED_CACHE_BACKEND', 'django.core.cache.backends.filebased.FileBasedCache'),
+        'LOCATION': os.environ.get('SHARED_CACHE_LOCATION', os.path.join(tempfile.gettempdir(), 'coderr-shared-cache')),
+        'TIMEOUT': None,
+    },
+    # Response cache of the public offer catalog (see coderr_app.catalog_cache).
+    # Entries are keyed by the catalog version in the 'shared' cache, so a
+    # per-process LocMemCache is only less efficient than a shared backend,
+    # never stale. Entries still expire as a safety net.
+    'offers': {
+        'BACKEND': os.environ.get('OFFER_CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get('OFFER_CACHE_LOCATION', 'offer-catalog'),
+        'TIMEOUT': int(os.environ.get('OFFER_CACHE_TIMEOUT', 300)),
+        'OPTIONS': {
+            'MAX_ENTRIES': int(os.environ.get('OFFER_CACHE_MAX_ENTRIES', 5000)),
+            'CULL_FREQUENCY': 10,
+        },
+    },
+}
+
+OFFER_CACHE_ALIAS = 'offers'
+OFFER_CACHE_VERSION_ALIAS = 'shared'
+
+# Retries with the same Idempotency-Key are answered from the first result
+# for this long (see coderr_app.idempotency)
+IDEMPOTENCY_KEY_TTL = 24 * 60 * 60
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
 
@@ -159,6 +200,86 @@ REST_FRAMEWORK = {
     ],
     'DEFAULT_AUTHENTICATION_CLASSES': [
         'rest_framework.authentication.SessionAuthentication',
-        'rest_framework.authentication.TokenAuthentication',
+        'user_auth_app.authentication.CachedTokenAuthentication',
+    ],
+    # JSON encoding time is reported in the Server-Timing header
+    'DEFAULT_RENDERER_CLASSES': [
+        'coderr_project.renderers.TimedJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
     ],
+    # HTML tags are removed from all text inputs while the body is parsed
+    'DEFAULT_PARSER_CLASSES': [
+        'coderr_project.parsers.SanitizingJSONParser',
+        'coderr_project.parsers.SanitizingFormParser',
+        'coderr_project.parsers.SanitizingMultiPartParser',
+    ],
+}
+
+# Authenticated tokens are cached in process together with user and profile,
+# keyed by a version in the shared cache that token, user and profile writes bump
+TOKEN_CACHE_SIZE = 10000
+TOKEN_CACHE_TTL = 60  # seconds
+TOKEN_CACHE_VERSION_ALIAS = 'shared'
+
+# Optional token lifetime and rotation on login, in seconds (None = never)
+TOKEN_EXPIRY = None
+TOKEN_ROTATE_AFTER = None
+
+# Serve the async variants of the views; only useful when running under ASGI
+ASYNC_VIEWS = os.environ.get('ASYNC_VIEWS') == '1'
+
+# The async login runs in a bounded thread pool for password hashing; logins beyond
+# workers + queue are rejected with 503 and Retry-After
+PASSWORD_HASHING_WORKERS = 4
+PASSWORD_HASHING_QUEUE = 16
+
+# Largest number of offers accepted by one POST /offers/import/
+OFFER_IMPORT_MAX_ITEMS = 5000
+
+# Requests slower than this, or with more queries, are logged to coderr.slow_requests
+SLOW_REQUEST_MS = int(os.environ.get('SLOW_REQUEST_MS', 500))
+SLOW_REQUEST_QUERIES = int(os.environ.get('SLOW_REQUEST_QUERIES', 50))
+
+# Metrics of all gunicorn workers are shared through files in this directory,
+# which should be emptied when the server starts; unset, /metrics covers only
+# the process answering it. Optional bearer token required by /metrics.
+METRICS_DIR = os.environ.get('METRICS_DIR')
+METRICS_FLUSH_INTERVAL = 1.0  # seconds
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+
+# Requests are profiled for staff users sending `X-Profile: 1` and for this
+# share of all requests; the last PROFILE_MAX_COUNT profiles are kept
+PROFILE_SAMPLE_RATE = float(os.environ.get('PROFILE_SAMPLE_RATE', 0))
+PROFILE_DIR = os.environ.get('PROFILE_DIR', os.path.join(BASE_DIR, 'profiles'))
+PROFILE_MAX_COUNT = 200
+
+# Optional tracemalloc instrumentation: peak memory per request, allocation
+# sites of a sampled share of requests and of requests above the budget
+MEMORY_TRACING = os.environ.get('MEMORY_TRACING') == '1'
+MEMORY_TRACE_FRAMES = 10
+MEMORY_SNAPSHOT_RATE = float(os.environ.get('MEMORY_SNAPSHOT_RATE', 0.01))
+MEMORY_BUDGET_BYTES = int(os.environ.get('MEMORY_BUDGET_MB', 64)) * 1024 * 1024
+MEMORY_TOP_SITES = 10
+
+# Statistics of all SQL statements by fingerprint and route, added to a SQLite
+# file (see `manage.py querystats`); statements above SLOW_QUERY_MS are logged
+QUERY_STATS = os.environ.get('QUERY_STATS') == '1'
+QUERY_STATS_PATH = os.environ.get('QUERY_STATS_PATH', os.path.join(BASE_DIR, 'querystats.sqlite3'))
+QUERY_STATS_FLUSH_INTERVAL = 10.0  # seconds
+SLOW_QUERY_MS = float(os.environ.get('SLOW_QUERY_MS', 100))
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'message': {'format': '%(message)s'},
+    },
+    'handlers': {
+        'structured': {'class': 'logging.StreamHandler', 'formatter': 'message'},
+    },
+    'loggers': {
+        'coderr.slow_requests': {'handlers': ['structured'], 'level': 'WARNING', 'propagate': False},
+        'coderr.memory': {'handlers': ['structured'], 'level': 'INFO', 'propagate': False},
+        'coderr.slow_queries': {'handlers': ['structured'], 'level': 'WARNING', 'propagate': False},
+    },
 }
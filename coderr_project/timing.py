@@ -0,0 +1,107 @@
+"""
+Per-request timing of database queries, serialization, response rendering and
+input sanitization.
+
+`ServerTimingMiddleware` stores a `RequestTimings` object in a context
+variable for the duration of a request. Database time is recorded by an
+execute wrapper installed once on every connection, the other phases with
+`timed()`, which leaves out the time of the queries run inside it. Outside a request both are a context variable lookup, so they can
+stay enabled everywhere. Context variables follow the request into the
+threads of `sync_to_async`, so the timings also work under ASGI.
+"""
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+_current = ContextVar('request_timings', default=None)
+
+
+class RequestTimings:
+    """
+    Accumulated seconds per phase of one request, and its number of queries.
+    Setting `query_log` to a list also records every query with its duration.
+    `route` is the URL name of the view, once it is resolved. `active` holds
+    the phases being timed, so nested blocks of one phase count once.
+    """
+    __slots__ = ('started', 'db', 'queries', 'serialize', 'render', 'sanitize', 'query_log', 'route', 'active')
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.db = self.serialize = self.render = self.sanitize = 0.0
+        self.active = set()
+        self.queries = 0
+        self.query_log = None
+        self.route = None
+
+    def total(self):
+        return time.perf_counter() - self.started
+
+
+def start():
+    """
+    Start timing a request. Returns the timings and a token for `stop()`.
+    """
+    timings = RequestTimings()
+    return timings, _current.set(timings)
+
+
+def stop(token):
+    _current.reset(token)
+
+
+def get_current():
+    return _current.get()
+
+
+@contextmanager
+def timed(phase):
+    """
+    Add the time spent in the block to `phase` of the current request, except
+    for the time of its queries, which is database time.
+    """
+    timings = _current.get()
+    if timings is None or phase in timings.active:
+        yield
+        return
+    timings.active.add(phase)
+    started, db = time.perf_counter(), timings.db
+    try:
+        yield
+    finally:
+        timings.active.discard(phase)
+        elapsed = time.perf_counter() - started - (timings.db - db)
+        setattr(timings, phase, getattr(timings, phase) + elapsed)
+
+
+def record_query(execute, sql, params, many, context):
+    timings = _current.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        duration = time.perf_counter() - started
+        timings.db += duration
+        timings.queries += 1
+        if timings.query_log is not None:
+            timings.query_log.append((sql, duration))
+
+
+def install_query_timer(connection, **kwargs):
+    # Connections are per thread and keep their wrappers across reconnects
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+def install():
+    """
+    Record queries on the connections of this thread and on every connection
+    opened later.
+    """
+    connection_created.connect(install_query_timer, dispatch_uid='coderr_project.timing')
+    for connection in connections.all(initialized_only=True):
+        install_query_timer(connection)
@@ -0,0 +1,77 @@
+"""
+Gunicorn configuration, loaded automatically when gunicorn starts in this directory:
+
+    gunicorn coderr_project.wsgi:application
+
+Workers are recycled once their resident memory exceeds WORKER_MAX_RSS_MB
+(checked after every request): the worker finishes the request, exits and is
+replaced by a fresh one. Every recycle is logged and counted in /metrics as
+`coderr_events_total{event="worker_recycled"}`. The check runs in gunicorn's
+post_request hook, which only the sync and thread workers call. Async worker
+classes such as uvicorn.workers.UvicornWorker never call it; recycle those
+after GUNICORN_MAX_REQUESTS requests instead, which they do honour.
+
+The workers share their metrics through METRICS_DIR. Unless it is set, a new
+temporary directory is created when the server starts and removed when it
+stops; a configured directory is emptied instead.
+"""
+
+import json
+import os
+import shutil
+import tempfile
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:8000')
+workers = int(os.environ.get('GUNICORN_WORKERS', 2))
+
+# 0 disables recycling by request count; jitter keeps workers from restarting together
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 0))
+max_requests_jitter = max_requests // 10
+
+WORKER_MAX_RSS_MB = int(os.environ.get('WORKER_MAX_RSS_MB', 512))
+
+
+def get_rss_bytes():
+    """
+    Current resident memory of this process.
+    """
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except OSError:
+        import resource
+        import sys
+        # Peak instead of current RSS; in bytes on macOS, KiB elsewhere
+        maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return maxrss if sys.platform == 'darwin' else maxrss * 1024
+
+
+def on_starting(server):
+    # Runs in the arbiter before the workers load the settings, so they inherit it
+    metrics_dir = os.environ.get('METRICS_DIR')
+    if metrics_dir:
+        shutil.rmtree(metrics_dir, ignore_errors=True)
+    else:
+        os.environ['METRICS_DIR'] = server.metrics_tempdir = tempfile.mkdtemp(prefix='coderr-metrics-')
+
+
+def on_exit(server):
+    metrics_tempdir = getattr(server, 'metrics_tempdir', None)
+    if metrics_tempdir:
+        shutil.rmtree(metrics_tempdir, ignore_errors=True)
+
+
+def post_request(worker, req, environ, resp):
+    rss = get_rss_bytes()
+    if worker.alive and rss > WORKER_MAX_RSS_MB * 1024 * 1024:
+        from coderr_project import metrics
+        worker.log.warning(json.dumps({
+            'event': 'worker_recycled',
+            'pid': worker.pid,
+            'rss_bytes': rss,
+            'limit_bytes': WORKER_MAX_RSS_MB * 1024 * 1024,
+            'path': req.path,
+        }))
+        metrics.registry.count_event('worker_recycled')
+        # The worker exits after this request and the arbiter starts a new one
+        worker.alive = False
@@ -1,7 +1,11 @@
+from django.conf import settings
 from django.urls import path
-from .views import RegistrationView, CustomLoginView
+from .views import RegistrationView, CustomLoginView, AsyncLoginView
+
+# Under ASGI the async login keeps password hashing off the event loop
+LoginView = AsyncLoginView if settings.ASYNC_VIEWS else CustomLoginView
 
 urlpatterns = [
 path('registration/', RegistrationView.as_view(), name='registration'),
-path('login/', CustomLoginView.as_view(), name='login'),
-]
\ No newline at end of file
+path('login/', LoginView.as_view(), name='login'),
+]
@@ -6,7 +6,13 @@ from rest_framework.permissions import AllowAny
 from rest_framework import status
 from coderr_app.models import Profile
 from django.contrib.auth.models import User
-from django.contrib.auth import authenticate
+from django.http import JsonResponse
+from django.views import View
+from user_auth_app.authentication import get_fresh_token
+from user_auth_app.hashing import hashing_pool, HashingPoolSaturated, timed_authenticate
+
+SATURATED_DETAIL = {'detail': ['Zu viele Anmeldungen gleichzeitig, bitte gleich erneut versuchen.']}
+SATURATED_RETRY_AFTER = '1'
 
 
 def get_guest_user():
@@ -42,6 +48,8 @@ Registration: Save userdata and profile and response json for LocalStorage
 """
 class RegistrationView(APIView):
     permission_classes = [AllowAny]
+    # Passwords are hashed, never rendered, and may contain "<"
+    sanitize_exempt_fields = ('password', 'repeated_password')
 
     def post(self, request):
         serializer = RegistrationSerializer(data=request.data)
@@ -65,6 +73,7 @@ Login: Authenticate User and response json for LocalStorage
 """
 class CustomLoginView(APIView):
     permission_classes = [AllowAny]
+    sanitize_exempt_fields = ('password',)
 
     def post(self, request):
 
@@ -85,12 +94,12 @@ class CustomLoginView(APIView):
         email = request.data.get('email')
         username = request.data.get('username')
         password = request.data.get('password')
-        user = authenticate(request, username=username, password=password)
+        user = timed_authenticate(request, username=username, password=password)
         if user is None:
             return Response({'detail': ['Falsche Anmeldedaten.']}, status=status.HTTP_400_BAD_REQUEST)
 
-        # Falls Login erfolgreich, Token generieren und Contact-Daten abrufen
-        token, created = Token.objects.get_or_create(user=user)
+        # Falls Login erfolgreich, Token generieren (bzw. rotieren) und Contact-Daten abrufen
+        token = get_fresh_token(user)
 
         try:
             contact = Profile.objects.get(user=user)
@@ -105,3 +114,18 @@ class CustomLoginView(APIView):
             "user_id": user.pk
         }
         return Response(data)
+
+
+"""
+Async login for ASGI deployments: CustomLoginView run in the password hashing
+pool, so the event loop is never blocked by password hashing
+"""
+class AsyncLoginView(View):
+    login_view = staticmethod(CustomLoginView.as_view())
+
+    async def post(self, request):
+        try:
+            return await hashing_pool.arun(self.login_view, request)
+        except HashingPoolSaturated:
+            return JsonResponse(SATURATED_DETAIL, status=status.HTTP_503_SERVICE_UNAVAILABLE,
+                                headers={'Retry-After': SATURATED_RETRY_AFTER})
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class UserAuthAppConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'user_auth_app'
+
+    def ready(self):
+        # Register the signal handlers
+        from user_auth_app import signals  # noqa: F401
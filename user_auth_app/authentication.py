@@ -0,0 +1,103 @@
+"""
+Token authentication with an in-process cache of the resolved principal.
+
+A cache miss resolves token, user and profile in one joined query. The result
+is kept in a bounded LRU cache with TTL, so most authenticated requests do not
+touch the database for authentication, and permission checks on
+`request.user.profile` do not need another query.
+
+Entries are keyed by a version kept in the cache `settings.TOKEN_CACHE_VERSION_ALIAS`,
+which all workers share (a file based cache by default). The signals in
+user_auth_app.signals bump it when a token, user or profile is saved or
+deleted, so a rotated or deleted token is rejected by every worker on its next
+request, at the cost of one lookup of the version per authenticated request.
+"""
+
+import copy
+import time
+from datetime import timedelta
+from django.conf import settings
+from django.core.cache import caches
+from django.utils import timezone
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+from rest_framework.exceptions import AuthenticationFailed
+from coderr_project import metrics
+from coderr_project.lru import TTLLRUCache
+
+token_cache = TTLLRUCache(
+    maxsize=getattr(settings, 'TOKEN_CACHE_SIZE', 10000),
+    ttl=getattr(settings, 'TOKEN_CACHE_TTL', 60),
+)
+
+VERSION_KEY = 'token-principal:version'
+
+
+def get_version_cache():
+    return caches[getattr(settings, 'TOKEN_CACHE_VERSION_ALIAS', 'shared')]
+
+
+def get_version():
+    cache = get_version_cache()
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        # Start from the clock, so a lost version key never revives old entries
+        cache.add(VERSION_KEY, time.time_ns(), timeout=None)
+        version = cache.get(VERSION_KEY)
+    return version
+
+
+def bump_version():
+    # A new clock value, as in coderr_app.catalog_cache.bump_version
+    get_version_cache().set(VERSION_KEY, time.time_ns(), timeout=None)
+
+
+def is_token_expired(token):
+    """
+    Tokens expire TOKEN_EXPIRY seconds after they were created. No expiry if unset.
+    """
+    expiry = getattr(settings, 'TOKEN_EXPIRY', None)
+    return expiry is not None and token.created < timezone.now() - timedelta(seconds=expiry)
+
+
+def get_fresh_token(user):
+    """
+    Return the token of the user, creating it if needed. Tokens older than
+    TOKEN_ROTATE_AFTER seconds (or expired ones) are replaced with a new key.
+    """
+    token, created = Token.objects.get_or_create(user=user)
+    rotate_after = getattr(settings, 'TOKEN_ROTATE_AFTER', None)
+    too_old = rotate_after is not None and token.created < timezone.now() - timedelta(seconds=rotate_after)
+    if not created and (too_old or is_token_expired(token)):
+        token.delete()
+        token = Token.objects.create(user=user)
+    return token
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    Drop-in replacement for DRF's TokenAuthentication that caches the token
+    together with its user and the user's profile.
+    """
+
+    def authenticate_credentials(self, key):
+        cache_key = (get_version(), key)
+        token = token_cache.get(cache_key)
+        metrics.registry.count_cache('token', token is not None)
+        if token is None:
+            try:
+                token = Token.objects.select_related('user', 'user__profile').get(key=key)
+            except Token.DoesNotExist:
+                raise AuthenticationFailed('Invalid token.')
+            token_cache.set(cache_key, token)
+
+        if not token.user.is_active:
+            raise AuthenticationFailed('User inactive or deleted.')
+
+        if is_token_expired(token):
+            token_cache.delete(cache_key)
+            raise AuthenticationFailed('Token has expired.')
+
+        # Every request gets its own copy, so views cannot change the cached entry
+        token = copy.deepcopy(token)
+        return (token.user, token)
@@ -0,0 +1,100 @@
+"""
+Password hashing off the event loop.
+
+PBKDF2 runs for a noticeable time per login. Under ASGI the async login runs
+the login, django.contrib.auth.authenticate() included, in a bounded thread
+pool (hashlib releases the GIL while hashing) instead of on the event loop or
+the single thread of sync_to_async. Once all workers are busy and the queue is
+full, new logins fail fast with HashingPoolSaturated, which the async login
+turns into a 503 with Retry-After, instead of stalling other requests.
+
+Under WSGI every request has its own worker thread or process anyway, so the
+sync login calls authenticate() directly. Both logins record the duration of
+authenticate() in /metrics; the async login also records the jobs already in
+the pool and the wait for a worker.
+"""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.contrib.auth import authenticate
+from django.db import close_old_connections
+from coderr_project import metrics
+
+QUEUE = 'password_hashing'
+
+
+class HashingPoolSaturated(Exception):
+    """
+    Raised when all hashing workers are busy and the queue is full.
+    """
+
+
+class PasswordHashingPool:
+    """
+    Thread pool with at most `max_workers` running and `max_queue` waiting jobs.
+    For every submitted job, the jobs already in the pool and its wait for a
+    worker are recorded in the metrics registry. Rejected jobs are counted as
+    the event `password_hashing_saturated`.
+    """
+
+    def __init__(self, max_workers, max_queue):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='password-hashing')
+        self._slots = threading.BoundedSemaphore(max_workers + max_queue)
+        self._lock = threading.Lock()
+        self.pending = 0
+
+    def submit(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            metrics.registry.count_event('password_hashing_saturated')
+            raise HashingPoolSaturated()
+        with self._lock:
+            metrics.registry.observe_queue(QUEUE, self.pending)
+            self.pending += 1
+        try:
+            future = self._executor.submit(self._run, time.perf_counter(), fn, *args)
+        except BaseException:
+            self._done()
+            raise
+        future.add_done_callback(lambda _: self._done())
+        return future
+
+    async def arun(self, fn, *args):
+        """
+        Run `fn` in the pool without blocking the event loop.
+        """
+        return await asyncio.wrap_future(self.submit(fn, *args))
+
+    def _run(self, submitted, fn, *args):
+        metrics.registry.observe_operation('password_hashing_wait', time.perf_counter() - submitted)
+        try:
+            return fn(*args)
+        finally:
+            # Jobs may query the database; like a request, they end by closing
+            # the connection of their thread unless it is persistent
+            close_old_connections()
+
+    def _done(self):
+        with self._lock:
+            self.pending -= 1
+        self._slots.release()
+
+
+def timed_authenticate(request, **credentials):
+    """
+    django.contrib.auth.authenticate(), with its duration, which is mostly
+    password hashing, recorded as the operation `password_hash`.
+    """
+    start = time.perf_counter()
+    try:
+        return authenticate(request, **credentials)
+    finally:
+        metrics.registry.observe_operation('password_hash', time.perf_counter() - start)
+
+
+hashing_pool = PasswordHashingPool(
+    max_workers=getattr(settings, 'PASSWORD_HASHING_WORKERS', 4),
+    max_queue=getattr(settings, 'PASSWORD_HASHING_QUEUE', 16),
+)
@@ -0,0 +1,22 @@
+"""
+Signal handlers that invalidate the cached token principals of
+user_auth_app.authentication on all workers.
+"""
+
+from django.contrib.auth.models import User
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+from coderr_app.models import Profile
+from user_auth_app.authentication import bump_version
+
+
+@receiver(post_save, sender=Token)
+@receiver(post_delete, sender=Token)
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+@receiver(post_save, sender=Profile)
+@receiver(post_delete, sender=Profile)
+def invalidate_tokens(sender, instance, **kwargs):
+    # Entries of the old version are never read again, on any worker
+    bump_version()
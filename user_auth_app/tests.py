@@ -1,3 +1,177 @@
-from django.test import TestCase
+import json
+import threading
+from unittest import mock
+from asgiref.sync import async_to_sync
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.signals import user_login_failed
+from django.contrib.auth.models import User
+from django.test import AsyncRequestFactory, override_settings
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase, APITransactionTestCase
+from coderr_app.models import Profile
+from user_auth_app.api.views import AsyncLoginView
+from user_auth_app import authentication
+from user_auth_app.authentication import token_cache
+from coderr_project import metrics
+from user_auth_app.hashing import HashingPoolSaturated, PasswordHashingPool, hashing_pool
 
-# Create your tests here.
+
+class CachedTokenAuthenticationTests(APITestCase):
+    """
+    Token, user and profile are resolved in one query and then served from the cache.
+    """
+
+    def setUp(self):
+        token_cache.clear()
+        self.user = User.objects.create_user(username='anbieter')
+        self.profile = Profile.objects.create(user=self.user, type='business', email='a@example.com')
+        self.token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+
+    def test_principal_is_cached(self):
+        url = reverse('order_count', args=[self.user.pk])
+        # token with user and profile + order count
+        with self.assertNumQueries(2):
+            self.client.get(url)
+        with self.assertNumQueries(1):
+            self.client.get(url)
+
+    def test_deleted_token_is_rejected(self):
+        url = reverse('order-list')
+        self.assertEqual(self.client.get(url).status_code, 200)
+        self.token.delete()
+        self.assertEqual(self.client.get(url).data['detail'], 'Invalid token.')
+
+    def test_profile_update_invalidates_entry(self):
+        self.client.get(reverse('order-list'))
+        self.profile.type = 'customer'
+        self.profile.save()
+        response = self.client.post(reverse('offer-list'), {}, format='json')
+        self.assertEqual(response.status_code, 403)
+
+    def test_write_on_another_worker_invalidates_entry(self):
+        self.client.get(reverse('order-list'))
+        # Another worker changes the profile: no signal here, only the shared version changes
+        Profile.objects.filter(pk=self.profile.pk).update(type='customer')
+        self.assertEqual(self.client.post(reverse('offer-list'), {}, format='json').status_code, 400)
+        authentication.bump_version()
+        self.assertEqual(self.client.post(reverse('offer-list'), {}, format='json').status_code, 403)
+
+    @override_settings(TOKEN_EXPIRY=0)
+    def test_expired_token_is_rejected(self):
+        self.assertEqual(self.client.get(reverse('order-list')).data['detail'], 'Token has expired.')
+
+
+@override_settings(PASSWORD_HASHERS=[
+    'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.MD5PasswordHasher',
+])
+class LoginTests(APITransactionTestCase):
+    """
+    Login authenticates through django.contrib.auth and upgrades outdated hashes.
+    With ASYNC_VIEWS the login runs in the hashing pool, whose threads have
+    their own database connections, so the data has to be committed.
+    """
+
+    def setUp(self):
+        self.user = User.objects.create(username='kunde', password=make_password('geheim123', hasher='md5'))
+
+    def test_login_upgrades_hash(self):
+        response = self.client.post(reverse('login'), {'username': 'kunde', 'password': 'geheim123'}, format='json')
+        self.assertEqual(response.json()['user_id'], self.user.pk)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.password.startswith('pbkdf2_sha256$'))
+
+        response = self.client.post(reverse('login'), {'username': 'kunde', 'password': 'falsch'}, format='json')
+        self.assertEqual(response.status_code, 400)
+
+    def test_password_is_not_sanitized(self):
+        self.user.set_password('<b>geheim</b>')
+        self.user.save()
+        response = self.client.post(reverse('login'), {'username': 'kunde', 'password': '<b>geheim</b>'},
+                                    format='json')
+        self.assertEqual(response.status_code, 200)
+
+    def test_registered_password_is_not_sanitized(self):
+        response = self.client.post(reverse('registration'), {
+            'username': 'neu', 'email': 'neu@example.com', 'type': 'customer',
+            'password': 'a<b>c', 'repeated_password': 'a<b>c'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(User.objects.get(username='neu').check_password('a<b>c'))
+
+    def test_failed_login_is_signalled(self):
+        # authenticate() of django.contrib.auth, with its signals and backends
+        failures = []
+        user_login_failed.connect(lambda **kwargs: failures.append(kwargs['credentials']), weak=False,
+                                  dispatch_uid='test_failed_login_is_signalled')
+        self.addCleanup(user_login_failed.disconnect, dispatch_uid='test_failed_login_is_signalled')
+        self.client.post(reverse('login'), {'username': 'kunde', 'password': 'falsch'}, format='json')
+        self.assertEqual(failures[0]['username'], 'kunde')
+
+    def test_inactive_user_cannot_log_in(self):
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        response = self.client.post(reverse('login'), {'username': 'kunde', 'password': 'geheim123'}, format='json')
+        self.assertEqual(response.status_code, 400)
+
+
+@override_settings(PASSWORD_HASHERS=[
+    'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.MD5PasswordHasher',
+])
+class AsyncLoginTests(APITransactionTestCase):
+    """
+    The async login runs the sync login in the hashing pool.
+    """
+
+    def setUp(self):
+        self.user = User.objects.create(username='kunde', password=make_password('geheim123', hasher='md5'))
+        self.registry = metrics.Registry()
+        patcher = mock.patch.object(metrics, 'registry', self.registry)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def login(self, password):
+        request = AsyncRequestFactory().post(
+            '/login/', {'username': 'kunde', 'password': password}, content_type='application/json')
+        response = async_to_sync(AsyncLoginView.as_view())(request)
+        if hasattr(response, 'render'):
+            response.render()
+        return response
+
+    def test_async_login(self):
+        response = self.login('geheim123')
+        self.assertEqual(json.loads(response.content)['user_id'], self.user.pk)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.password.startswith('pbkdf2_sha256$'))
+        self.assertEqual(self.login('falsch').status_code, 400)
+
+    def test_saturated_pool_fails_fast(self):
+        with mock.patch.object(hashing_pool, 'submit', side_effect=HashingPoolSaturated):
+            response = self.login('geheim123')
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response['Retry-After'], '1')
+
+    def test_hashing_and_queue_are_measured(self):
+        self.login('geheim123')
+        merged = self.registry.collect()
+        # Only authenticate() is timed as the hash, the wait for a worker separately
+        self.assertEqual(merged['operations']['password_hash'][-1], 1)
+        self.assertEqual(merged['operations']['password_hashing_wait'][-1], 1)
+        self.assertEqual(merged['queues']['password_hashing'][-1], 1)
+        self.assertIn('coderr_operation_duration_seconds_count{operation="password_hash"} 1',
+                      metrics.render(merged))
+
+    def test_pool_rejects_beyond_workers_and_queue(self):
+        pool = PasswordHashingPool(max_workers=1, max_queue=1)
+        release = threading.Event()
+        futures = [pool.submit(release.wait), pool.submit(release.wait)]
+        with self.assertRaises(HashingPoolSaturated):
+            pool.submit(release.wait)
+        release.set()
+        for future in futures:
+            future.result()
+        merged = self.registry.collect()
+        self.assertEqual(merged['events'][('password_hashing_saturated',)], 1)
+        # The second job found the first one in the pool
+        self.assertEqual(merged['queues']['password_hashing'][:3], [1, 1, 0])